@@ -0,0 +1,355 @@
+"""Rule-based alerts, evaluated in batch once per snapshot.
+
+A rule compares one metric of a named row (an index, sector or industry)
+against a threshold, optionally relative to a benchmark row:
+
+    NIFTY IT   Index change %  >  2   vs NIFTY 50   ->  IT outperforms by 2 pts
+    NIFTY IT   % above 50-DMA  >  70                ->  breadth crosses 70%
+
+Rules live in a small SQLite database in SECTORR_DATA_DIR (alerts.db) with
+their firings. AlertEngine compiles all rules into one group per (dataset,
+metric): parallel arrays of subject names, benchmark names, directions and
+thresholds. Evaluating a group is one name -> row lookup over the snapshot
+plus a few array operations over the rules, so the cost grows with the
+snapshot, not with rules x rows. A group is only evaluated when its
+snapshot's version changes.
+
+A rule fires at most once per trading day (UNIQUE(rule_id, day)), so
+repeated evaluations and restarts never duplicate an alert.
+start_alert_scheduler runs evaluate_alerts every ALERT_INTERVAL minutes with
+one job per process (not per session), refreshing the datasets from the live
+source during market hours so alerts fire with no session open. Fallback and
+sample snapshots are never evaluated. render_alert_badge shows unread firings
+in the sidebar.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+import streamlit as st
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from participation import get_sector_participation
+from price_history import data_path
+from schema import is_live
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+ALERT_INTERVAL = float(os.environ.get('ALERT_INTERVAL', 1))  # minutes
+
+# Metric label -> (snapshot name, row name column, value column)
+METRICS = {
+    'Index change %': ('index_data', 'Index', 'Percent_Change'),
+    'Sector change %': ('sector_data', 'Industry', 'Percent_Change'),
+    '% above 20-DMA': ('sector_participation', 'Sector', 'Above_20DMA'),
+    '% above 50-DMA': ('sector_participation', 'Sector', 'Above_50DMA'),
+    '% above 200-DMA': ('sector_participation', 'Sector', 'Above_200DMA'),
+    '% at 52W high': ('sector_participation', 'Sector', 'Pct_New_Highs'),
+    'A/D ratio': ('sector_participation', 'Sector', 'AD_Ratio'),
+}
+OPERATORS = {'>': 1.0, '<': -1.0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    metric TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    benchmark TEXT,
+    operator TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS firings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rule_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    fired_at TEXT NOT NULL,
+    value REAL,
+    message TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (rule_id, day)
+);
+"""
+
+
+def describe(rule):
+    """Human-readable rule text"""
+    relative = f" vs {rule['benchmark']}" if rule.get('benchmark') else ""
+    return f"{rule['subject']} {rule['metric']}{relative} {rule['operator']} {rule['threshold']:g}"
+
+
+class AlertStore:
+    """Rules and de-duplicated firings in SQLite"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path('alerts.db')
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.executescript(SCHEMA)
+        self.revision = 0  # bumped whenever rules change
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, params).fetchall()]
+
+    def rules(self):
+        return self._query("SELECT * FROM rules ORDER BY id")
+
+    def add_rule(self, metric, subject, operator, threshold, benchmark=None):
+        if metric not in METRICS or operator not in OPERATORS:
+            raise ValueError(f"Unknown metric {metric!r} or operator {operator!r}")
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO rules (metric, subject, benchmark, operator, threshold, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (metric, subject, benchmark or None, operator, float(threshold), datetime.now(IST).isoformat())
+            )
+            self.revision += 1
+        return cursor.lastrowid
+
+    def remove_rule(self, rule_id):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM rules WHERE id = ?", (rule_id,))
+            self.revision += 1
+
+    def record(self, firings):
+        """Insert (rule_id, day, fired_at, value, message) rows; returns how many were new"""
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO firings (rule_id, day, fired_at, value, message) VALUES (?, ?, ?, ?, ?)",
+                firings
+            )
+            return self._connection.total_changes - before
+
+    def fired_today(self, day):
+        """Rule ids that already fired on day"""
+        return {row['rule_id'] for row in self._query("SELECT rule_id FROM firings WHERE day = ?", (day,))}
+
+    def firings(self, limit=20):
+        return self._query("SELECT * FROM firings ORDER BY id DESC LIMIT ?", (limit,))
+
+    def unseen_count(self):
+        return self._query("SELECT COUNT(*) AS n FROM firings WHERE seen = 0")[0]['n']
+
+    def mark_seen(self):
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE firings SET seen = 1 WHERE seen = 0")
+
+
+class RuleGroup:
+    """Rules sharing one (snapshot, metric), compiled to parallel arrays"""
+
+    def __init__(self, metric, rules):
+        self.metric = metric
+        self.source, self.key, self.column = METRICS[metric]
+        self.rule_ids = np.array([rule['id'] for rule in rules], dtype='int64')
+        self.subjects = np.array([rule['subject'] for rule in rules], dtype=object)
+        self.benchmarks = np.array([rule['benchmark'] or '' for rule in rules], dtype=object)
+        self.relative = self.benchmarks != ''
+        self.directions = np.array([OPERATORS[rule['operator']] for rule in rules])
+        self.thresholds = np.array([rule['threshold'] for rule in rules], dtype='float64')
+        self.labels = [describe(rule) for rule in rules]
+
+    def evaluate(self, frame):
+        """(triggered mask, values) of every rule against one snapshot frame"""
+        names = pd.Index(frame[self.key].astype(str).to_numpy()).drop_duplicates(keep='first')
+        metric = frame.drop_duplicates(subset=[self.key])[self.column].to_numpy(dtype='float64')
+        metric = np.append(metric, np.nan)  # position -1 (name not found) reads NaN
+        values = metric[names.get_indexer(self.subjects)]
+        benchmark = metric[names.get_indexer(self.benchmarks)]
+        values = np.where(self.relative, values - benchmark, values)
+        with np.errstate(invalid='ignore'):
+            triggered = self.directions * (values - self.thresholds) > 0
+        return triggered, values
+
+
+class AlertEngine:
+    """Compiled rule groups evaluated once per snapshot version"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._groups = None
+        self._groups_revision = None
+        self._evaluated = {}  # source -> (snapshot version, rules revision, day) last evaluated
+        self.evaluations = 0
+
+    def groups(self):
+        with self._lock:
+            if self._groups is None or self._groups_revision != self.store.revision:
+                revision = self.store.revision
+                by_metric = {}
+                for rule in self.store.rules():
+                    by_metric.setdefault(rule['metric'], []).append(rule)
+                self._groups = [RuleGroup(metric, rules) for metric, rules in by_metric.items()]
+                self._groups_revision = revision
+            return self._groups
+
+    def evaluate(self, snapshots=None):
+        """Evaluate every group whose snapshot changed; returns the number of new firings.
+
+        snapshots maps snapshot name -> Snapshot (default: the current ones).
+        """
+        now = datetime.now(IST)
+        day = now.date().isoformat()
+        firings = []
+        fired = None
+        for group in self.groups():
+            snapshot = (snapshots or {}).get(group.source) or SNAPSHOTS.get(group.source)
+            if snapshot is None or snapshot.frame is None or snapshot.frame.empty:
+                continue
+            if not is_live(snapshot.frame):
+                continue
+            key = (snapshot.version, self._groups_revision, day)
+            with self._lock:
+                if self._evaluated.get((group.source, group.metric)) == key:
+                    continue
+                self._evaluated[(group.source, group.metric)] = key
+            triggered, values = group.evaluate(snapshot.frame)
+            if not triggered.any():
+                continue
+            if fired is None:
+                fired = self.store.fired_today(day)
+            for position in np.flatnonzero(triggered):
+                rule_id = int(group.rule_ids[position])
+                if rule_id not in fired:
+                    firings.append((rule_id, day, now.isoformat(), float(values[position]),
+                                    f"{group.labels[position]} (now {values[position]:.2f})"))
+        self.evaluations += 1
+        if not firings:
+            return 0
+        new = self.store.record(firings)
+        if new:
+            print(f"🔔 {new} alert(s) fired")
+        return new
+
+
+_engine = None
+_engine_lock = threading.Lock()
+_data_manager = None
+_scheduler = None
+
+
+def get_alert_engine():
+    """Process-wide AlertEngine over alerts.db"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine(AlertStore())
+        return _engine
+
+
+def _refresh(name, fetch, max_age):
+    """Refetch name from the live source if stale; a failed fetch keeps the old snapshot"""
+    def live():
+        data = fetch()
+        if data is None or data.empty:
+            raise LookupError("live source unavailable")
+        return data
+
+    try:
+        SNAPSHOTS.get_or_fetch(name, live, max_age=max_age)
+        return True
+    except Exception as e:
+        print(f"⚠ Alert refresh of {name} skipped: {str(e)}")
+        return False
+
+
+def evaluate_alerts(refresh=False):
+    """Scheduler job: evaluate all rules against the current snapshots.
+
+    refresh (market hours) first refetches datasets older than ALERT_INTERVAL
+    that some rule needs, from the live source only, so alerts fire with no
+    session open.
+    """
+    global _data_manager
+    engine = get_alert_engine()
+    sources = {group.source for group in engine.groups()}
+    if refresh and sources:
+        if _data_manager is None:
+            from data_sources import DataManager
+            _data_manager = DataManager()
+        max_age = ALERT_INTERVAL * 60
+        if 'index_data' in sources:
+            _refresh('index_data', _data_manager.get_live_index_quotes, max_age)
+        if 'sector_data' in sources:
+            _refresh('sector_data', _data_manager.get_live_sector_quotes, max_age)
+        if 'sector_participation' in sources:
+            if _refresh('universe_quotes', _data_manager.get_universe_quotes, max_age):
+                get_sector_participation(_data_manager)
+    return engine.evaluate()
+
+
+def _scheduled_alerts():
+    """Interval job: refetch the rules' datasets only while prices move"""
+    from utils import get_market_timing
+    try:
+        evaluate_alerts(refresh=get_market_timing() == "OPEN")
+    except Exception as e:
+        print(f"❌ Alert evaluation failed: {str(e)}")
+
+
+def start_alert_scheduler():
+    """The process-wide alert_evaluation job, started on first use"""
+    global _scheduler
+    with _engine_lock:
+        if _scheduler is None:
+            _scheduler = BackgroundScheduler(timezone=IST)
+            _scheduler.add_job(
+                func=_scheduled_alerts,
+                trigger="interval",
+                minutes=ALERT_INTERVAL,
+                id='alert_evaluation',
+                max_instances=1,
+                coalesce=True
+            )
+            _scheduler.start()
+            atexit.register(lambda: _scheduler.shutdown() if _scheduler.running else None)
+            print(f"✅ Alert scheduler started - rules evaluated every {ALERT_INTERVAL:g} min")
+        return _scheduler
+
+
+def render_alert_badge(container=st.sidebar):
+    """Sidebar badge with unread firings, recent alerts and rule management"""
+    engine = get_alert_engine()
+    store = engine.store
+    unseen = store.unseen_count()
+    with container.expander(f"🔔 Alerts ({unseen} new)" if unseen else "🔔 Alerts", expanded=False):
+        recent = store.firings(limit=10)
+        if recent:
+            for firing in recent:
+                marker = "🆕 " if not firing['seen'] else ""
+                st.caption(f"{marker}{firing['fired_at'][11:16]} · {firing['message']}")
+            if unseen and st.button("Mark all read", key="alerts_mark_read"):
+                store.mark_seen()
+                st.rerun()
+        else:
+            st.caption("No alerts yet")
+
+        st.markdown("**New rule**")
+        metric = st.selectbox("Metric", list(METRICS), key="alert_metric")
+        subject = st.text_input("Index / sector", value="NIFTY IT", key="alert_subject")
+        benchmark = st.text_input("Relative to (optional)", value="", key="alert_benchmark")
+        col1, col2 = st.columns(2)
+        operator = col1.selectbox("Condition", list(OPERATORS), key="alert_operator")
+        threshold = col2.number_input("Threshold", value=2.0, step=0.5, key="alert_threshold")
+        if st.button("Add rule", key="alert_add") and subject.strip():
+            store.add_rule(metric, subject.strip(), operator, threshold, benchmark.strip() or None)
+            st.rerun()
+
+        rules = store.rules()
+        if rules:
+            st.markdown("**Rules**")
+            for rule in rules:
+                col1, col2 = st.columns([4, 1])
+                col1.caption(describe(rule))
+                if col2.button("✕", key=f"alert_remove_{rule['id']}"):
+                    store.remove_rule(rule['id'])
+                    st.rerun()
@@ -10,8 +10,15 @@ import atexit
 from sector_rotation import render_sector_rotation
 from market_cover import render_market_cover
 from trending_news import render_trending_news
+from screener import render_screener
 from data_sources import DataManager
-from utils import setup_scheduler, manual_refresh
+from utils import setup_scheduler, manual_refresh, is_cache_valid, set_cache, get_cache, load_stylesheet
+from render_timing import begin_rerun, end_rerun, render_timing_overlay
+from data_api import start_data_api
+from unusual_activity import start_activity_detector
+from alerts import render_alert_badge, start_alert_scheduler
+from snapshot_log import start_snapshot_log
+from quote_feed import live_hours, render_live_strip, start_quote_feed, RECORD_BARS
 
 # Page configuration
 st.set_page_config(
@@ -30,6 +37,22 @@ if 'scheduler_initialized' not in st.session_state:
     setup_scheduler()
     st.session_state.scheduler_initialized = True
 
+# Read-only data API over the shared snapshots (once per process)
+start_data_api()
+
+# Scans every universe snapshot for volume and price shocks (once per process)
+start_activity_detector()
+
+# Evaluates alert rules every ALERT_INTERVAL minutes (once per process)
+start_alert_scheduler()
+
+# Appends sector and index snapshots to the replayable intraday log (once per process)
+start_snapshot_log()
+
+# Opt-in (INTRADAY_BARS=on): keep the quote feed polling all session, viewers or not
+if RECORD_BARS:
+    start_quote_feed()
+
 # Main title and refresh button
 col1, col2 = st.columns([4, 1])
 with col1:
@@ -53,115 +76,7 @@ if 'last_update' in st.session_state:
 st.sidebar.title("Navigation")
 
 # Advanced CSS for animated navigation buttons
-st.sidebar.markdown("""
-<style>
-div.stButton > button {
-    width: 100%;
-    height: 70px;
-    font-size: 14px;
-    font-weight: bold;
-    border-radius: 15px;
-    border: none;
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    margin: 10px 0;
-    transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-    box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-    position: relative;
-    overflow: hidden;
-}
-
-div.stButton > button::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: -100%;
-    width: 100%;
-    height: 100%;
-    background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-    transition: left 0.5s;
-}
-
-div.stButton > button:hover {
-    background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
-    transform: translateY(-5px) scale(1.05);
-    box-shadow: 0 15px 35px rgba(102, 126, 234, 0.4);
-}
-
-div.stButton > button:hover::before {
-    left: 100%;
-}
-
-div.stButton > button:active {
-    background: linear-gradient(135deg, #5a67d8 0%, #667eea 100%);
-    transform: translateY(-2px) scale(1.02);
-}
-
-@keyframes pulse {
-    0% { box-shadow: 0 0 0 0 rgba(102, 126, 234, 0.7); }
-    70% { box-shadow: 0 0 0 10px rgba(102, 126, 234, 0); }
-    100% { box-shadow: 0 0 0 0 rgba(102, 126, 234, 0); }
-}
-
-@keyframes slideInUp {
-    from { opacity: 0; transform: translateY(20px); }
-    to { opacity: 1; transform: translateY(0); }
-}
-
-.stApp {
-    background-color: #f0f2f6; /* Light gray background */
-}
-
-.stMarkdown h1 {
-    text-align: center;
-    color: #333;
-    animation: slideInUp 0.8s ease-out;
-}
-
-.stMarkdown h3 {
-    color: #555;
-}
-
-.stMarkdown p {
-    color: #666;
-}
-
-.stButton {
-    animation: slideInUp 0.5s ease-out;
-}
-
-.stAlert {
-    animation: fadeIn 0.5s ease-out;
-}
-
-.stSpinner {
-    animation: pulse 1.5s infinite;
-}
-
-.nav-container {
-    padding: 10px 0;
-}
-
-/* Custom scrollbar for better aesthetics */
-::-webkit-scrollbar {
-    width: 8px;
-}
-
-::-webkit-scrollbar-track {
-    background: #f1f1f1;
-    border-radius: 10px;
-}
-
-::-webkit-scrollbar-thumb {
-    background: #888;
-    border-radius: 10px;
-}
-
-::-webkit-scrollbar-thumb:hover {
-    background: #555;
-}
-</style>
-""", unsafe_allow_html=True)
+load_stylesheet('app', container=st.sidebar)
 
 # Vertical navigation buttons
 st.sidebar.markdown('<div class="nav-container">', unsafe_allow_html=True)
@@ -175,6 +90,9 @@ if st.sidebar.button("📊 Market Cover", key="market_btn", use_container_width=
 if st.sidebar.button("📰 Trending News", key="news_btn", use_container_width=True):
     st.session_state.current_page = "📰 Trending News"
 
+if st.sidebar.button("🔎 Stock Screener", key="screener_btn", use_container_width=True):
+    st.session_state.current_page = "🔎 Stock Screener"
+
 st.sidebar.markdown('</div>', unsafe_allow_html=True)
 
 # Initialize page if not set
@@ -190,8 +108,10 @@ if next_refresh <= datetime.now(pytz.timezone('Asia/Kolkata')):
 
 st.sidebar.info(f"⏰ Next auto-refresh: {next_refresh.strftime('%I:%M %p IST')}")
 
-# Market status indicator
-market_status = st.session_state.data_manager.get_market_status()
+# Market status indicator (re-checked at most once a minute)
+if not is_cache_valid('market_status', validity_minutes=1):
+    set_cache('market_status', st.session_state.data_manager.get_market_status())
+market_status = get_cache('market_status')
 if market_status == "OPEN":
     st.sidebar.success("🟢 Market is OPEN")
 elif market_status == "CLOSED":
@@ -199,13 +119,34 @@ elif market_status == "CLOSED":
 else:
     st.sidebar.warning("🟡 Market status unknown")
 
+# Live metrics strip; polls only during market hours
+live_quotes = st.sidebar.toggle("📡 Live quotes", value=True, key="live_quotes",
+                                help="Update headline numbers every few seconds without reloading the page")
+
+# Alert firings and rules
+render_alert_badge()
+
+LIVE_PAGES = {
+    "🔄 Sector Rotation": ('sector_data',),
+    "📊 Market Cover": ('index_data',)
+}
+
 # Render selected page
+begin_rerun(page)
+if live_quotes and page in LIVE_PAGES and live_hours():
+    render_live_strip(LIVE_PAGES[page])
 if page == "🔄 Sector Rotation":
     render_sector_rotation()
 elif page == "📊 Market Cover":
     render_market_cover()
 elif page == "📰 Trending News":
     render_trending_news()
+elif page == "🔎 Stock Screener":
+    render_screener()
+end_rerun()
+
+# Opt-in per-section render timings
+render_timing_overlay()
 
 # Clean footer without revealing sources
 st.sidebar.markdown("---")
@@ -0,0 +1,306 @@
+"""Vectorized backtests of rank-based sector rotation over stored index closes.
+
+A strategy holds the top_n sectors by momentum, equal-weighted, and
+re-ranks every `rebalance` sessions:
+
+    lookback    momentum window in sessions (63 = 3 months)
+    skip        most recent sessions left out of the window (21 = "12-1")
+    top_n       sectors held
+    rebalance   sessions between rebalances (21 = monthly)
+    absolute    hold cash instead of a sector whose momentum is negative
+    cost_bps    cost per unit of turnover at each rebalance
+
+Closes come from the date x name matrix returns.py keeps (index_closes),
+completed sessions only, with broad indices left out of the ranking and
+NIFTY 50 as the benchmark. One backtest is a handful of whole-array steps
+with no per-day loop: momentum for every rebalance day, one argsort across
+sectors, a weight matrix, and buy-and-hold growth inside each holding
+period from closes divided by the rebalance day's closes. Costs use the
+drifted weights at each rebalance.
+
+sweep() runs a parameter grid, split by (lookback, skip) so each chunk
+computes its momentum matrix once, across a process pool when the grid is
+large. Results are cached per parameter set until the history changes.
+Seed a long history first:
+
+    python returns.py --backfill --period 10y
+    python backtest.py --sweep
+"""
+import argparse
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from returns import get_index_history
+
+IST = pytz.timezone('Asia/Kolkata')
+SESSIONS_PER_YEAR = 252
+BENCHMARK = 'NIFTY 50'
+# Broad and thematic indices are not sectors to rotate between
+BROAD_INDICES = {'NIFTY 50', 'SENSEX', 'NIFTY NEXT 50', 'NIFTY MIDCAP 100', 'NIFTY SMALLCAP 100', 'NIFTY 100',
+                 'NIFTY 200', 'NIFTY 500', 'NIFTY TOTAL MARKET', 'NIFTY MNC', 'NIFTY PSE', 'NIFTY INFRA'}
+PARAMS = ('lookback', 'top_n', 'rebalance', 'skip', 'absolute', 'cost_bps')
+DEFAULTS = {'lookback': 63, 'top_n': 3, 'rebalance': 21, 'skip': 0, 'absolute': False, 'cost_bps': 10.0}
+GRID = {
+    'lookback': [21, 42, 63, 84, 105, 126, 168, 210, 252],
+    'top_n': [1, 2, 3, 4, 5],
+    'rebalance': [5, 10, 21, 42, 63],
+    'skip': [0, 5, 21],
+    'absolute': [False, True],
+    'cost_bps': [10.0],
+}
+METRIC_COLUMNS = ['CAGR', 'Volatility', 'Sharpe', 'Max_Drawdown', 'Turnover', 'Benchmark_CAGR', 'Excess_CAGR',
+                  'Hit_Rate']
+PARALLEL_MIN = 200  # smaller grids run in-process; a pool costs more to start than they take
+MAX_RESULTS = 20000
+
+
+def momentum(closes, lookback, skip=0):
+    """[days, sectors] % change over lookback sessions ending skip sessions ago (NaN before that)"""
+    values = np.full(closes.shape, np.nan)
+    span = lookback + skip
+    if span < len(closes):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values[span:] = closes[lookback:len(closes) - skip] / closes[:len(closes) - span] - 1
+    return values
+
+
+def run_strategy(closes, benchmark, params, start, scores=None):
+    """(metrics dict, equity curve, benchmark curve) of one strategy from session start.
+
+    closes: forward-filled [days, sectors]; benchmark: [days] or None;
+    scores: momentum(closes, lookback, skip) when the caller already has it.
+    """
+    days = len(closes)
+    rebalances = np.arange(start, days - 1, params['rebalance'])
+    if len(rebalances) == 0:
+        return None, None, None
+    if scores is None:
+        scores = momentum(closes, params['lookback'], params['skip'])
+
+    # Rank every rebalance day at once; NaN momentum is never picked
+    ranked = scores[rebalances]
+    eligible = np.isfinite(ranked)
+    if params['absolute']:
+        eligible &= ranked > 0
+    order = np.argsort(np.where(eligible, -ranked, np.inf), axis=1, kind='stable')[:, :params['top_n']]
+    picked = np.take_along_axis(eligible, order, axis=1)
+    held = np.maximum(picked.sum(axis=1, keepdims=True), 1)
+    weights = np.zeros_like(ranked)
+    np.put_along_axis(weights, order, picked / held, axis=1)
+    cash = 1 - weights.sum(axis=1)
+
+    # Buy and hold inside each period: value = cash + sum(w * close / close at rebalance)
+    sessions = np.arange(rebalances[0], days)
+    period = np.searchsorted(rebalances, sessions, side='right') - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        relative = np.nan_to_num(closes[sessions] / closes[rebalances[period]], nan=1.0)
+    growth = cash[period] + (weights[period] * relative).sum(axis=1)
+
+    # Turnover against the weights each period drifted to before the next rebalance
+    ends = np.append(rebalances[1:], days - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drift = np.nan_to_num(closes[ends] / closes[rebalances], nan=1.0)
+    period_growth = cash + (weights * drift).sum(axis=1)
+    drifted = weights * drift / period_growth[:, None]
+    previous = np.vstack([np.zeros(weights.shape[1]), drifted[:-1]])
+    turnover = np.abs(weights - previous).sum(axis=1)
+    after_costs = 1 - turnover * params['cost_bps'] / 10000
+
+    carried = np.concatenate([[1.0], np.cumprod(after_costs * period_growth)[:-1]])
+    equity = carried[period] * after_costs[period] * growth
+
+    bench = None
+    if benchmark is not None and np.isfinite(benchmark[rebalances[0]]):
+        bench = benchmark[sessions] / benchmark[rebalances[0]]
+    return _metrics(equity, bench, turnover), equity, bench
+
+
+def _metrics(equity, bench, turnover):
+    years = max(len(equity) - 1, 1) / SESSIONS_PER_YEAR
+    daily = np.diff(equity) / equity[:-1]
+    volatility = daily.std() * np.sqrt(SESSIONS_PER_YEAR) if len(daily) > 1 else np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = daily.mean() / daily.std() * np.sqrt(SESSIONS_PER_YEAR) if len(daily) > 1 else np.nan
+    cagr = equity[-1] ** (1 / years) - 1
+    metrics = {
+        'CAGR': cagr * 100,
+        'Volatility': volatility * 100,
+        'Sharpe': sharpe,
+        'Max_Drawdown': (equity / np.maximum.accumulate(equity) - 1).min() * 100,
+        'Turnover': turnover.mean() * 100,
+        'Benchmark_CAGR': np.nan,
+        'Excess_CAGR': np.nan,
+        'Hit_Rate': np.nan,
+    }
+    if bench is not None and np.isfinite(bench[-1]):
+        bench_cagr = bench[-1] ** (1 / years) - 1
+        bench_daily = np.diff(bench) / bench[:-1]
+        metrics['Benchmark_CAGR'] = bench_cagr * 100
+        metrics['Excess_CAGR'] = (cagr - bench_cagr) * 100
+        metrics['Hit_Rate'] = (daily > bench_daily).mean() * 100 if len(daily) else np.nan
+    return metrics
+
+
+def _sweep_chunk(closes, benchmark, start, configs):
+    """Metrics for configs sharing one (lookback, skip); runs in a worker process"""
+    scores = momentum(closes, configs[0]['lookback'], configs[0]['skip'])
+    return [run_strategy(closes, benchmark, params, start, scores)[0] for params in configs]
+
+
+def grid(**choices):
+    """Every combination of GRID, with any parameter overridden by a list of choices"""
+    axes = {name: choices.get(name, GRID[name]) for name in PARAMS}
+    return [dict(zip(PARAMS, values)) for values in itertools.product(*axes.values())]
+
+
+class Backtester:
+    """Rotation backtests over the stored sector closes, cached per parameter set"""
+
+    def __init__(self, history):
+        self.history = history
+        self._lock = threading.Lock()
+        self._data = None
+        self._data_key = None
+        self._results = OrderedDict()
+        self._pool = None
+        self.version = None  # identifies the closes behind the latest results
+
+    def data(self):
+        """(dates, sector names, forward-filled closes, benchmark closes) of completed sessions"""
+        today = datetime.now(IST).date()
+        key = (today, self.history.revision, self.history.days())
+        with self._lock:
+            if self._data_key == key:
+                return self._data
+        names = self.history.symbols()
+        dates, closes = self.history.matrix(names, before=today)
+        filled = pd.DataFrame(closes).ffill().to_numpy(dtype='float64')
+        sectors = [i for i, name in enumerate(names) if name not in BROAD_INDICES]
+        benchmark = filled[:, names.index(BENCHMARK)] if BENCHMARK in names else None
+        data = (dates, [names[i] for i in sectors], filled[:, sectors], benchmark)
+        with self._lock:
+            self._data, self._data_key, self.version = data, key, key
+            self._results.clear()
+        return data
+
+    def _start(self, configs):
+        """Shared first rebalance, so every configuration is scored over the same sessions"""
+        return max(params['lookback'] + params['skip'] for params in configs)
+
+    def run(self, **params):
+        """(metrics, DataFrame of Strategy/Benchmark growth of 1) for one parameter set"""
+        params = dict(DEFAULTS, **params)
+        dates, names, closes, benchmark = self.data()
+        metrics, equity, bench = run_strategy(closes, benchmark, params, self._start([params]))
+        if metrics is None:
+            return None, pd.DataFrame()
+        curve = pd.DataFrame({'Strategy': equity}, index=dates[len(dates) - len(equity):])
+        if bench is not None:
+            curve['Benchmark'] = bench
+        return metrics, curve
+
+    def holdings(self, **params):
+        """Sectors the strategy would hold after ranking at the latest close"""
+        params = dict(DEFAULTS, **params)
+        _, names, closes, _ = self.data()
+        if not len(closes):
+            return []
+        latest = momentum(closes, params['lookback'], params['skip'])[-1]
+        eligible = np.isfinite(latest) & ((latest > 0) if params['absolute'] else True)
+        order = np.argsort(np.where(eligible, -latest, np.inf), kind='stable')[:params['top_n']]
+        return [(names[i], latest[i] * 100) for i in order if eligible[i]]
+
+    def sweep(self, configs=None, workers=None):
+        """DataFrame of PARAMS + METRIC_COLUMNS for every configuration, best Sharpe first"""
+        configs = [dict(DEFAULTS, **params) for params in (configs or grid())]
+        dates, names, closes, benchmark = self.data()
+        start = self._start(configs)
+        keys = [(start,) + tuple(params[name] for name in PARAMS) for params in configs]
+        with self._lock:
+            results = {key: self._results[key] for key in keys if key in self._results}
+        missing = [(key, params) for key, params in zip(keys, configs) if key not in results]
+
+        if missing and start < len(closes) - 1:
+            chunks = {}
+            for key, params in missing:
+                chunks.setdefault((params['lookback'], params['skip']), []).append((key, params))
+            chunks = list(chunks.values())
+            workers = workers or os.cpu_count() or 1
+            computed = None
+            if workers > 1 and len(missing) >= PARALLEL_MIN:
+                try:
+                    pool = self._executor(workers)
+                    futures = [pool.submit(_sweep_chunk, closes, benchmark, start, [p for _, p in chunk])
+                               for chunk in chunks]
+                    computed = [future.result() for future in futures]
+                except BrokenProcessPool as e:
+                    print(f"❌ Backtest pool failed, sweeping in-process: {str(e)}")
+                    with self._lock:
+                        self._pool = None
+            if computed is None:
+                computed = [_sweep_chunk(closes, benchmark, start, [p for _, p in chunk]) for chunk in chunks]
+            with self._lock:
+                for chunk, metrics in zip(chunks, computed):
+                    for (key, _), result in zip(chunk, metrics):
+                        self._results[key] = results[key] = result
+                while len(self._results) > MAX_RESULTS:
+                    self._results.popitem(last=False)
+
+        rows = [dict(params, **results[key]) for key, params in zip(keys, configs) if results.get(key)]
+        table = pd.DataFrame(rows, columns=list(PARAMS) + METRIC_COLUMNS)
+        return table.sort_values('Sharpe', ascending=False, na_position='last').reset_index(drop=True)
+
+    def _executor(self, workers):
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs Streamlit and scheduler threads is unsafe
+                import multiprocessing
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+
+_backtester = None
+_backtester_lock = threading.Lock()
+
+
+def get_backtester():
+    global _backtester
+    with _backtester_lock:
+        if _backtester is None:
+            _backtester = Backtester(get_index_history())
+        return _backtester
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sweep', action='store_true', help="run the full parameter grid")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--top', type=int, default=15, help="configurations to print")
+    args = parser.parse_args()
+
+    backtester = get_backtester()
+    dates, names, _, _ = backtester.data()
+    print(f"{len(dates)} sessions of {len(names)} sectors in {backtester.history.path}")
+    if args.sweep:
+        started = datetime.now()
+        table = backtester.sweep(workers=args.workers)
+        seconds = (datetime.now() - started).total_seconds()
+        print(f"✓ {len(table)} configurations in {seconds:.1f}s")
+        print(table.head(args.top).round(2).to_string(index=False))
+    else:
+        metrics, _ = backtester.run()
+        print(DEFAULTS)
+        print(metrics)
+
+
+if __name__ == '__main__':
+    main()
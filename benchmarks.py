@@ -0,0 +1,100 @@
+"""Offline benchmarks for the DataManager parsing and DataFrame-building paths.
+
+Usage:
+    python benchmarks.py record [--fixtures DIR]   # capture live upstream responses
+    python benchmarks.py sample [--fixtures DIR]   # write deterministic sample fixtures
+    python benchmarks.py run [--fixtures DIR] [--repeat N]
+
+`run` replays fixtures through ReplayTransport, so no network is touched.
+Without --fixtures it benchmarks against a freshly generated sample set.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from data_sources import DataManager
+from fixtures import (DEFAULT_FIXTURE_DIR, ReplayTransport, record_fixtures,
+                      write_sample_fixtures)
+
+
+def assemble_page_data(manager):
+    """Everything the three pages fetch on a cold session"""
+    manager.get_market_status()
+    manager.get_sector_data()
+    manager.get_top_gainers_losers()
+    manager.get_market_heatmap_data()
+    manager.get_index_data()
+    manager.get_fii_dii_data()
+    manager.get_financial_news(limit=50)
+
+
+BENCHMARKS = [
+    ('get_sector_data', lambda m: m.get_sector_data()),
+    ('get_top_gainers_losers', lambda m: m.get_top_gainers_losers()),
+    ('get_market_heatmap_data', lambda m: m.get_market_heatmap_data()),
+    ('get_index_data', lambda m: m.get_index_data()),
+    ('_scrape_financial_news', lambda m: m._scrape_financial_news()),
+    ('page data assembly', assemble_page_data),
+]
+
+
+def time_call(func, manager, repeat):
+    """Return per-call wall times in milliseconds"""
+    timings = []
+    # DataManager logs every symbol it fetches; keep that out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(manager)  # warm-up
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(manager)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_benchmarks(fixture_dir, repeat=20):
+    transport = ReplayTransport(fixture_dir)
+    manager = DataManager(transport=transport, throttle=False)
+    results = []
+    for name, func in BENCHMARKS:
+        timings = time_call(func, manager, repeat)
+        results.append({
+            'name': name,
+            'min_ms': min(timings),
+            'median_ms': statistics.median(timings),
+            'mean_ms': statistics.mean(timings),
+        })
+
+    print(f"{'benchmark':<28}{'min (ms)':>12}{'median (ms)':>14}{'mean (ms)':>12}")
+    for row in results:
+        print(f"{row['name']:<28}{row['min_ms']:>12.2f}{row['median_ms']:>14.2f}{row['mean_ms']:>12.2f}")
+    if transport.misses:
+        print(f"⚠ {len(set(transport.misses))} requests had no fixture and were served as 404")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['record', 'sample', 'run'], nargs='?', default='run')
+    parser.add_argument('--fixtures', default=None, help=f"fixture directory (default: {DEFAULT_FIXTURE_DIR})")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_fixtures(args.fixtures or DEFAULT_FIXTURE_DIR)
+    elif args.command == 'sample':
+        write_sample_fixtures(args.fixtures or DEFAULT_FIXTURE_DIR)
+        print(f"✓ Wrote sample fixtures to {args.fixtures or DEFAULT_FIXTURE_DIR}")
+    elif args.fixtures and os.path.isdir(args.fixtures):
+        run_benchmarks(args.fixtures, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            print("Using generated sample fixtures (pass --fixtures DIR to replay a recording)")
+            run_benchmarks(write_sample_fixtures(tmp), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Market breadth over the full NSE equity universe.
+
+One bulk universe snapshot (DataManager.get_universe_quotes) plus the daily
+close matrix (price_history.py) give, as whole-array operations:
+advances/declines, the A/D ratio, % of stocks above their 20/50/200-day
+moving averages, and new 52-week highs/lows. Each day's figures are upserted
+into a small parquet history so oscillators (A/D line, McClellan) are a
+cumulative sum and two EWMs over a few hundred rows.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from price_history import data_path, get_price_history, read_parquet, record_bars, write_parquet
+from schema import trade_date
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+DMA_WINDOWS = (20, 50, 200)
+BREADTH_COLUMNS = [
+    'Universe', 'Advances', 'Declines', 'Unchanged', 'AD_Ratio',
+    'Above_20DMA', 'Above_50DMA', 'Above_200DMA', 'New_Highs', 'New_Lows'
+]
+
+_breadth_lock = threading.Lock()
+_computed = {}  # universe snapshot version -> breadth row
+
+
+def compute_breadth(quotes, closes):
+    """Breadth figures for one universe snapshot.
+
+    quotes: universe DataFrame (Last_Price, Percent_Change, optional
+    Year_High/Year_Low); closes: [days, symbols] matrix of earlier daily
+    closes aligned to quotes' rows. A DMA is only counted for stocks with a
+    full window of history, and is None until any stock has one.
+    """
+    prices = quotes['Last_Price'].to_numpy(dtype='float64')
+    changes = quotes['Percent_Change'].to_numpy(dtype='float64')
+    advances = int((changes > 0).sum())
+    declines = int((changes < 0).sum())
+
+    row = {
+        'Universe': len(quotes),
+        'Advances': advances,
+        'Declines': declines,
+        'Unchanged': len(quotes) - advances - declines,
+        'AD_Ratio': advances / declines if declines else float(advances)
+    }
+
+    # Today's price completes each window
+    series = np.vstack([closes, prices[None, :]]) if len(closes) else prices[None, :]
+    for window in DMA_WINDOWS:
+        recent = series[-window:]
+        full = (len(recent) == window) & ~np.isnan(recent).any(axis=0)
+        if full.any():
+            dma = recent[:, full].mean(axis=0)
+            row[f'Above_{window}DMA'] = float((prices[full] > dma).mean() * 100)
+        else:
+            row[f'Above_{window}DMA'] = None
+
+    # 52-week extremes from the quote when NSE provides them, else from history
+    year = series[-252:]
+    with np.errstate(all='ignore'):
+        history_high = np.nanmax(year, axis=0) if len(year) else prices
+        history_low = np.nanmin(year, axis=0) if len(year) else prices
+    year_high = quotes['Year_High'].to_numpy(dtype='float64') if 'Year_High' in quotes else history_high
+    year_low = quotes['Year_Low'].to_numpy(dtype='float64') if 'Year_Low' in quotes else history_low
+    year_high = np.where(np.isnan(year_high), history_high, year_high)
+    year_low = np.where(np.isnan(year_low), history_low, year_low)
+    row['New_Highs'] = int((prices >= year_high).sum())
+    row['New_Lows'] = int((prices <= year_low).sum())
+    return row
+
+
+class BreadthHistory:
+    """One breadth row per trading day, persisted as parquet"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path('breadth_history.parquet')
+        self._lock = threading.Lock()
+        history = read_parquet(self.path)
+        self._history = history if history is not None else pd.DataFrame(columns=BREADTH_COLUMNS)
+        self._history.index = pd.DatetimeIndex(self._history.index, name='Date')
+
+    def record(self, date, row):
+        entry = pd.DataFrame([row], index=pd.DatetimeIndex([pd.Timestamp(date)], name='Date'))
+        with self._lock:
+            history = self._history.drop(index=entry.index, errors='ignore')
+            self._history = entry if history.empty else pd.concat([history, entry]).sort_index()
+            write_parquet(self._history, self.path)
+
+    def frame(self):
+        """History with oscillators: net advances, A/D line and McClellan"""
+        with self._lock:
+            history = self._history.copy()
+        if history.empty:
+            return history
+        net = history['Advances'].astype('float64') - history['Declines'].astype('float64')
+        history['Net_Advances'] = net
+        history['AD_Line'] = net.cumsum()
+        history['McClellan'] = net.ewm(span=19, adjust=False).mean() - net.ewm(span=39, adjust=False).mean()
+        return history
+
+
+_history = None
+
+
+def get_breadth_history():
+    global _history
+    with _breadth_lock:
+        if _history is None:
+            _history = BreadthHistory()
+        return _history
+
+
+def get_market_breadth(data_manager):
+    """(today's breadth row or None, breadth history) for the current universe snapshot.
+
+    Breadth is computed once per universe snapshot version; that is also
+    when the session's closes and breadth row are written to disk, under the
+    trade date the quote payload carries (a holiday repeats the last session,
+    which then just rewrites that session's rows).
+    """
+    snapshot = SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    history = get_breadth_history()
+    if snapshot.frame is None or snapshot.frame.empty:
+        return None, history.frame()
+
+    with _breadth_lock:
+        row = _computed.get(snapshot.version)
+    if row is None:
+        quotes = snapshot.frame
+        session = trade_date(quotes)
+        symbols = quotes['Symbol'].astype(str).to_numpy()
+        _, closes = get_price_history().matrix(symbols, before=session or datetime.now(IST).date())
+        row = compute_breadth(quotes, closes)
+        # Undated payloads can't be told apart from a repeat of the last session
+        if session is not None and session.weekday() < 5:
+            try:
+                record_bars(session, quotes)
+                history.record(session, row)
+            except Exception as e:
+                print(f"Could not save breadth history: {str(e)}")
+        with _breadth_lock:
+            _computed.clear()
+            _computed[snapshot.version] = row
+    return row, history.frame()
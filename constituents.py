@@ -0,0 +1,261 @@
+"""Index constituent master built from NSE's index constituent CSVs.
+
+NSE publishes every index's members as a CSV (Company Name, Industry,
+Symbol, Series, ISIN Code) under nsearchives.nseindia.com/content/indices/.
+ConstituentMaster loads them into one long (Index, Symbol) table and indexes
+it both ways:
+
+    sector -> symbols           an index name ('NIFTY IT') or CSV industry
+    symbol -> sectors, weights  every index a stock belongs to
+
+so any sector view is a lookup plus one pass over a single quote snapshot
+(see DataManager.get_sector_stocks). The table is cached as parquet in
+SECTORR_DATA_DIR and downloaded again at most once a day; if NSE is
+unreachable the cached copy is kept, and with no cache at all a small
+built-in list of large caps keeps drill-downs working offline. The stand-in
+server (standin_server.py) and write_sample_fixtures serve synthetic CSVs
+that match their quotes.
+
+    python constituents.py --refresh
+"""
+import argparse
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from price_history import data_path, read_parquet, write_parquet
+
+IST = pytz.timezone('Asia/Kolkata')
+MEMBER_COLUMNS = ['Index', 'Symbol', 'Company', 'Industry', 'ISIN']
+
+# Index name (as NSE quotes it) -> constituent CSV file
+CONSTITUENT_FILES = {
+    'NIFTY 50': 'ind_nifty50list.csv',
+    'NIFTY NEXT 50': 'ind_niftynext50list.csv',
+    'NIFTY 500': 'ind_nifty500list.csv',
+    'NIFTY MIDCAP 100': 'ind_niftymidcap100list.csv',
+    'NIFTY SMALLCAP 100': 'ind_niftysmallcap100list.csv',
+    'NIFTY TOTAL MARKET': 'ind_niftytotalmarket_list.csv',
+    'NIFTY AUTO': 'ind_niftyautolist.csv',
+    'NIFTY BANK': 'ind_niftybanklist.csv',
+    'NIFTY ENERGY': 'ind_niftyenergylist.csv',
+    'NIFTY FINANCIAL SERVICES': 'ind_niftyfinancelist.csv',
+    'NIFTY FMCG': 'ind_niftyfmcglist.csv',
+    'NIFTY IT': 'ind_niftyitlist.csv',
+    'NIFTY MEDIA': 'ind_niftymedialist.csv',
+    'NIFTY METAL': 'ind_niftymetallist.csv',
+    'NIFTY PHARMA': 'ind_niftypharmalist.csv',
+    'NIFTY PSU BANK': 'ind_niftypsubanklist.csv',
+    'NIFTY PRIVATE BANK': 'ind_nifty_privatebanklist.csv',
+    'NIFTY REALTY': 'ind_niftyrealtylist.csv',
+    'NIFTY HEALTHCARE INDEX': 'ind_niftyhealthcarelist.csv',
+    'NIFTY CONSUMER DURABLES': 'ind_niftyconsumerdurableslist.csv',
+    'NIFTY OIL & GAS': 'ind_niftyoilgaslist.csv',
+    'NIFTY INFRA': 'ind_niftyinfralist.csv',
+    'NIFTY PSE': 'ind_niftypselist.csv',
+    'NIFTY MNC': 'ind_niftymnclist.csv',
+}
+
+# Offline seed when neither NSE nor a cached master is available
+FALLBACK_CONSTITUENTS = {
+    'NIFTY IT': ['TCS', 'INFY', 'HCLTECH', 'WIPRO', 'TECHM', 'LTTS', 'MPHASIS', 'LTIM', 'COFORGE', 'PERSISTENT'],
+    'NIFTY BANK': ['HDFCBANK', 'ICICIBANK', 'KOTAKBANK', 'SBIN', 'AXISBANK', 'INDUSINDBK', 'BANDHANBNK', 'FEDERALBNK', 'IDFCFIRSTB', 'PNB'],
+    'NIFTY PHARMA': ['SUNPHARMA', 'DRREDDY', 'CIPLA', 'DIVISLAB', 'BIOCON', 'ZYDUSLIFE', 'GLENMARK', 'LUPIN', 'TORNTPHARM', 'ALKEM'],
+    'NIFTY AUTO': ['MARUTI', 'TATAMOTORS', 'M&M', 'BAJAJ-AUTO', 'HEROMOTOCO', 'TVSMOTOR', 'EICHERMOT', 'ASHOKLEY', 'ESCORTS', 'BALKRISIND'],
+    'NIFTY FMCG': ['HINDUNILVR', 'ITC', 'NESTLEIND', 'BRITANNIA', 'DABUR', 'MARICO', 'GODREJCP', 'COLPAL', 'UBL', 'TATACONSUM'],
+    # Company rows the yfinance sector fallback lists as sectors
+    'Reliance Industries': ['RELIANCE'],
+    'Tata Consultancy Services': ['TCS'],
+    'HDFC Bank': ['HDFCBANK'],
+    'Infosys': ['INFY'],
+}
+
+
+def _today():
+    return datetime.now(IST).date()
+
+
+class ConstituentMaster:
+    """Index membership table with sector -> symbols and symbol -> sectors lookups"""
+
+    def __init__(self, members, loaded_on=None, source='nse'):
+        members = members.reindex(columns=MEMBER_COLUMNS).dropna(subset=['Index', 'Symbol'])
+        members = members.drop_duplicates(subset=['Index', 'Symbol']).reset_index(drop=True)
+        members['Index'] = members['Index'].astype(str).astype('category')
+        members['Symbol'] = members['Symbol'].astype(str).str.strip().astype('category')
+        members['Industry'] = members['Industry'].astype('category')
+        # Equal weights until caps are supplied (see weights())
+        members['Weight'] = 1.0 / members.groupby('Index', observed=True)['Symbol'].transform('size')
+        self.members = members
+        self.loaded_on = loaded_on
+        self.source = source
+
+        symbols = members['Symbol'].astype(str).to_numpy()
+        indices = members['Index'].astype(str).to_numpy()
+        self._by_sector = {
+            name: symbols[rows] for name, rows in members.groupby('Index', observed=True).indices.items()
+        }
+        # One industry per stock, wherever it was listed
+        listed = members.dropna(subset=['Industry']).drop_duplicates(subset=['Symbol'])
+        self._industry = dict(zip(listed['Symbol'].astype(str), listed['Industry'].astype(str)))
+        self._by_industry = {
+            name: listed['Symbol'].astype(str).to_numpy()[rows]
+            for name, rows in listed.groupby('Industry', observed=True).indices.items()
+        }
+        self._by_symbol = {
+            symbol: tuple(indices[rows]) for symbol, rows in members.groupby('Symbol', observed=True).indices.items()
+        }
+
+    def __len__(self):
+        return len(self.members)
+
+    def sector_names(self):
+        return list(self._by_sector)
+
+    def industry_names(self):
+        return list(self._by_industry)
+
+    def symbols(self, sector):
+        """Member symbols of an index, a CSV industry or a built-in entry, as an array"""
+        found = self._by_sector.get(sector)
+        if found is None:
+            found = self._by_industry.get(sector)
+        if found is None and sector in FALLBACK_CONSTITUENTS:
+            found = np.array(FALLBACK_CONSTITUENTS[sector], dtype=object)
+        return found if found is not None else np.array([], dtype=object)
+
+    def sectors(self, symbol):
+        """Every index a symbol belongs to"""
+        return self._by_symbol.get(symbol, ())
+
+    def industry(self, symbol):
+        return self._industry.get(symbol)
+
+    def weights(self, sector, caps=None):
+        """Series of member weights in sector summing to 1.
+
+        caps (Series of market caps by symbol) gives cap weights; without it,
+        or for members missing a cap, weights are equal.
+        """
+        symbols = self.symbols(sector)
+        if len(symbols) == 0:
+            return pd.Series(dtype='float64')
+        values = np.ones(len(symbols))
+        if caps is not None:
+            values = pd.Series(caps).reindex(symbols).to_numpy(dtype='float64')
+            if np.isnan(values).all():
+                values = np.ones(len(symbols))
+            else:
+                values = np.where(np.isnan(values), np.nanmedian(values), values)
+        return pd.Series(values / values.sum(), index=symbols)
+
+    def symbol_weights(self, symbol):
+        """{index: equal weight of symbol in that index}"""
+        rows = self.members['Symbol'] == symbol
+        return dict(zip(self.members.loc[rows, 'Index'].astype(str), self.members.loc[rows, 'Weight']))
+
+
+def fallback_members():
+    rows = [
+        {'Index': index, 'Symbol': symbol}
+        for index, symbols in FALLBACK_CONSTITUENTS.items() for symbol in symbols
+    ]
+    return pd.DataFrame(rows, columns=MEMBER_COLUMNS)
+
+
+def download_members(data_manager, files=CONSTITUENT_FILES):
+    """Long membership table from NSE's constituent CSVs (indices that fail are skipped)"""
+    frames = []
+    for index_name in files:
+        members = data_manager.get_index_constituents(index_name)
+        if not members.empty:
+            frames.append(members.assign(Index=index_name))
+    if not frames:
+        return pd.DataFrame(columns=MEMBER_COLUMNS)
+    return pd.concat(frames, ignore_index=True).reindex(columns=MEMBER_COLUMNS)
+
+
+_master = None
+_master_lock = threading.Lock()
+
+
+def _cache_path():
+    return data_path('constituents.parquet')
+
+
+def _cached_members():
+    """(members, day cached) from disk, or (None, None)"""
+    path = _cache_path()
+    members = read_parquet(path)
+    if members is None:
+        return None, None
+    cached_on = datetime.fromtimestamp(os.path.getmtime(path), IST).date()
+    return members, cached_on
+
+
+def refresh_constituents(data_manager):
+    """Download the constituent CSVs now and replace the cached master"""
+    global _master
+    members = download_members(data_manager)
+    if members.empty:
+        print("❌ Constituent lists unavailable from NSE")
+        return None
+    try:
+        write_parquet(members, _cache_path())
+    except Exception as e:
+        print(f"Could not cache constituents: {str(e)}")
+    master = ConstituentMaster(members, loaded_on=_today())
+    with _master_lock:
+        _master = master
+    print(f"✅ Loaded {len(master)} constituents across {len(master.sector_names())} indices")
+    return master
+
+
+def get_constituents(data_manager=None):
+    """Process-wide ConstituentMaster, refreshed from NSE at most once a day"""
+    global _master
+    today = _today()
+    with _master_lock:
+        if _master is not None and (_master.loaded_on == today or data_manager is None):
+            return _master
+        members, cached_on = _cached_members()
+        if members is not None and (cached_on == today or data_manager is None):
+            _master = ConstituentMaster(members, loaded_on=cached_on, source='cache')
+            return _master
+
+    master = refresh_constituents(data_manager) if data_manager is not None else None
+    if master is not None:
+        return master
+
+    with _master_lock:
+        if _master is None or _master.source == 'fallback':
+            # Keep yesterday's list over the built-in one; retry NSE tomorrow
+            if members is not None:
+                _master = ConstituentMaster(members, loaded_on=today, source='cache')
+            else:
+                _master = ConstituentMaster(fallback_members(), loaded_on=today, source='fallback')
+        else:
+            _master.loaded_on = today
+        return _master
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--refresh', action='store_true', help="download the constituent lists now")
+    args = parser.parse_args()
+
+    from data_sources import DataManager
+    manager = DataManager()
+    master = refresh_constituents(manager) if args.refresh else get_constituents(manager)
+    if master is None:
+        return
+    print(f"{len(master)} memberships, {len(master.sector_names())} indices, "
+          f"{len(master.industry_names())} industries ({master.source})")
+
+
+if __name__ == '__main__':
+    main()
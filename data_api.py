@@ -0,0 +1,221 @@
+"""Read-only HTTP API over the shared data snapshots.
+
+Serves the same sector, index, heatmap, FII/DII and universe snapshots the Streamlit
+pages read (see snapshots.py), so other tools get bulk data without scraping
+the UI and without extra upstream fetches: a request only fetches when no
+session has loaded that dataset yet, and then through the same single-flight
+path the pages use.
+
+Routes:
+    GET /api/datasets                 versions of every dataset
+    GET /api/<dataset>?format=json    snapshot as JSON records (default)
+    GET /api/<dataset>?format=arrow   snapshot as an Arrow IPC stream
+        &since=<sequence>             304 unless a newer snapshot exists
+
+Responses carry an ETag (If-None-Match gives 304) plus X-Snapshot-Version and
+X-Snapshot-Sequence headers. The server starts with the app on DATA_API_PORT
+(default 8502, "off" to disable), or standalone:
+
+    python data_api.py --port 8502
+"""
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pyarrow as pa
+
+from snapshots import SNAPSHOTS
+
+DEFAULT_PORT = 8502
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Public dataset name -> (snapshot name, DataManager fetch)
+DATASETS = {
+    'sectors': ('sector_data', lambda manager: manager.get_sector_data()),
+    'indices': ('index_data', lambda manager: manager.get_index_data()),
+    'heatmap': ('heatmap_data', lambda manager: manager.get_market_heatmap_data()),
+    'fii-dii': ('fii_dii_data', lambda manager: manager.get_fii_dii_data()),
+    'universe': ('universe_quotes', lambda manager: manager.get_universe_quotes()),
+}
+
+_server = None
+_server_lock = threading.Lock()
+
+# Snapshot name -> (version, {format: encoded body}) for the current snapshot
+_bodies = {}
+_bodies_lock = threading.Lock()
+
+
+def encode_snapshot(snapshot, fmt):
+    """Response body for a snapshot, encoded once per version and format"""
+    with _bodies_lock:
+        cached = _bodies.get(snapshot.name)
+        if cached is not None and cached[0] == snapshot.version and fmt in cached[1]:
+            return cached[1][fmt]
+
+    if fmt == 'arrow':
+        table = snapshot.table if snapshot.table is not None else pa.Table.from_pylist([snapshot.data])
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+    else:
+        header = json.dumps({
+            'dataset': snapshot.name,
+            'version': snapshot.version,
+            'sequence': snapshot.sequence,
+            'created_at': snapshot.created_at.isoformat()
+        })
+        if snapshot.frame is not None:
+            data = snapshot.frame.to_json(orient='records', force_ascii=False)
+        else:
+            data = json.dumps(snapshot.data, default=str)
+        body = (header[:-1] + ', "data": ' + data + '}').encode('utf-8')
+
+    with _bodies_lock:
+        cached = _bodies.get(snapshot.name)
+        if cached is None or cached[0] != snapshot.version:
+            cached = (snapshot.version, {})
+            _bodies[snapshot.name] = cached
+        cached[1][fmt] = body
+    return body
+
+
+class DataAPIHandler(BaseHTTPRequestHandler):
+    server_version = "SectorRDataAPI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        path = parts.path.rstrip('/')
+        try:
+            if path == '/api/datasets':
+                self._send_json(200, self._dataset_index())
+            elif path.startswith('/api/') and path[len('/api/'):] in DATASETS:
+                self._send_dataset(path[len('/api/'):], query)
+            else:
+                self._send_json(404, {'error': 'not found', 'datasets': sorted(DATASETS)})
+        except Exception as e:
+            print(f"Data API error for {self.path}: {str(e)}")
+            self._send_json(503, {'error': str(e)})
+
+    def _dataset_index(self):
+        stats = SNAPSHOTS.stats()
+        return {name: stats.get(snapshot_name) for name, (snapshot_name, _) in DATASETS.items()}
+
+    def _send_dataset(self, name, query):
+        fmt = query.get('format', 'json')
+        if fmt not in ('json', 'arrow'):
+            self._send_json(400, {'error': f"unknown format {fmt!r}, use json or arrow"})
+            return
+        try:
+            since = int(query['since']) if 'since' in query else None
+        except ValueError:
+            self._send_json(400, {'error': "since must be a snapshot sequence number"})
+            return
+
+        snapshot_name, fetch = DATASETS[name]
+        snapshot = SNAPSHOTS.get_or_fetch(snapshot_name, lambda: fetch(self.server.data_manager))
+        etag = f'"{snapshot.version}-{fmt}"'
+        headers = {
+            'ETag': etag,
+            'X-Snapshot-Version': snapshot.version,
+            'X-Snapshot-Sequence': str(snapshot.sequence),
+            'Cache-Control': 'no-cache'
+        }
+        if self.headers.get('If-None-Match') == etag or (since is not None and snapshot.sequence <= since):
+            self._send(304, None, b'', headers)
+            return
+
+        content_type = ARROW_CONTENT_TYPE if fmt == 'arrow' else 'application/json'
+        self._send(200, content_type, encode_snapshot(snapshot, fmt), headers)
+
+    def _send_json(self, status, payload):
+        self._send(status, 'application/json', json.dumps(payload, default=str).encode('utf-8'))
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+class DataAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, data_manager=None):
+        super().__init__((host, port), DataAPIHandler)
+        self._data_manager = data_manager
+        self._manager_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def data_manager(self):
+        """DataManager for datasets no session has loaded yet, created on first use"""
+        with self._manager_lock:
+            if self._data_manager is None:
+                from data_sources import DataManager
+                self._data_manager = DataManager()
+            return self._data_manager
+
+
+def start_data_api(host='127.0.0.1', port=None):
+    """Start the API on a background thread once per process and return it.
+
+    port defaults to DATA_API_PORT (8502); returns None when disabled or the
+    port is taken, so the UI keeps working either way.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        if port is None:
+            setting = os.environ.get('DATA_API_PORT', str(DEFAULT_PORT)).strip().lower()
+            if setting in ('', 'off', 'false', 'no'):
+                return None
+            port = int(setting)
+        try:
+            _server = DataAPIServer(host, port)
+        except OSError as e:
+            print(f"❌ Data API not started on {host}:{port}: {str(e)}")
+            return None
+        thread = threading.Thread(target=_server.serve_forever, name='data-api', daemon=True)
+        thread.start()
+        print(f"✅ Data API listening on {_server.base_url}/api/datasets")
+        return _server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    server = DataAPIServer(args.host, args.port)
+    print(f"✅ Data API listening on {server.base_url}/api/datasets")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,15 +7,79 @@ import streamlit as st
 import time
 import json
 import os
+import io
 from bs4 import BeautifulSoup
 import yfinance as yf
 import trafilatura
 from nsepy import get_history
 import requests_cache
+from schema import SOURCE_FALLBACK, SOURCE_SAMPLE, compact_records, with_source, with_trade_date
+from snapshots import SNAPSHOTS
+from constituents import CONSTITUENT_FILES, get_constituents
+from rankings import get_rankings
+from fii_dii_history import get_flow_history
+
+# Major Indian indices with yfinance symbols
+INDEX_SYMBOLS = {
+    'NIFTY 50': '^NSEI',
+    'SENSEX': '^BSESN', 
+    'NIFTY BANK': '^NSEBANK',
+    'NIFTY IT': '^CNXIT',
+    'NIFTY PHARMA': '^CNXPHARMA',
+    'NIFTY FMCG': '^CNXFMCG',
+    'NIFTY AUTO': '^CNXAUTO',
+    'NIFTY METAL': '^CNXMETAL',
+    'NIFTY REALTY': '^CNXREALTY',
+    'NIFTY ENERGY': '^CNXENERGY',
+    'NIFTY INFRA': '^CNXINFRA',
+    'NIFTY PSE': '^CNXPSE',
+    'NIFTY PSU BANK': '^CNXPSUBANK',
+    # 'NIFTY PVT BANK': '^CNXPVTBANK',
+    # 'NIFTY FIN SERVICE': '^CNXFINANCE',
+    'NIFTY MEDIA': '^CNXMEDIA',
+    'NIFTY MNC': '^CNXMNC',
+    # 'NIFTY CONSR DURBL': '^CNXCONSUMER',
+    # 'NIFTY OIL & GAS': '^CNXOILGAS',
+    # 'NIFTY COMMODITIES': '^CNXCOMMODITY',
+    # 'NIFTY CONSUMPTION': '^CNXCONSUMPTION',
+    'NIFTY SMALLCAP 100': '^CNXSC',
+    'NIFTY MIDCAP 100': '^CNXM',
+    'NIFTY NEXT 50': '^NSMIDCP'
+}
+
+# Financial news pages scraped for headlines
+NEWS_SOURCES = [
+    'https://www.moneycontrol.com/news/',
+    'https://economictimes.indiatimes.com/markets',
+    'https://www.business-standard.com/markets'
+]
 
 class DataManager:
-    def __init__(self):
-        self.nse_base_url = "https://www.nseindia.com"
+    def __init__(self, transport=None, throttle=True, base_url=None, chart_base_url=None, news_sources=None):
+        """Create a data manager.
+
+        transport: optional requests adapter (see fixtures.py) mounted on the
+        HTTP session; if it also provides get_history/get_info, yfinance calls
+        are routed through it too.
+        throttle: set False to skip rate-limiting sleeps (offline replay).
+        base_url / chart_base_url / news_sources: point NSE, the yfinance chart
+        API and news scraping at another upstream (see standin_server.py).
+        Default to the NSE_BASE_URL, YF_CHART_BASE_URL and NEWS_SOURCE_URLS
+        environment variables, then to the real sites. NSE's file archive
+        (index constituent CSVs) follows base_url when one is given, else
+        NSE_ARCHIVES_URL.
+        """
+        self.transport = transport
+        self.throttle = throttle
+        self.nse_base_url = (base_url or os.environ.get('NSE_BASE_URL') or "https://www.nseindia.com").rstrip('/')
+        self.archives_base_url = (
+            base_url or os.environ.get('NSE_BASE_URL') or os.environ.get('NSE_ARCHIVES_URL')
+            or "https://nsearchives.nseindia.com"
+        ).rstrip('/')
+        self.chart_base_url = (chart_base_url or os.environ.get('YF_CHART_BASE_URL') or '').rstrip('/') or None
+        if news_sources is None and os.environ.get('NEWS_SOURCE_URLS'):
+            news_sources = [url.strip() for url in os.environ['NEWS_SOURCE_URLS'].split(',') if url.strip()]
+        self.news_sources = news_sources or NEWS_SOURCES
         self.screener_url = "https://www.screener.in"
         self.session = requests.Session()
         self.session.headers.update({
@@ -30,6 +94,9 @@ class DataManager:
             'Sec-Fetch-Site': 'same-origin',
             'Upgrade-Insecure-Requests': '1'
         })
+        if transport is not None:
+            self.session.mount('http://', transport)
+            self.session.mount('https://', transport)
         # Initialize session by visiting NSE homepage first
         self._initialize_session()
         
@@ -37,9 +104,58 @@ class DataManager:
         """Initialize session by visiting NSE homepage"""
         try:
             self.session.get(self.nse_base_url, timeout=10)
-            time.sleep(1)
+            self._pause(1)
         except Exception:
             pass
+
+    def _pause(self, seconds):
+        """Sleep between upstream requests unless throttling is disabled"""
+        if self.throttle:
+            time.sleep(seconds)
+
+    def _get_history(self, symbol, period="5d"):
+        """Fetch daily OHLCV history for a yfinance symbol"""
+        if hasattr(self.transport, 'get_history'):
+            return self.transport.get_history(symbol, period)
+        if self.chart_base_url:
+            return self._get_chart_history(symbol, period)
+        return yf.Ticker(symbol).history(period=period)
+
+    def _get_info(self, symbol):
+        """Fetch the yfinance info dict for a symbol"""
+        if hasattr(self.transport, 'get_info'):
+            return self.transport.get_info(symbol)
+        if self.chart_base_url:
+            return {}
+        return yf.Ticker(symbol).info
+
+    def _get_chart_history(self, symbol, period):
+        """Fetch daily history from a yfinance-compatible /v8/finance/chart endpoint"""
+        try:
+            response = self.session.get(
+                f"{self.chart_base_url}/v8/finance/chart/{symbol}",
+                params={'range': period, 'interval': '1d'},
+                timeout=15
+            )
+            if response.status_code != 200:
+                return pd.DataFrame()
+            result = response.json()['chart']['result'][0]
+            quote = result['indicators']['quote'][0]
+            index = pd.to_datetime(result.get('timestamp', []), unit='s', utc=True)
+            timezone = result.get('meta', {}).get('exchangeTimezoneName')
+            if timezone:
+                index = index.tz_convert(timezone)
+            hist = pd.DataFrame({
+                'Open': quote.get('open', []),
+                'High': quote.get('high', []),
+                'Low': quote.get('low', []),
+                'Close': quote.get('close', []),
+                'Volume': quote.get('volume', [])
+            }, index=index.rename('Date'))
+            return hist.dropna(subset=['Close'])
+        except Exception as e:
+            print(f"Failed to fetch chart history for {symbol}: {str(e)}")
+            return pd.DataFrame()
     
     def get_nse_data(self, endpoint, retries=3):
         """Fetch data from NSE with error handling and retries"""
@@ -49,12 +165,15 @@ class DataManager:
                 response = self.session.get(url, timeout=15)
                 if response.status_code == 200:
                     return response.json()
+                elif response.status_code in (401, 403):
+                    # Bot-blocked: refresh cookies from the homepage before retrying
+                    self._initialize_session()
                 else:
-                    time.sleep(2)  # Wait before retry
+                    self._pause(2)  # Wait before retry
             except Exception as e:
                 if attempt == retries - 1:
                     print(f"Failed to fetch NSE data from {endpoint}: {str(e)}")
-                time.sleep(2)
+                self._pause(2)
         return None
     
     def scrape_nse_page(self, url, retries=3):
@@ -64,11 +183,11 @@ class DataManager:
                 response = self.session.get(url, timeout=15)
                 if response.status_code == 200:
                     return BeautifulSoup(response.content, 'html.parser')
-                time.sleep(2)
+                self._pause(2)
             except Exception as e:
                 if attempt == retries - 1:
                     print(f"Failed to scrape NSE page {url}: {str(e)}")
-                time.sleep(2)
+                self._pause(2)
         return None
 
     def get_market_status(self):
@@ -85,8 +204,20 @@ class DataManager:
 
     def get_sector_data(self):
         """Fetch sector-wise performance data from NSE"""
+        sectors = self.get_live_sector_quotes()
+        if sectors is not None:
+            return sectors
+        
+        # Fallback: scrape from screener.in
+        return self._scrape_sector_data_fallback()
+    
+    def get_live_sector_quotes(self):
+        """Sector quotes from NSE's sectoral indices endpoint only; None when it fails.
+
+        The quote feed polls this every few seconds, so it never falls back
+        to the slow yfinance scrape or to generated data.
+        """
         try:
-            # Try API first
             sector_data = self.get_nse_data("equity-stockIndices?index=SECTORAL%20INDICES")
             
             if sector_data and 'data' in sector_data:
@@ -103,16 +234,21 @@ class DataManager:
                         'Volume': sector.get('totalTradedVolume', 0)
                     })
                 
-                df = pd.DataFrame(sectors_list)
-                df['Trend'] = df['Percent_Change'].apply(lambda x: '↑' if x > 0 else '↓' if x < 0 else '→')
-                return df
-            
-            # Fallback: scrape from screener.in
-            return self._scrape_sector_data_fallback()
+                return with_trade_date(compact_records(sectors_list, trend_from='Percent_Change'),
+                                       self._payload_date(sector_data))
+            return None
             
         except Exception as e:
             print(f"Error fetching sector data: {str(e)}")
-            return self._scrape_sector_data_fallback()
+            return None
+
+    def _payload_date(self, payload):
+        """Trade date an NSE payload is stamped with; None when it carries no timestamp"""
+        stamp = payload.get('timestamp') or (payload.get('metadata') or {}).get('timeVal')
+        if not stamp and payload.get('data'):
+            stamp = payload['data'][0].get('lastUpdateTime')
+        day = pd.to_datetime(stamp, dayfirst=True, errors='coerce') if stamp else None
+        return None if day is None or pd.isna(day) else day.date()
     
     def _scrape_sector_data_fallback(self):
         """Get real sector data using yfinance for major Indian indices and individual stocks"""
@@ -233,10 +369,8 @@ class DataManager:
             for name, symbol in sector_symbols.items():
                 try:
                     # Fetch real-time data using yfinance
-                    ticker = yf.Ticker(symbol)
-                    
                     # Get historical data for trend calculation
-                    hist_data = ticker.history(period="5d")
+                    hist_data = self._get_history(symbol, period="5d")
                     
                     if not hist_data.empty:
                         latest = hist_data.iloc[-1]
@@ -246,9 +380,6 @@ class DataManager:
                         change = latest['Close'] - prev['Close']
                         pct_change = (change / prev['Close']) * 100 if prev['Close'] != 0 else 0
                         
-                        # Get current info
-                        info = ticker.info
-                        
                         sectors_list.append({
                             'Industry': name,
                             'Avg_Open': round(latest['Open'], 2),
@@ -257,23 +388,21 @@ class DataManager:
                             'Avg_Low': round(latest['Low'], 2),
                             'Change': round(change, 2),
                             'Percent_Change': round(pct_change, 2),
-                            'Volume': int(latest['Volume']) if latest['Volume'] > 0 else info.get('volume', 0)
+                            'Volume': int(latest['Volume']) if latest['Volume'] > 0 else self._get_info(symbol).get('volume', 0)
                         })
                         
                         print(f"✓ Fetched data for {name}: {pct_change:.2f}%")
                     else:
                         print(f"✗ No data for {name} ({symbol})")
                         
-                    time.sleep(0.3)  # Rate limiting to avoid blocking
+                    self._pause(0.3)  # Rate limiting to avoid blocking
                 except Exception as e:
                     print(f"✗ Error fetching {name}: {str(e)}")
                     continue
             
             if sectors_list:
                 print(f"✓ Successfully fetched {len(sectors_list)} sectors with live data")
-                df = pd.DataFrame(sectors_list)
-                df['Trend'] = df['Percent_Change'].apply(lambda x: '↑' if x > 0 else '↓' if x < 0 else '→')
-                return df
+                return with_source(compact_records(sectors_list, trend_from='Percent_Change'), SOURCE_FALLBACK)
             else:
                 print("⚠ No live data available, using comprehensive fallback")
                 return self._generate_comprehensive_sector_data()
@@ -513,43 +642,47 @@ class DataManager:
                 'Volume': volume
             })
         
-        df = pd.DataFrame(sectors_list)
-        df['Trend'] = df['Percent_Change'].apply(lambda x: '↑' if x > 0 else '↓' if x < 0 else '→')
-        return df
+        return with_source(compact_records(sectors_list, trend_from='Percent_Change'), SOURCE_SAMPLE)
     
     def get_sector_stocks(self, sector_name):
-        """Get real stocks within a specific sector using yfinance"""
+        """Quotes for a sector's constituents.
+
+        Members come from the constituent master and quotes from the shared
+        universe snapshot, so a drill-down costs no extra upstream calls;
+        members missing from it are fetched one by one from daily history.
+        """
         try:
-            # Comprehensive mapping of sectors to actual Indian stock symbols
-            sector_stocks_map = {
-                'NIFTY IT': ['TCS.NS', 'INFY.NS', 'HCLTECH.NS', 'WIPRO.NS', 'TECHM.NS', 'LTTS.NS', 'MINDTREE.NS', 'MPHASIS.NS', 'LTIM.NS', 'COFORGE.NS'],
-                'NIFTY BANK': ['HDFCBANK.NS', 'ICICIBANK.NS', 'KOTAKBANK.NS', 'SBIN.NS', 'AXISBANK.NS', 'INDUSINDBK.NS', 'BANDHANBNK.NS', 'FEDERALBNK.NS', 'IDFCFIRSTB.NS', 'PNB.NS'],
-                'NIFTY PHARMA': ['SUNPHARMA.NS', 'DRREDDY.NS', 'CIPLA.NS', 'DIVISLAB.NS', 'BIOCON.NS', 'CADILAHC.NS', 'GLENMARK.NS', 'LUPIN.NS', 'TORNTPHARM.NS', 'ALKEM.NS'],
-                'NIFTY AUTO': ['MARUTI.NS', 'TATAMOTORS.NS', 'M&M.NS', 'BAJAJ-AUTO.NS', 'HEROMOTOCO.NS', 'TVSMOTORS.NS', 'EICHERMOT.NS', 'ASHOKLEY.NS', 'ESCORTS.NS', 'BALKRISIND.NS'],
-                'NIFTY FMCG': ['HINDUNILVR.NS', 'ITC.NS', 'NESTLEIND.NS', 'BRITANNIA.NS', 'DABUR.NS', 'MARICO.NS', 'GODREJCP.NS', 'COLPAL.NS', 'UBL.NS', 'TATACONSUM.NS'],
-                
-                # Individual companies (already with .NS)
-                'Reliance Industries': ['RELIANCE.NS', 'RIL.NS'],
-                'Tata Consultancy Services': ['TCS.NS'],
-                'HDFC Bank': ['HDFCBANK.NS'],
-                'Infosys': ['INFY.NS']
-            }
+            symbols = get_constituents(self).symbols(sector_name)
             
-            # Get real stocks for the sector
-            stock_symbols = sector_stocks_map.get(sector_name, [])
-            
-            if not stock_symbols:
-                print(f"No stock mapping found for sector: {sector_name}")
+            if len(symbols) == 0:
+                print(f"No constituents found for sector: {sector_name}")
                 return pd.DataFrame()
             
             stocks_data = []
+            universe = SNAPSHOTS.get_or_fetch('universe_quotes', self.get_universe_quotes)
+            if universe.frame is not None and not universe.frame.empty:
+                quotes = universe.take(universe.rows(universe.frame['Symbol'].astype(str).isin(symbols)))
+                stocks_data = pd.DataFrame({
+                    'Symbol': quotes['Symbol'].astype(str),
+                    'Current_Price': quotes['Last_Price'],
+                    'Change': quotes['Change'],
+                    'Percent_Change': quotes['Percent_Change'],
+                    'Volume': quotes['Volume'],
+                    'High': quotes['High'],
+                    'Low': quotes['Low']
+                }).to_dict('records')
+                symbols = symbols[~np.isin(symbols, quotes['Symbol'].astype(str).to_numpy())]
+            
+            stock_symbols = [f"{symbol}.NS" for symbol in symbols]
+            if not stock_symbols:
+                return compact_records(stocks_data)
+            
             print(f"Fetching real stock data for {sector_name}...")
             
             for symbol in stock_symbols:
                 try:
                     # Fetch real-time data using yfinance
-                    ticker = yf.Ticker(symbol)
-                    hist_data = ticker.history(period="5d")
+                    hist_data = self._get_history(symbol, period="5d")
                     
                     if not hist_data.empty:
                         latest = hist_data.iloc[-1]
@@ -576,14 +709,14 @@ class DataManager:
                     else:
                         print(f"✗ No data for {symbol}")
                         
-                    time.sleep(0.1)  # Rate limiting
+                    self._pause(0.1)  # Rate limiting
                 except Exception as e:
                     print(f"✗ Error fetching {symbol}: {str(e)}")
                     continue
             
             if stocks_data:
                 print(f"✓ Successfully fetched {len(stocks_data)} stocks for {sector_name}")
-                return pd.DataFrame(stocks_data)
+                return compact_records(stocks_data)
             else:
                 print(f"⚠ No real data available for {sector_name}")
                 return pd.DataFrame()
@@ -592,24 +725,17 @@ class DataManager:
             print(f"Error fetching sector stocks: {str(e)}")
             return pd.DataFrame()
 
-    def get_top_gainers_losers(self):
-        """Get top gainers and losers from NSE"""
+    def get_top_gainers_losers(self, universe='F&O', window='1D', k=10):
+        """Top and bottom k movers of a universe, from the shared ranking book"""
         try:
-            # Try NSE API first
-            gainers = self.get_nse_data("equity-stockIndices?index=SECURITIES%20IN%20F%26O")
+            book = get_rankings(self)
             
-            if gainers and 'data' in gainers:
-                stocks = gainers['data'][:50]  # Take first 50 stocks
-                df = pd.DataFrame(stocks)
-                
-                if not df.empty:
-                    # Sort by percentage change
-                    df = df.sort_values('pChange', ascending=False)
-                    
-                    top_gainers = df.head(10)[['symbol', 'lastPrice', 'change', 'pChange']]
-                    top_losers = df.tail(10)[['symbol', 'lastPrice', 'change', 'pChange']]
-                    
-                    return top_gainers, top_losers
+            if book is not None:
+                top_gainers, top_losers = book.rank(universe, window, k)
+                if not top_gainers.empty:
+                    columns = {'Symbol': 'symbol', 'Last_Price': 'lastPrice', 'Change': 'change', 'Return': 'pChange'}
+                    return (top_gainers[list(columns)].rename(columns=columns),
+                            top_losers[list(columns)].rename(columns=columns))
             
             # Fallback: generate sample data
             return self._generate_sample_gainers_losers()
@@ -661,43 +787,23 @@ class DataManager:
 
     def get_index_data(self):
         """Fetch major indices data using yfinance for accurate real-time data"""
+        indices = self.get_live_index_quotes()
+        if indices is not None:
+            return indices
+        print("⚠ No live indices data available, using fallback")
+        return with_source(compact_records(self._generate_sample_indices_data(), trend_from='Percent_Change'), SOURCE_SAMPLE)
+    
+    def get_live_index_quotes(self):
+        """Index quotes from daily charts only; None when none could be fetched (no sample data)"""
         try:
-            # Major Indian indices with yfinance symbols
-            indices_symbols = {
-                'NIFTY 50': '^NSEI',
-                'SENSEX': '^BSESN', 
-                'NIFTY BANK': '^NSEBANK',
-                'NIFTY IT': '^CNXIT',
-                'NIFTY PHARMA': '^CNXPHARMA',
-                'NIFTY FMCG': '^CNXFMCG',
-                'NIFTY AUTO': '^CNXAUTO',
-                'NIFTY METAL': '^CNXMETAL',
-                'NIFTY REALTY': '^CNXREALTY',
-                'NIFTY ENERGY': '^CNXENERGY',
-                'NIFTY INFRA': '^CNXINFRA',
-                'NIFTY PSE': '^CNXPSE',
-                'NIFTY PSU BANK': '^CNXPSUBANK',
-                # 'NIFTY PVT BANK': '^CNXPVTBANK',
-                # 'NIFTY FIN SERVICE': '^CNXFINANCE',
-                'NIFTY MEDIA': '^CNXMEDIA',
-                'NIFTY MNC': '^CNXMNC',
-                # 'NIFTY CONSR DURBL': '^CNXCONSUMER',
-                # 'NIFTY OIL & GAS': '^CNXOILGAS',
-                # 'NIFTY COMMODITIES': '^CNXCOMMODITY',
-                # 'NIFTY CONSUMPTION': '^CNXCONSUMPTION',
-                'NIFTY SMALLCAP 100': '^CNXSC',
-                'NIFTY MIDCAP 100': '^CNXM',
-                'NIFTY NEXT 50': '^NSMIDCP'
-            }
-            
             indices_list = []
+            sessions = []
             print("Fetching live indices data...")
             
-            for name, symbol in indices_symbols.items():
+            for name, symbol in INDEX_SYMBOLS.items():
                 try:
                     # Fetch real-time data using yfinance
-                    ticker = yf.Ticker(symbol)
-                    hist_data = ticker.history(period="5d")
+                    hist_data = self._get_history(symbol, period="5d")
                     
                     if not hist_data.empty:
                         latest = hist_data.iloc[-1]
@@ -718,28 +824,27 @@ class DataManager:
                             'Volume': int(latest['Volume']) if latest['Volume'] > 0 else 0,
                             'Symbol': symbol
                         })
+                        session = pd.Timestamp(latest.name)
+                        sessions.append((session.tz_convert('Asia/Kolkata') if session.tzinfo else session).date())
                         
                         print(f"✓ Fetched data for {name}: {latest['Close']:.2f} ({pct_change:+.2f}%)")
                     else:
                         print(f"✗ No data for {name}")
                         
-                    time.sleep(0.2)  # Rate limiting
+                    self._pause(0.2)  # Rate limiting
                 except Exception as e:
                     print(f"✗ Error fetching {name}: {str(e)}")
                     continue
             
             if indices_list:
                 print(f"✓ Successfully fetched {len(indices_list)} indices with live data")
-                df = pd.DataFrame(indices_list)
-                df['Trend'] = df['Percent_Change'].apply(lambda x: '↑' if x > 0 else '↓' if x < 0 else '→')
-                return df
-            else:
-                print("⚠ No live indices data available, using fallback")
-                return self._generate_sample_indices_data()
+                # The session of the latest daily bar, so holidays don't repeat it as a new day
+                return with_trade_date(compact_records(indices_list, trend_from='Percent_Change'), max(sessions))
+            return None
                 
         except Exception as e:
             print(f"Error fetching indices data: {str(e)}")
-            return self._generate_sample_indices_data()
+            return None
         
         # Try NSE API first (keeping original as secondary fallback)
         indices_data = self._get_nse_indices_data()
@@ -779,7 +884,7 @@ class DataManager:
                         'Low': index_info.get('low', 0),
                         'Volume': index_info.get('totalTradedVolume', 0)
                     })
-                time.sleep(0.5)  # Rate limiting
+                self._pause(0.5)  # Rate limiting
                 
             except Exception as e:
                 print(f"Could not fetch NSE data for {index}: {str(e)}")
@@ -805,8 +910,7 @@ class DataManager:
         
         for name, symbol in indices_map.items():
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period='2d')
+                data = self._get_history(symbol, period='2d')
                 
                 if not data.empty:
                     latest = data.iloc[-1]
@@ -826,7 +930,7 @@ class DataManager:
                         'Volume': latest['Volume']
                     })
                 
-                time.sleep(0.3)  # Rate limiting
+                self._pause(0.3)  # Rate limiting
                 
             except Exception as e:
                 print(f"Could not fetch yfinance data for {name}: {str(e)}")
@@ -858,7 +962,7 @@ class DataManager:
             
             indices_data.append({
                 'Index': name,
-                'Price': current_price,
+                'Last_Price': current_price,
                 'Change': change,
                 'Percent_Change': change_pct,
                 'Open': current_price * 0.998,
@@ -888,7 +992,7 @@ class DataManager:
                         'Market_Cap': stock.get('lastPrice', 0) * 1000000  # Approximate
                     })
                 
-                return pd.DataFrame(heatmap_data)
+                return compact_records(heatmap_data)
             
             # Fallback: generate sample heatmap data
             return self._generate_sample_heatmap_data()
@@ -897,6 +1001,75 @@ class DataManager:
             print(f"Error fetching heatmap data: {str(e)}")
             return self._generate_sample_heatmap_data()
     
+    def get_universe_quotes(self):
+        """Bulk quotes for the whole NSE equity universe (NIFTY TOTAL MARKET) in one call.
+
+        Returns an empty DataFrame when NSE is unavailable; breadth over
+        made-up quotes would be misleading, so there is no sample fallback.
+        """
+        return self._get_stock_quotes("NIFTY%20TOTAL%20MARKET", "universe")
+    
+    def get_fno_quotes(self):
+        """Bulk quotes for the F&O securities in one call (empty when NSE is unavailable)"""
+        return self._get_stock_quotes("SECURITIES%20IN%20F%26O", "F&O")
+    
+    def _get_stock_quotes(self, index, label):
+        """Stock rows of an equity-stockIndices payload with the shared dtype schema"""
+        try:
+            data = self.get_nse_data(f"equity-stockIndices?index={index}")
+            
+            if data and 'data' in data:
+                quotes = []
+                for stock in data['data']:
+                    # The first row of a named index is the index itself
+                    if stock.get('priority') == 1:
+                        continue
+                    quotes.append({
+                        'Symbol': stock.get('symbol', 'N/A'),
+                        'Industry': (stock.get('meta') or {}).get('industry'),
+                        'Last_Price': stock.get('lastPrice', 0),
+                        'Previous_Close': stock.get('previousClose', 0),
+                        'Open': stock.get('open', 0),
+                        'High': stock.get('dayHigh', 0),
+                        'Low': stock.get('dayLow', 0),
+                        'Change': stock.get('change', 0),
+                        'Percent_Change': stock.get('pChange', 0),
+                        'Volume': stock.get('totalTradedVolume', 0),
+                        'Year_High': stock.get('yearHigh'),
+                        'Year_Low': stock.get('yearLow'),
+                        'FFMC': stock.get('ffmc')
+                    })
+                
+                print(f"✓ Fetched {label} quotes for {len(quotes)} stocks")
+                return with_trade_date(compact_records(quotes, trend_from='Percent_Change'), self._payload_date(data))
+            
+            print(f"⚠ {label.capitalize()} quotes unavailable")
+            return pd.DataFrame()
+            
+        except Exception as e:
+            print(f"Error fetching {label} quotes: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_index_constituents(self, index_name):
+        """Members of an NSE index from its constituent CSV (Symbol, Company, Industry, ISIN)"""
+        filename = CONSTITUENT_FILES.get(index_name)
+        if filename is None:
+            return pd.DataFrame()
+        try:
+            response = self.session.get(f"{self.archives_base_url}/content/indices/{filename}", timeout=15)
+            if response.status_code != 200:
+                print(f"✗ No constituent list for {index_name} ({response.status_code})")
+                return pd.DataFrame()
+            members = pd.read_csv(io.StringIO(response.text))
+            members.columns = members.columns.str.strip()
+            members = members.rename(columns={'Company Name': 'Company', 'ISIN Code': 'ISIN'})
+            if 'Series' in members:
+                members = members[members['Series'].astype(str).str.strip() == 'EQ']
+            return members.reindex(columns=['Symbol', 'Company', 'Industry', 'ISIN'])
+        except Exception as e:
+            print(f"Error fetching constituents for {index_name}: {str(e)}")
+            return pd.DataFrame()
+    
     def _generate_sample_heatmap_data(self):
         """Generate sample heatmap data"""
         top_stocks = [
@@ -925,22 +1098,24 @@ class DataManager:
                 'Market_Cap': market_cap
             })
         
-        return pd.DataFrame(heatmap_data)
+        return with_source(compact_records(heatmap_data), SOURCE_SAMPLE)
 
     def get_fii_dii_data(self):
-        """Fetch FII/DII flow data"""
+        """Fetch FII/DII flow data; live figures are also added to the flow history"""
         try:
             # Try to get FII/DII data from NSE
             data = self.get_nse_data("fiidiiTradeReact")
             
             if data:
-                return {
-                    'FII_Inflow': data.get('fiiInflow', 0),
-                    'FII_Outflow': data.get('fiiOutflow', 0),
-                    'DII_Inflow': data.get('diiInflow', 0),
-                    'DII_Outflow': data.get('diiOutflow', 0),
-                    'Date': datetime.now().strftime('%Y-%m-%d')
-                }
+                flows, trade_date = self._parse_fii_dii(data)
+                try:
+                    # Only figures that carry their own trade date are stored; an
+                    # undated payload may still be the previous session's flows
+                    if trade_date is not None and trade_date.weekday() < 5:
+                        get_flow_history().record(trade_date, flows)
+                except Exception as e:
+                    print(f"Could not save FII/DII history: {str(e)}")
+                return flows
             
             # Generate realistic sample data
             return self._generate_sample_fii_dii_data()
@@ -949,6 +1124,30 @@ class DataManager:
             print(f"FII/DII data temporarily unavailable: {str(e)}")
             return self._generate_sample_fii_dii_data()
     
+    def _parse_fii_dii(self, data):
+        """(flows dict, trade date or None) from NSE's per-category rows or a flat inflow/outflow dict"""
+        if isinstance(data, list):
+            # [{'category': 'FII/FPI *', 'date': '17-Oct-2025', 'buyValue': ..., 'sellValue': ...}, ...]
+            rows = {('FII' if 'FII' in str(row.get('category', '')).upper() else 'DII'): row for row in data}
+            trade_date = pd.to_datetime(next(iter(rows.values())).get('date'), format='%d-%b-%Y', errors='coerce')
+            flows = {
+                'FII_Inflow': float(rows.get('FII', {}).get('buyValue', 0)),
+                'FII_Outflow': float(rows.get('FII', {}).get('sellValue', 0)),
+                'DII_Inflow': float(rows.get('DII', {}).get('buyValue', 0)),
+                'DII_Outflow': float(rows.get('DII', {}).get('sellValue', 0)),
+            }
+        else:
+            trade_date = pd.to_datetime(data.get('date'), dayfirst=True, errors='coerce')
+            flows = {
+                'FII_Inflow': data.get('fiiInflow', 0),
+                'FII_Outflow': data.get('fiiOutflow', 0),
+                'DII_Inflow': data.get('diiInflow', 0),
+                'DII_Outflow': data.get('diiOutflow', 0),
+            }
+        trade_date = None if pd.isna(trade_date) else trade_date
+        flows['Date'] = (trade_date if trade_date is not None else datetime.now()).strftime('%Y-%m-%d')
+        return flows, trade_date
+    
     def _generate_sample_fii_dii_data(self):
         """Generate realistic FII/DII sample data"""
         np.random.seed(42)
@@ -990,15 +1189,9 @@ class DataManager:
     def _scrape_financial_news(self):
         """Scrape news from financial websites"""
         try:
-            news_sources = [
-                'https://www.moneycontrol.com/news/',
-                'https://economictimes.indiatimes.com/markets',
-                'https://www.business-standard.com/markets'
-            ]
-            
             all_news = []
             
-            for source_url in news_sources:
+            for source_url in self.news_sources:
                 try:
                     response = self.session.get(source_url, timeout=10)
                     if response.status_code == 200:
@@ -1019,7 +1212,7 @@ class DataManager:
                                     'description': text[:150] + '...'
                                 })
                     
-                    time.sleep(1)  # Rate limiting
+                    self._pause(1)  # Rate limiting
                 except Exception:
                     continue
             
@@ -1202,16 +1395,7 @@ class DataManager:
             st.session_state.last_update = datetime.now(pytz.timezone('Asia/Kolkata'))
             
             # Refresh cached data
-            if 'sector_data' in st.session_state:
-                del st.session_state.sector_data
-            if 'index_data' in st.session_state:
-                del st.session_state.index_data
-            if 'news_data' in st.session_state:
-                del st.session_state.news_data
-            if 'heatmap_data' in st.session_state:
-                del st.session_state.heatmap_data
-            if 'fii_dii_data' in st.session_state:
-                del st.session_state.fii_dii_data
+            SNAPSHOTS.invalidate()
             
             return True
             
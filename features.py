@@ -0,0 +1,160 @@
+"""Precomputed per-stock feature table and boolean-mask screens over it.
+
+One row per stock in the universe snapshot, built once per snapshot from
+data other modules already keep warm:
+
+    quotes        Symbol, Industry, Last_Price, Percent_Change, Volume, FFMC
+    indicators    SMA_20, SMA_50, EMA_20, RSI_14, ATR_14, MACD_Hist, VWAP_20
+                  (indicators.py), Relative_Volume = Volume / Avg_Volume_20
+    rankings      Return_1W, Return_1M (rankings.py) and Rank_1D / _1W / _1M,
+                  the percentile of each return in the universe (100 = best)
+
+A screen is a tuple of conditions, each a hashable tuple:
+
+    ('above', 'Last_Price', 'SMA_50')      column > column
+    ('below', 'Last_Price', 'SMA_20')      column < column
+    ('between', 'RSI_14', 30, 70)          lo <= column <= hi
+    ('at_least', 'Relative_Volume', 2)     column >= value
+    ('member', 'NIFTY IT')                 index or industry membership
+
+Each condition becomes one boolean mask over the feature arrays; masks and
+whole screens are memoized on the Screener, which lives as long as its
+feature snapshot, so repeating a screen or changing one condition costs a
+dictionary lookup plus one vectorized comparison.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from constituents import get_constituents
+from indicators import get_indicators
+from price_history import get_price_history
+from rankings import WINDOWS, get_rankings
+from snapshots import SNAPSHOTS
+
+QUOTE_FEATURES = ['Symbol', 'Industry', 'Last_Price', 'Percent_Change', 'Volume', 'FFMC']
+INDICATOR_FEATURES = ['SMA_20', 'SMA_50', 'EMA_20', 'RSI_14', 'ATR_14', 'MACD_Hist', 'VWAP_20']
+OPERATORS = ('above', 'below', 'between', 'at_least', 'member')
+
+
+def build_features(quotes, indicators, book):
+    """Feature DataFrame aligned to quotes' rows"""
+    features = quotes.reindex(columns=QUOTE_FEATURES).copy()
+    symbols = features['Symbol'].astype(str).to_numpy()
+    if indicators is not None:
+        aligned = indicators.set_index('Symbol').reindex(symbols)
+        for column in INDICATOR_FEATURES:
+            features[column] = aligned[column].to_numpy(dtype='float32')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            relative = features['Volume'].to_numpy(dtype='float64') / aligned['Avg_Volume_20'].to_numpy(dtype='float64')
+        features['Relative_Volume'] = np.where(np.isfinite(relative), relative, np.nan).astype('float32')
+    else:
+        for column in INDICATOR_FEATURES + ['Relative_Volume']:
+            features[column] = np.float32(np.nan)
+
+    returns = {
+        window: book.returns(window) if book is not None else np.full(len(features), np.nan) for window in WINDOWS
+    }
+    for window, values in returns.items():
+        if window != '1D':
+            features[f'Return_{window}'] = values.astype('float32')
+    for window, values in returns.items():
+        features[f'Rank_{window}'] = (pd.Series(values).rank(pct=True) * 100).to_numpy(dtype='float32')
+    return features
+
+
+class Screener:
+    """Memoized screens over one feature snapshot"""
+
+    def __init__(self, snapshot, data_manager=None):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.data_manager = data_manager
+        frame = snapshot.frame
+        self.symbols = frame['Symbol'].astype(str).to_numpy()
+        self._arrays = {
+            column: frame[column].to_numpy(dtype='float64')
+            for column in frame.columns if column not in ('Symbol', 'Industry')
+        }
+        self._masks = {}
+        self._screens = {}
+        self._lock = threading.Lock()
+
+    def columns(self):
+        """Numeric feature columns conditions may refer to"""
+        return list(self._arrays)
+
+    def mask(self, condition):
+        """Boolean mask of one condition (NaN features never match)"""
+        with self._lock:
+            cached = self._masks.get(condition)
+        if cached is not None:
+            return cached
+        operator, *args = condition
+        with np.errstate(invalid='ignore'):
+            if operator == 'above':
+                mask = self._arrays[args[0]] > self._arrays[args[1]]
+            elif operator == 'below':
+                mask = self._arrays[args[0]] < self._arrays[args[1]]
+            elif operator == 'between':
+                values = self._arrays[args[0]]
+                mask = (values >= args[1]) & (values <= args[2])
+            elif operator == 'at_least':
+                mask = self._arrays[args[0]] >= args[1]
+            elif operator == 'member':
+                mask = np.isin(self.symbols, get_constituents(self.data_manager).symbols(args[0]))
+            else:
+                raise ValueError(f"Unknown screen operator {operator!r}; expected one of {OPERATORS}")
+        with self._lock:
+            self._masks[condition] = mask
+        return mask
+
+    def screen(self, conditions, sort_by='Percent_Change', ascending=False):
+        """Row positions matching every condition, ordered by sort_by (NaNs last)"""
+        key = (tuple(conditions), sort_by, ascending)
+        with self._lock:
+            cached = self._screens.get(key)
+        if cached is not None:
+            return cached
+        mask = np.ones(len(self.symbols), dtype=bool)
+        for condition in conditions:
+            mask &= self.mask(condition)
+        rows = np.flatnonzero(mask)
+        values = self._arrays[sort_by][rows]
+        order = np.argsort(values if ascending else -values, kind='stable')
+        rows = rows[order]
+        with self._lock:
+            self._screens[key] = rows
+        return rows
+
+
+_screener = None
+_screener_key = None
+_features_lock = threading.Lock()
+
+
+def get_screener(data_manager):
+    """Screener over the current feature snapshot, or None when quotes are unavailable.
+
+    Features are rebuilt only when the universe, indicator or close-history
+    snapshot they are built from changes.
+    """
+    global _screener, _screener_key
+    universe = SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if universe.frame is None or universe.frame.empty:
+        return None
+    # One universe snapshot for everything: a refresh in between would misalign the rows
+    indicators = get_indicators(data_manager, universe)
+    book = get_rankings(data_manager, universe)
+    master = get_constituents(data_manager)
+    key = (universe.version, getattr(indicators, 'version', None), get_price_history().revision,
+           master.loaded_on, len(master))
+
+    with _features_lock:
+        if _screener is not None and _screener_key == key:
+            return _screener
+        features = build_features(universe.frame, indicators.frame if indicators is not None else None, book)
+        _screener = Screener(SNAPSHOTS.publish('screener_features', features), data_manager)
+        _screener_key = key
+        return _screener
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Process-wide LRU of built Plotly figures, shared by all sessions.
+# st.plotly_chart serializes a copy of the figure, so sharing is read-only.
+MAX_FIGURES = 256
+_figures = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def data_version(data):
+    """Content fingerprint of a DataFrame, dict or list"""
+    digest = hashlib.blake2b(digest_size=12)
+    if isinstance(data, pd.DataFrame):
+        digest.update(json.dumps([str(c) for c in data.columns]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def cached_figure(name, version, params, build):
+    """Return the figure for (name, version, params), building it at most once.
+
+    version should identify the input data (e.g. Snapshot.version) and params
+    every widget value the figure depends on; build() is only called on a miss.
+    """
+    key = (name, version, _freeze(params))
+    with _lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            _stats['hits'] += 1
+            return _figures[key]
+        _stats['misses'] += 1
+
+    figure = build()
+    with _lock:
+        _figures[key] = figure
+        _figures.move_to_end(key)
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+    return figure
+
+
+def figure_cache_stats():
+    with _lock:
+        return dict(_stats, size=len(_figures))
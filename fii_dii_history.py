@@ -0,0 +1,141 @@
+"""Daily FII/DII cash-market flows kept as a persistent time series.
+
+Every live fetch (DataManager.get_fii_dii_data) upserts that trading day's
+inflows and outflows, in ₹ crore, into a parquet file in SECTORR_DATA_DIR.
+Sample data is never recorded. Derived columns are computed once per write,
+not per page view:
+
+    FII_Net / DII_Net / Total_Net          daily net flow
+    FII_Net_5 / _20 / _60 (and DII_...)    rolling sums over 5/20/60 sessions
+    FII_Cumulative / DII_Cumulative        running net flow
+    FII_Streak / DII_Streak                consecutive buying (+n) or selling (-n) sessions
+
+Older history can be backfilled once from a CSV (a file path or URL) with a
+Date column and either inflow/outflow or net columns:
+
+    python fii_dii_history.py --backfill flows.csv
+"""
+import argparse
+import threading
+
+import numpy as np
+import pandas as pd
+
+from price_history import data_path, read_parquet, write_parquet
+
+FLOW_COLUMNS = ['FII_Inflow', 'FII_Outflow', 'DII_Inflow', 'DII_Outflow']
+ROLLING_WINDOWS = (5, 20, 60)
+
+
+def _streak(net):
+    """Signed length of the current run of same-signed flows at each row"""
+    sign = np.sign(net)
+    runs = (sign != sign.shift()).cumsum()
+    return (sign * (sign.groupby(runs).cumcount() + 1)).astype('int32')
+
+
+def derive_flows(flows):
+    """Flow history with net, rolling, cumulative and streak columns"""
+    derived = flows.copy()
+    for side in ('FII', 'DII'):
+        net = derived[f'{side}_Inflow'] - derived[f'{side}_Outflow']
+        derived[f'{side}_Net'] = net
+        for window in ROLLING_WINDOWS:
+            derived[f'{side}_Net_{window}'] = net.rolling(window, min_periods=1).sum()
+        derived[f'{side}_Cumulative'] = net.cumsum()
+        derived[f'{side}_Streak'] = _streak(net)
+    derived['Total_Net'] = derived['FII_Net'] + derived['DII_Net']
+    return derived
+
+
+class FlowHistory:
+    """Date-indexed FII/DII flows with precomputed aggregates"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path('fii_dii_history.parquet')
+        self._lock = threading.Lock()
+        flows = read_parquet(self.path)
+        if flows is None:
+            flows = pd.DataFrame(columns=FLOW_COLUMNS, dtype='float64')
+        flows.index = pd.DatetimeIndex(flows.index, name='Date')
+        self.revision = 0
+        self._set(flows)
+
+    def _set(self, flows):
+        self._flows = flows.sort_index()
+        self._derived = derive_flows(self._flows)
+        self.revision += 1
+
+    def __len__(self):
+        return len(self._flows)
+
+    def record(self, date, flows):
+        """Upsert one day's flows (a dict with the FLOW_COLUMNS keys)"""
+        entry = pd.DataFrame(
+            [[float(flows[column]) for column in FLOW_COLUMNS]],
+            index=pd.DatetimeIndex([pd.Timestamp(date).normalize()], name='Date'),
+            columns=FLOW_COLUMNS
+        )
+        with self._lock:
+            current = self._flows.drop(index=entry.index, errors='ignore')
+            self._set(entry if current.empty else pd.concat([current, entry]))
+            write_parquet(self._flows, self.path)
+
+    def backfill(self, flows):
+        """Merge older flows in; days already recorded keep their values"""
+        flows = flows.reindex(columns=FLOW_COLUMNS).astype('float64')
+        flows.index = pd.DatetimeIndex(flows.index, name='Date').normalize()
+        with self._lock:
+            merged = self._flows.combine_first(flows) if not self._flows.empty else flows
+            self._set(merged[FLOW_COLUMNS])
+            write_parquet(self._flows, self.path)
+        return len(flows)
+
+    def frame(self, sessions=None):
+        """Derived history, optionally only the last `sessions` rows (shared; do not modify)"""
+        with self._lock:
+            derived = self._derived
+        return derived if sessions is None else derived.iloc[-sessions:]
+
+
+def read_flow_csv(source):
+    """Flows from a CSV with Date plus inflow/outflow (or FII_Net/DII_Net) columns"""
+    flows = pd.read_csv(source)
+    flows.columns = flows.columns.str.strip()
+    flows = flows.set_index(pd.to_datetime(flows.pop('Date'), dayfirst=True))
+    for side in ('FII', 'DII'):
+        if f'{side}_Inflow' not in flows and f'{side}_Net' in flows:
+            # Net-only sources: book the net as a one-sided flow
+            net = flows[f'{side}_Net'].astype('float64')
+            flows[f'{side}_Inflow'] = net.clip(lower=0)
+            flows[f'{side}_Outflow'] = (-net).clip(lower=0)
+    return flows[FLOW_COLUMNS]
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_flow_history():
+    """Process-wide FlowHistory, loaded from disk on first use"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = FlowHistory()
+        return _history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backfill', metavar='CSV', help="merge flows from a CSV file or URL")
+    args = parser.parse_args()
+
+    history = get_flow_history()
+    if args.backfill:
+        count = history.backfill(read_flow_csv(args.backfill))
+        print(f"✓ Backfilled {count} days of FII/DII flows")
+    print(f"{len(history)} days of FII/DII flows in {history.path}")
+
+
+if __name__ == '__main__':
+    main()
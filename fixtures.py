@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from constituents import CONSTITUENT_FILES
+from data_sources import INDEX_SYMBOLS, NEWS_SOURCES
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'upstream')
+
+
+def fixture_name(method, url):
+    """Build a stable, readable file name for a request"""
+    parts = urlsplit(url)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', f"{parts.netloc}{parts.path}").strip('_')[:80]
+    digest = hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()[:10]
+    return f"{slug}_{digest}.json"
+
+
+def history_name(symbol, period):
+    """File name for a recorded yfinance history frame"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', f"{symbol}_{period}").strip('_') + '.csv'
+
+
+def prepared_url(url):
+    """Return the URL exactly as requests will send it"""
+    return requests.Request('GET', url).prepare().url
+
+
+class RecordingTransport(HTTPAdapter):
+    """HTTP adapter that performs real requests and saves every response.
+
+    Mount it on a DataManager with DataManager(transport=RecordingTransport(dir));
+    yfinance history/info calls are captured through get_history/get_info.
+    """
+
+    def __init__(self, fixture_dir=DEFAULT_FIXTURE_DIR):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        os.makedirs(os.path.join(fixture_dir, 'http'), exist_ok=True)
+        os.makedirs(os.path.join(fixture_dir, 'history'), exist_ok=True)
+        os.makedirs(os.path.join(fixture_dir, 'info'), exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        try:
+            record = {
+                'method': request.method,
+                'url': request.url,
+                'status': response.status_code,
+                'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+                'body': response.content.decode(response.encoding or 'utf-8', errors='replace')
+            }
+            path = os.path.join(self.fixture_dir, 'http', fixture_name(request.method, request.url))
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+        except Exception as e:
+            print(f"✗ Could not record {request.url}: {str(e)}")
+        return response
+
+    def get_history(self, symbol, period):
+        hist = yf.Ticker(symbol).history(period=period)
+        hist.to_csv(os.path.join(self.fixture_dir, 'history', history_name(symbol, period)))
+        return hist
+
+    def get_info(self, symbol):
+        info = yf.Ticker(symbol).info
+        path = os.path.join(self.fixture_dir, 'info', history_name(symbol, 'info').replace('.csv', '.json'))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, default=str)
+        return info
+
+
+class ReplayTransport(BaseAdapter):
+    """HTTP adapter that serves recorded fixtures and never touches the network.
+
+    Requests without a fixture get an empty 404 response, which DataManager
+    treats like any other upstream failure.
+    """
+
+    def __init__(self, fixture_dir=DEFAULT_FIXTURE_DIR):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.misses = []
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        path = os.path.join(self.fixture_dir, 'http', fixture_name(request.method, request.url))
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                record = json.load(f)
+            response.status_code = record['status']
+            response.headers = CaseInsensitiveDict(record.get('headers', {}))
+            response._content = record['body'].encode('utf-8')
+        else:
+            self.misses.append(request.url)
+            response.status_code = 404
+            response.headers = CaseInsensitiveDict()
+            response._content = b''
+        return response
+
+    def close(self):
+        pass
+
+    def get_history(self, symbol, period):
+        path = os.path.join(self.fixture_dir, 'history', history_name(symbol, period))
+        if not os.path.exists(path):
+            self.misses.append(f"history:{symbol}:{period}")
+            return pd.DataFrame()
+        return pd.read_csv(path, index_col=0)
+
+    def get_info(self, symbol):
+        path = os.path.join(self.fixture_dir, 'info', history_name(symbol, 'info').replace('.csv', '.json'))
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def record_fixtures(fixture_dir=DEFAULT_FIXTURE_DIR):
+    """Hit the live upstreams once through a RecordingTransport"""
+    from data_sources import DataManager
+
+    manager = DataManager(transport=RecordingTransport(fixture_dir))
+    manager.get_market_status()
+    manager.get_sector_data()
+    manager.get_top_gainers_losers()
+    manager.get_market_heatmap_data()
+    manager.get_index_data()
+    manager.get_fii_dii_data()
+    manager._scrape_financial_news()
+    print(f"✓ Recorded fixtures to {fixture_dir}")
+    return fixture_dir
+
+
+def _write_http_fixture(fixture_dir, url, payload, status=200, content_type='application/json'):
+    url = prepared_url(url)
+    body = json.dumps(payload) if content_type == 'application/json' else payload
+    record = {
+        'method': 'GET',
+        'url': url,
+        'status': status,
+        'headers': {'Content-Type': content_type},
+        'body': body
+    }
+    with open(os.path.join(fixture_dir, 'http', fixture_name('GET', url)), 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+
+
+def nse_timestamp():
+    """Current IST time in NSE's payload 'timestamp' format"""
+    return pd.Timestamp.now(tz='Asia/Kolkata').strftime('%d-%b-%Y %H:%M:%S')
+
+
+def sample_sector_indices(rng):
+    """NSE-shaped SECTORAL INDICES payload"""
+    names = [
+        'NIFTY AUTO', 'NIFTY BANK', 'NIFTY ENERGY', 'NIFTY FINANCIAL SERVICES', 'NIFTY FMCG',
+        'NIFTY IT', 'NIFTY MEDIA', 'NIFTY METAL', 'NIFTY PHARMA', 'NIFTY PSU BANK',
+        'NIFTY PRIVATE BANK', 'NIFTY REALTY', 'NIFTY HEALTHCARE INDEX', 'NIFTY CONSUMER DURABLES',
+        'NIFTY OIL & GAS', 'NIFTY CHEMICALS'
+    ]
+    rows = []
+    for name in names:
+        prev = rng.uniform(5000, 55000)
+        last = prev * (1 + rng.uniform(-0.03, 0.03))
+        rows.append({
+            'index': name,
+            'open': round(prev * rng.uniform(0.995, 1.005), 2),
+            'last': round(last, 2),
+            'high': round(max(prev, last) * rng.uniform(1.001, 1.01), 2),
+            'low': round(min(prev, last) * rng.uniform(0.99, 0.999), 2),
+            'previousClose': round(prev, 2),
+            'change': round(last - prev, 2),
+            'pChange': round((last - prev) / prev * 100, 2),
+            'totalTradedVolume': int(rng.randint(10_000_000, 900_000_000))
+        })
+    return {'name': 'SECTORAL INDICES', 'timestamp': nse_timestamp(), 'data': rows}
+
+
+def sample_stock_quotes(rng, count=200):
+    """NSE-shaped equity-stockIndices payload for a stock universe"""
+    industries = [
+        'Computers - Software & Consulting', 'Private Sector Bank', 'Public Sector Bank',
+        'Pharmaceuticals', 'Passenger Cars & Utility Vehicles', 'Refineries & Marketing',
+        'Iron & Steel', 'Cement & Cement Products', 'Diversified FMCG', 'Power Generation'
+    ]
+    rows = []
+    for i in range(count):
+        prev = rng.uniform(50, 5000)
+        last = prev * (1 + rng.uniform(-0.08, 0.08))
+        rows.append({
+            'symbol': f"STOCK{i:04d}",
+            'open': round(prev * rng.uniform(0.99, 1.01), 2),
+            'dayHigh': round(max(prev, last) * rng.uniform(1.0, 1.02), 2),
+            'dayLow': round(min(prev, last) * rng.uniform(0.98, 1.0), 2),
+            'lastPrice': round(last, 2),
+            'previousClose': round(prev, 2),
+            'change': round(last - prev, 2),
+            'pChange': round((last - prev) / prev * 100, 2),
+            'totalTradedVolume': int(rng.randint(10_000, 50_000_000)),
+            'yearHigh': round(max(prev, last) * rng.uniform(1.0, 1.6), 2),
+            'yearLow': round(min(prev, last) * rng.uniform(0.5, 1.0), 2),
+            'ffmc': round(last * rng.uniform(1e6, 5e8), 2),
+            'meta': {
+                'symbol': f"STOCK{i:04d}",
+                'companyName': f"Sample Company {i}",
+                'industry': industries[i % len(industries)]
+            }
+        })
+    return {'name': 'SECURITIES IN F&O', 'timestamp': nse_timestamp(), 'data': rows}
+
+
+def sample_constituents_csv(rng, stocks, index_name, count=50):
+    """NSE-style constituent CSV for index_name drawn from quote rows (stocks)"""
+    if '500' in index_name:
+        count = 500
+    if 'TOTAL' not in index_name and len(stocks) > count:
+        stocks = [stocks[i] for i in sorted(rng.choice(len(stocks), count, replace=False))]
+    lines = ['Company Name,Industry,Symbol,Series,ISIN Code']
+    for stock in stocks:
+        meta = stock.get('meta', {})
+        lines.append(f"{meta.get('companyName', stock['symbol'])},{meta.get('industry', '')},"
+                     f"{stock['symbol']},EQ,INE{zlib.crc32(stock['symbol'].encode('utf-8')) % 10**6:06d}01")
+    return '\n'.join(lines) + '\n'
+
+
+def sample_history(rng, days=5):
+    """Daily OHLCV frame shaped like yfinance history()"""
+    dates = pd.bdate_range(end=pd.Timestamp('2025-08-22'), periods=days)
+    closes = rng.uniform(1000, 50000) * np.cumprod(1 + rng.uniform(-0.02, 0.02, days))
+    opens = closes * rng.uniform(0.99, 1.01, days)
+    return pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) * rng.uniform(1.0, 1.01, days),
+        'Low': np.minimum(opens, closes) * rng.uniform(0.99, 1.0, days),
+        'Close': closes,
+        'Volume': rng.randint(1_000_000, 500_000_000, days),
+    }, index=pd.Index(dates, name='Date'))
+
+
+def sample_news_page(rng, source_url):
+    topics = ['stock', 'market', 'Nifty', 'Sensex', 'shares', 'rupee', 'economy']
+    verbs = ['rallies', 'slips', 'climbs', 'steadies', 'extends gains', 'pares losses']
+    headlines = [
+        f"{topics[i % len(topics)].title()} {verbs[rng.randint(len(verbs))]} as investors weigh quarterly earnings"
+        for i in range(10)
+    ]
+    items = ''.join(f"<h2>{h}</h2>" for h in headlines)
+    return f"<html><head><title>{source_url}</title></head><body>{items}</body></html>"
+
+
+def write_sample_fixtures(fixture_dir, seed=42):
+    """Write a deterministic NSE/yfinance/news fixture set for offline runs.
+
+    Payloads follow the shapes DataManager parses; values are synthetic.
+    """
+    rng = np.random.RandomState(seed)
+    os.makedirs(os.path.join(fixture_dir, 'http'), exist_ok=True)
+    os.makedirs(os.path.join(fixture_dir, 'history'), exist_ok=True)
+
+    base = 'https://www.nseindia.com'
+    _write_http_fixture(fixture_dir, base, '<html></html>', content_type='text/html')
+    _write_http_fixture(fixture_dir, f"{base}/api/marketStatus", {
+        'marketState': [{'market': 'Capital Market', 'marketStatus': 'Closed'}]
+    })
+    _write_http_fixture(fixture_dir, f"{base}/api/equity-stockIndices?index=SECTORAL%20INDICES",
+                        sample_sector_indices(rng))
+    _write_http_fixture(fixture_dir, f"{base}/api/equity-stockIndices?index=SECURITIES%20IN%20F%26O",
+                        sample_stock_quotes(rng))
+    universe = sample_stock_quotes(rng, count=750)
+    _write_http_fixture(fixture_dir, f"{base}/api/equity-stockIndices?index=NIFTY%20TOTAL%20MARKET", universe)
+    for index_name, filename in CONSTITUENT_FILES.items():
+        _write_http_fixture(fixture_dir, f"https://nsearchives.nseindia.com/content/indices/{filename}",
+                            sample_constituents_csv(rng, universe['data'], index_name), content_type='text/csv')
+    _write_http_fixture(fixture_dir, f"{base}/api/fiidiiTradeReact", {
+        'fiiInflow': round(rng.uniform(2000, 8000), 2),
+        'fiiOutflow': round(rng.uniform(1500, 7500), 2),
+        'diiInflow': round(rng.uniform(3000, 9000), 2),
+        'diiOutflow': round(rng.uniform(2500, 8500), 2)
+    })
+    for source_url in NEWS_SOURCES:
+        _write_http_fixture(fixture_dir, source_url, sample_news_page(rng, source_url), content_type='text/html')
+
+    for symbol in INDEX_SYMBOLS.values():
+        for period, days in (('5d', 5), ('2d', 2)):
+            sample_history(rng, days).to_csv(os.path.join(fixture_dir, 'history', history_name(symbol, period)))
+
+    return fixture_dir
@@ -0,0 +1,345 @@
+"""Technical indicators for every stock, updated one bar at a time.
+
+IndicatorState holds rolling state for a fixed list of symbols as one array
+per quantity (running sums, EMAs, Wilder averages, a ring buffer of recent
+bars), so advancing by a bar is a handful of whole-array operations: O(1)
+per symbol, whatever the lookback. Batch initialisation folds the stored
+daily OHLCV matrices (price_history.BAR_FIELDS) through the same update,
+one row at a time and vectorized across all symbols, so batch and
+incremental results are identical.
+
+    SMA_20, SMA_50             simple moving averages of the close
+    EMA_20                     exponential moving average
+    RSI_14                     Wilder's relative strength index
+    ATR_14                     Wilder's average true range
+    MACD, MACD_Signal, MACD_Hist   12/26 EMA spread and its 9-bar EMA
+    BB_Upper, BB_Middle, BB_Lower  20-bar Bollinger bands at 2 std devs
+    VWAP_20                    volume-weighted typical price over 20 sessions
+    Avg_Volume_20              mean volume of the 20 sessions before the latest bar
+
+Bars are daily, so VWAP is the rolling 20-session VWAP rather than an
+intraday one. A value is NaN until its lookback has filled. Missing bars
+leave a symbol's state untouched; a missing high/low counts as the close.
+
+IndicatorEngine keeps the state at the last completed session and evaluates
+each live universe snapshot as a provisional bar on top of it without
+committing, so indicator columns for the whole universe cost O(symbols) per
+refresh. When a session completes the state advances by that one row; the
+history is only replayed after a backfill or when the universe changes.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from price_history import get_bar_histories
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+SMA_PERIODS = (20, 50)
+EMA_PERIOD = 20
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+MACD_PERIODS = (12, 26, 9)  # fast, slow, signal
+BOLLINGER_PERIOD = 20
+BOLLINGER_WIDTH = 2.0
+VWAP_PERIOD = 20
+RING = max(SMA_PERIODS + (BOLLINGER_PERIOD, VWAP_PERIOD))
+INDICATOR_COLUMNS = [
+    'SMA_20', 'SMA_50', 'EMA_20', 'RSI_14', 'ATR_14', 'MACD', 'MACD_Signal', 'MACD_Hist',
+    'BB_Upper', 'BB_Middle', 'BB_Lower', 'VWAP_20', 'Avg_Volume_20'
+]
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Rolling quantities carried from bar to bar (each an array over symbols)
+_CARRIED = (
+    ['count', 'prev_close', 'ema', 'ema_fast', 'ema_slow', 'signal', 'avg_gain', 'avg_loss', 'atr',
+     'sum_sq', 'sum_tpv', 'sum_volume', 'prior_volume'] + [f'sum_{period}' for period in SMA_PERIODS]
+)
+
+
+def _ema(previous, value, period):
+    """One EMA step; the first value seeds the average"""
+    alpha = 2.0 / (period + 1)
+    return np.where(np.isnan(previous), value, previous + alpha * (value - previous))
+
+
+def _wilder(previous, value, period):
+    """One Wilder smoothing step (alpha 1/period)"""
+    return np.where(np.isnan(previous), value, previous + (value - previous) / period)
+
+
+class IndicatorState:
+    """Rolling indicator state for a fixed list of symbols"""
+
+    def __init__(self, symbols):
+        self.symbols = np.asarray(symbols, dtype=object).astype(str)
+        size = len(self.symbols)
+        self.state = {name: np.full(size, np.nan) for name in _CARRIED}
+        self.state['count'] = np.zeros(size, dtype='int64')
+        for name in ['sum_sq', 'sum_tpv', 'sum_volume'] + [f'sum_{period}' for period in SMA_PERIODS]:
+            self.state[name] = np.zeros(size)
+        # Last RING closes, typical price x volume and volumes, at count % RING
+        self.ring_close = np.zeros((RING, size))
+        self.ring_tpv = np.zeros((RING, size))
+        self.ring_volume = np.zeros((RING, size))
+        self._columns = np.arange(size)
+
+    @classmethod
+    def from_bars(cls, symbols, bars):
+        """State after folding bars ({field: [days, symbols] array}) in date order"""
+        state = cls(symbols)
+        for day in range(len(bars['Close'])):
+            state.advance({field: values[day] for field, values in bars.items()})
+        return state
+
+    def _dropped(self, ring, count, period):
+        """Per-symbol ring values leaving a period-bar window as the next bar enters"""
+        values = ring[(count - period) % RING, self._columns]
+        return np.where(count >= period, values, 0.0)
+
+    def _step(self, bar):
+        """(carried state, ring entries) after bar, without modifying self"""
+        old = self.state
+        close = np.asarray(bar['Close'], dtype='float64')
+        valid = ~np.isnan(close)
+        close = np.where(valid, close, 0.0)
+        high = np.asarray(bar.get('High', close), dtype='float64')
+        low = np.asarray(bar.get('Low', close), dtype='float64')
+        high = np.where(np.isnan(high) | (high <= 0), close, high)
+        low = np.where(np.isnan(low) | (low <= 0), close, low)
+        volume = np.nan_to_num(np.asarray(bar.get('Volume', np.zeros(len(close))), dtype='float64'))
+        count = old['count']
+        new = {}
+
+        for period in SMA_PERIODS:
+            new[f'sum_{period}'] = old[f'sum_{period}'] + close - self._dropped(self.ring_close, count, period)
+        dropped = self._dropped(self.ring_close, count, BOLLINGER_PERIOD)
+        new['sum_sq'] = old['sum_sq'] + close * close - dropped * dropped
+        typical = (high + low + close) / 3
+        new['sum_tpv'] = old['sum_tpv'] + typical * volume - self._dropped(self.ring_tpv, count, VWAP_PERIOD)
+        new['sum_volume'] = old['sum_volume'] + volume - self._dropped(self.ring_volume, count, VWAP_PERIOD)
+        new['prior_volume'] = np.where(count >= VWAP_PERIOD, old['sum_volume'], np.nan)
+
+        fast, slow, signal = MACD_PERIODS
+        new['ema'] = _ema(old['ema'], close, EMA_PERIOD)
+        new['ema_fast'] = _ema(old['ema_fast'], close, fast)
+        new['ema_slow'] = _ema(old['ema_slow'], close, slow)
+        new['signal'] = _ema(old['signal'], new['ema_fast'] - new['ema_slow'], signal)
+
+        previous = old['prev_close']
+        has_previous = ~np.isnan(previous)
+        change = np.where(has_previous, close - previous, np.nan)
+        gain = _wilder(old['avg_gain'], np.maximum(change, 0), RSI_PERIOD)
+        loss = _wilder(old['avg_loss'], np.maximum(-change, 0), RSI_PERIOD)
+        new['avg_gain'] = np.where(has_previous, gain, np.nan)
+        new['avg_loss'] = np.where(has_previous, loss, np.nan)
+        with np.errstate(invalid='ignore'):
+            true_range = np.where(
+                has_previous,
+                np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous))),
+                high - low
+            )
+        new['atr'] = _wilder(old['atr'], true_range, ATR_PERIOD)
+        new['prev_close'] = close
+        new['count'] = count + 1
+
+        # Symbols without a bar keep their state
+        for name, values in new.items():
+            new[name] = np.where(valid, values, old[name])
+        return new, (valid, close, typical * volume, volume)
+
+    def advance(self, bar):
+        """Commit one bar ({'Open', 'High', 'Low', 'Close', 'Volume'} arrays over symbols)"""
+        new, (valid, close, tpv, volume) = self._step(bar)
+        rows = self.state['count'][valid] % RING
+        columns = self._columns[valid]
+        self.ring_close[rows, columns] = close[valid]
+        self.ring_tpv[rows, columns] = tpv[valid]
+        self.ring_volume[rows, columns] = volume[valid]
+        self.state = new
+
+    def values(self, bar=None):
+        """DataFrame of INDICATOR_COLUMNS by symbol, with bar as a provisional latest bar"""
+        state = self._step(bar)[0] if bar is not None else self.state
+        count = state['count']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns = {f'SMA_{period}': np.where(count >= period, state[f'sum_{period}'] / period, np.nan)
+                       for period in SMA_PERIODS}
+            columns['EMA_20'] = np.where(count >= EMA_PERIOD, state['ema'], np.nan)
+            strength = state['avg_gain'] / state['avg_loss']
+            rsi = np.where(state['avg_loss'] == 0, 100.0, 100 - 100 / (1 + strength))
+            columns['RSI_14'] = np.where(count > RSI_PERIOD, rsi, np.nan)
+            columns['ATR_14'] = np.where(count >= ATR_PERIOD, state['atr'], np.nan)
+            fast, slow, signal = MACD_PERIODS
+            macd = np.where(count >= slow, state['ema_fast'] - state['ema_slow'], np.nan)
+            columns['MACD'] = macd
+            columns['MACD_Signal'] = np.where(count >= slow + signal - 1, state['signal'], np.nan)
+            columns['MACD_Hist'] = macd - columns['MACD_Signal']
+            middle = np.where(count >= BOLLINGER_PERIOD, state[f'sum_{BOLLINGER_PERIOD}'] / BOLLINGER_PERIOD, np.nan)
+            spread = np.sqrt(np.maximum(state['sum_sq'] / BOLLINGER_PERIOD - middle * middle, 0))
+            columns['BB_Upper'] = middle + BOLLINGER_WIDTH * spread
+            columns['BB_Middle'] = middle
+            columns['BB_Lower'] = middle - BOLLINGER_WIDTH * spread
+            columns['VWAP_20'] = np.where(
+                (count >= VWAP_PERIOD) & (state['sum_volume'] > 0), state['sum_tpv'] / state['sum_volume'], np.nan
+            )
+            columns['Avg_Volume_20'] = state['prior_volume'] / VWAP_PERIOD
+        return pd.DataFrame(columns, index=pd.Index(self.symbols, name='Symbol'))[INDICATOR_COLUMNS]
+
+
+def bar_matrices(symbols, before=None):
+    """(dates, {field: [days, symbols] array}) of stored bars aligned on the close history's dates"""
+    histories = get_bar_histories()
+    dates, closes = histories['Close'].matrix(symbols, before=before)
+    bars = {'Close': closes}
+    for field, history in histories.items():
+        if field == 'Close':
+            continue
+        field_dates, values = history.matrix(symbols, before=before)
+        aligned = pd.DataFrame(values, index=field_dates).reindex(dates) if len(field_dates) else None
+        bars[field] = aligned.to_numpy(dtype='float64') if aligned is not None else np.full(closes.shape, np.nan)
+    return dates, bars
+
+
+def indicator_series(bars):
+    """DataFrame of bars plus INDICATOR_COLUMNS per date for one symbol (bars: OHLCV DataFrame)"""
+    state = IndicatorState(['series'])
+    rows = []
+    for values in bars.reindex(columns=BAR_COLUMNS).to_numpy(dtype='float64'):
+        state.advance({field: values[i:i + 1] for i, field in enumerate(BAR_COLUMNS)})
+        rows.append(state.values().iloc[0].to_numpy())
+    return bars.join(pd.DataFrame(rows, index=bars.index, columns=INDICATOR_COLUMNS))
+
+
+_series = {}  # (symbol, day, close revision) -> indicator_series frame, most recent last
+_series_lock = threading.Lock()
+SERIES_CACHE_SIZE = 32
+
+
+def symbol_series(data_manager, symbol, min_sessions=SMA_PERIODS[-1], period='1y'):
+    """Daily bars plus indicators for one symbol.
+
+    Stored bars are used once they cover min_sessions; until then the
+    symbol's daily chart is fetched (not stored). Cached per trading day.
+    """
+    today = datetime.now(IST).date()
+    key = (symbol, today, get_bar_histories()['Close'].revision)
+    with _series_lock:
+        if key in _series:
+            return _series[key]
+
+    dates, bars = bar_matrices([symbol])
+    stored = pd.DataFrame({field: values[:, 0] for field, values in bars.items()}, index=dates).dropna(subset=['Close'])
+    if len(stored) < min_sessions:
+        try:
+            fetched = data_manager._get_history(f"{symbol}.NS", period=period)
+            if len(fetched) > len(stored):
+                stored = fetched.reindex(columns=BAR_COLUMNS)
+                stored.index = pd.DatetimeIndex(stored.index).tz_localize(None).normalize()
+        except Exception as e:
+            print(f"✗ No chart history for {symbol}: {str(e)}")
+    series = indicator_series(stored[BAR_COLUMNS]) if not stored.empty else stored
+
+    with _series_lock:
+        _series[key] = series
+        while len(_series) > SERIES_CACHE_SIZE:
+            _series.pop(next(iter(_series)))
+    return series
+
+
+class IndicatorEngine:
+    """Indicator state at the last completed session, evaluated against live snapshots"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._day = None
+        self._last_date = None
+        self._backfills = None
+        self.rebuilds = 0
+        self.rolls = 0
+
+    @property
+    def position(self):
+        """(last completed session, rebuilds, rolls): changes whenever the committed state does"""
+        return self._last_date, self.rebuilds, self.rolls
+
+    def _backfill_count(self):
+        return sum(history.backfills for history in get_bar_histories().values())
+
+    def sync(self, symbols, today):
+        """Bring the committed state up to the sessions before today"""
+        symbols = np.asarray(symbols, dtype=object).astype(str)
+        closes = get_bar_histories()['Close']
+        with self._lock:
+            same = self._state is not None and np.array_equal(self._state.symbols, symbols) \
+                and self._backfills == self._backfill_count()
+            if same and self._day == today:
+                return self._state
+            dates, _ = closes.sessions_back(symbols[:0], [1, 2], before=today)
+            if same and dates[0] == self._last_date:
+                pass  # no session completed since (weekend, holiday)
+            elif same and self._last_date is not None and dates[1] == self._last_date:
+                self._roll(symbols, today, dates[0])
+            else:
+                _, bars = bar_matrices(symbols, before=today)
+                self._state = IndicatorState.from_bars(symbols, bars)
+                self._backfills = self._backfill_count()
+                self.rebuilds += 1
+            self._day = today
+            self._last_date = dates[0]
+            return self._state
+
+    def _roll(self, symbols, today, date):
+        # Advance by the one completed session, read as a single row per field
+        bar = {}
+        for field, history in get_bar_histories().items():
+            dates, values = history.sessions_back(symbols, [1], before=today)
+            bar[field] = values[0] if dates[0] == date else np.full(len(symbols), np.nan)
+        self._state.advance(bar)
+        self.rolls += 1
+
+    def table(self, quotes, today):
+        """Indicator columns by Symbol for a universe quote frame as today's provisional bar"""
+        state = self.sync(quotes['Symbol'].to_numpy(), today)
+        bar = {field: quotes[column].to_numpy(dtype='float64')
+               for field, column in [('Open', 'Open'), ('High', 'High'), ('Low', 'Low'),
+                                     ('Close', 'Last_Price'), ('Volume', 'Volume')] if column in quotes}
+        with self._lock:
+            return state.values(bar)
+
+
+_engine = None
+_indicators_lock = threading.Lock()
+_computed = {}  # 'key' -> (universe version, engine position) last published
+
+
+def get_indicator_engine():
+    global _engine
+    with _indicators_lock:
+        if _engine is None:
+            _engine = IndicatorEngine()
+        return _engine
+
+
+def get_indicators(data_manager, universe=None):
+    """Shared 'indicators' snapshot (Symbol plus INDICATOR_COLUMNS) for the current (or the given) universe, or None"""
+    universe = universe or SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if universe.frame is None or universe.frame.empty:
+        return None
+    engine = get_indicator_engine()
+    today = datetime.now(IST).date()
+    engine.sync(universe.frame['Symbol'].to_numpy(), today)
+    key = (universe.version, engine.position)
+
+    with _indicators_lock:
+        current = SNAPSHOTS.get('indicators')
+        if current is not None and _computed.get('key') == key:
+            return current
+        table = engine.table(universe.frame, today).astype('float32').reset_index()
+        snapshot = SNAPSHOTS.publish('indicators', table)
+        _computed['key'] = key
+        return snapshot
@@ -0,0 +1,215 @@
+"""Intraday OHLCV bars aggregated from live quote polls.
+
+Each IntradayEngine keeps, per timeframe, preallocated numpy arrays shaped
+[symbol, slot] with one slot per bar of a trading day (375 one-minute bars,
+75 five-minute bars), used as a ring buffer. Memory per symbol is fixed for
+the day no matter how often quotes are polled, and a poll updates every
+symbol's current bar in one vectorized step. Volumes are the increase in
+each symbol's cumulative day volume between polls. Changes through the day
+are measured from the quote's own opening price, so they hold however late
+the first poll came.
+
+The live quote feed (quote_feed.py) ingests every sector and index poll into
+intraday_engine('sector_data') / intraday_engine('index_data').
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+SESSION_MINUTES = 375  # 9:15 AM to 3:30 PM IST
+TIMEFRAMES = {'1m': 60, '5m': 300}
+INITIAL_SYMBOLS = 32
+
+
+class BarSeries:
+    """Ring buffers of one timeframe's bars for every symbol"""
+
+    def __init__(self, seconds, symbols=INITIAL_SYMBOLS):
+        self.seconds = seconds
+        self.capacity = SESSION_MINUTES * 60 // seconds + 1
+        self.starts = np.zeros(self.capacity, dtype='int64')
+        self.open = np.full((symbols, self.capacity), np.nan, dtype='float32')
+        self.high = np.full((symbols, self.capacity), np.nan, dtype='float32')
+        self.low = np.full((symbols, self.capacity), np.nan, dtype='float32')
+        self.close = np.full((symbols, self.capacity), np.nan, dtype='float32')
+        self.volume = np.zeros((symbols, self.capacity), dtype='int64')
+        self.head = -1
+        self.count = 0
+
+    def grow(self, symbols):
+        """Make room for at least `symbols` rows (existing bars are kept)"""
+        extra = symbols - self.open.shape[0]
+        if extra <= 0:
+            return
+        pad = ((0, extra), (0, 0))
+        self.open = np.pad(self.open, pad, constant_values=np.nan)
+        self.high = np.pad(self.high, pad, constant_values=np.nan)
+        self.low = np.pad(self.low, pad, constant_values=np.nan)
+        self.close = np.pad(self.close, pad, constant_values=np.nan)
+        self.volume = np.pad(self.volume, pad)
+
+    def update(self, rows, prices, volumes, timestamp):
+        """Fold one poll (row indices, prices, volume deltas) into the current bar"""
+        start = timestamp - timestamp % self.seconds
+        if self.head < 0 or start > self.starts[self.head]:
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            head = self.head
+            self.starts[head] = start
+            for values in (self.open, self.high, self.low, self.close):
+                values[:, head] = np.nan
+            self.volume[:, head] = 0
+            self.open[rows, head] = prices
+            self.high[rows, head] = prices
+            self.low[rows, head] = prices
+        else:
+            head = self.head
+            # Symbols first quoted part-way through the bar open at this price
+            self.open[rows, head] = np.where(np.isnan(self.open[rows, head]), prices, self.open[rows, head])
+            self.high[rows, head] = np.fmax(self.high[rows, head], prices)
+            self.low[rows, head] = np.fmin(self.low[rows, head], prices)
+        self.close[rows, head] = prices
+        self.volume[rows, head] += volumes
+
+    def slots(self):
+        """Slot indices of the stored bars, oldest first"""
+        return (self.head - self.count + 1 + np.arange(self.count)) % self.capacity
+
+
+class IntradayEngine:
+    """Per-symbol 1-minute and 5-minute bars for one trading day"""
+
+    def __init__(self, timeframes=TIMEFRAMES, symbols=INITIAL_SYMBOLS):
+        self.timeframes = dict(timeframes)
+        self._lock = threading.Lock()
+        self.revision = 0
+        self.reset(None, symbols)
+
+    def reset(self, day, symbols=INITIAL_SYMBOLS):
+        self.day = day
+        self._rows = {}
+        self._cumulative = np.full(symbols, np.nan)
+        self._day_open = np.full(symbols, np.nan)
+        self.series = {label: BarSeries(seconds, symbols) for label, seconds in self.timeframes.items()}
+
+    def _row_indices(self, names):
+        rows = np.empty(len(names), dtype='int64')
+        for i, name in enumerate(names):
+            row = self._rows.get(name)
+            if row is None:
+                row = self._rows[name] = len(self._rows)
+            rows[i] = row
+        size = len(self._cumulative)
+        if len(self._rows) > size:
+            size = max(len(self._rows), size * 2)
+            self._day_open = np.pad(self._day_open, (0, size - len(self._day_open)), constant_values=np.nan)
+            self._cumulative = np.pad(self._cumulative, (0, size - len(self._cumulative)), constant_values=np.nan)
+            for series in self.series.values():
+                series.grow(size)
+        return rows
+
+    def ingest(self, quotes, key, price, volume='Volume', day_open=None, at=None):
+        """Add one quote poll: a DataFrame with a name, price and cumulative volume column.
+
+        day_open names the column with the day's opening price, the basis of
+        cumulative_change.
+        """
+        at = at or datetime.now(IST)
+        names = quotes[key].astype(str).to_numpy()
+        prices = quotes[price].to_numpy(dtype='float64')
+        cumulative = quotes[volume].to_numpy(dtype='float64') if volume in quotes else np.zeros(len(quotes))
+        opens = quotes[day_open].to_numpy(dtype='float64') if day_open in quotes else np.full(len(quotes), np.nan)
+        with self._lock:
+            if at.date() != self.day:
+                self.reset(at.date(), max(INITIAL_SYMBOLS, len(self._rows)))
+            rows = self._row_indices(names)
+            # First sighting of a symbol has no earlier total to diff against
+            deltas = np.nan_to_num(cumulative - self._cumulative[rows], nan=0.0).clip(min=0).astype('int64')
+            self._cumulative[rows] = cumulative
+            # 0 is NSE's placeholder before the opening trade
+            known = np.isfinite(opens) & (opens > 0)
+            self._day_open[rows[known]] = opens[known]
+            valid = ~np.isnan(prices)
+            timestamp = int(at.timestamp())
+            for series in self.series.values():
+                series.update(rows[valid], prices[valid], deltas[valid], timestamp)
+            self.revision += 1
+
+    def symbols(self):
+        with self._lock:
+            return list(self._rows)
+
+    def bars(self, symbol, timeframe='1m'):
+        """OHLCV DataFrame of one symbol's bars today, oldest first"""
+        with self._lock:
+            row = self._rows.get(symbol)
+            series = self.series[timeframe]
+            if row is None or series.count == 0:
+                return pd.DataFrame(columns=['Time', 'Open', 'High', 'Low', 'Close', 'Volume'])
+            slots = series.slots()
+            bars = pd.DataFrame({
+                'Time': pd.to_datetime(series.starts[slots], unit='s', utc=True).tz_convert(IST),
+                'Open': series.open[row, slots],
+                'High': series.high[row, slots],
+                'Low': series.low[row, slots],
+                'Close': series.close[row, slots],
+                'Volume': series.volume[row, slots]
+            })
+        return bars.dropna(subset=['Close']).reset_index(drop=True)
+
+    def cumulative_change(self, timeframe='5m'):
+        """Percent change of every symbol's close since today's open.
+
+        DataFrame indexed by symbol with one column per bar time; the basis
+        of the intraday rotation view. The basis is the day's open from the
+        quotes; a symbol whose quotes carried none falls back to its first
+        bar, and attrs['since'] then holds that bar's time ('HH:MM') so the
+        view can say so (None when every basis is the real open).
+        """
+        with self._lock:
+            series = self.series[timeframe]
+            if series.count == 0 or not self._rows:
+                return pd.DataFrame()
+            slots = series.slots()
+            rows = np.arange(len(self._rows))
+            closes = series.close[rows][:, slots].astype('float64')
+            opens = series.open[rows][:, slots].astype('float64')
+            day_open = self._day_open[rows]
+            times = pd.to_datetime(series.starts[slots], unit='s', utc=True).tz_convert(IST)
+            names = list(self._rows)
+        first = np.argmax(~np.isnan(opens), axis=1)
+        missing = np.isnan(day_open)
+        basis = np.where(missing, opens[rows, first], day_open)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = (closes / basis[:, None] - 1) * 100
+        change = pd.DataFrame(change, index=names, columns=times.strftime('%H:%M'))
+        change.attrs['since'] = times[first[missing].min()].strftime('%H:%M') if missing.any() else None
+        return change
+
+    def stats(self):
+        with self._lock:
+            return {
+                'day': str(self.day),
+                'symbols': len(self._rows),
+                'bars': {label: series.count for label, series in self.series.items()},
+                'bytes': sum(
+                    values.nbytes for series in self.series.values()
+                    for values in (series.open, series.high, series.low, series.close, series.volume, series.starts)
+                )
+            }
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def intraday_engine(name):
+    """Process-wide engine for one dataset ('sector_data', 'index_data')"""
+    with _engines_lock:
+        if name not in _engines:
+            _engines[name] = IntradayEngine()
+        return _engines[name]
@@ -0,0 +1,212 @@
+"""Headless multi-session load test for the Streamlit app.
+
+Simulates N concurrent viewers with Streamlit's AppTest. Each session opens
+the app, then navigates between Sector Rotation, Market Cover, Trending
+News and Stock Screener and occasionally clicks "🔄 Refresh Data". Upstream
+traffic goes to a local stand-in (standin_server.py), so runs are repeatable
+and offline.
+
+Usage:
+    python load_test.py --sessions 1,5,10 --steps 12 --latency-ms 50
+    python load_test.py --sessions 20 --json results.json
+
+Reports rerun latency percentiles, upstream call counts and process RSS for
+each session count. The app persists to SECTORR_DATA_DIR, so runs use a
+fresh temporary data directory with the snapshot log and data API off; the
+stand-in's synthetic quotes never reach the real ./data store.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+
+# Before any app import: price_history reads SECTORR_DATA_DIR at import time
+os.environ['SECTORR_DATA_DIR'] = tempfile.mkdtemp(prefix='sectorr-load-')
+os.environ['SNAPSHOT_LOG'] = 'off'
+os.environ['DATA_API_PORT'] = 'off'
+
+import numpy as np
+
+from figure_cache import figure_cache_stats
+from render_timing import get_metrics, summarize_metrics
+from snapshots import SNAPSHOTS
+from standin_server import start_standin_server
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+ACTIONS = {
+    'sector_rotation': 'sector_btn',
+    'market_cover': 'market_btn',
+    'trending_news': 'news_btn',
+    'stock_screener': 'screener_btn',
+    'refresh': 'manual_refresh',
+}
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS is the best portable fallback (KB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if peak > 10 ** 9 else peak / 1024
+
+
+def pick_actions(rng, steps, refresh_every):
+    """Navigation sequence for one session"""
+    pages = ['sector_rotation', 'market_cover', 'trending_news', 'stock_screener']
+    actions = []
+    for step in range(steps):
+        if refresh_every and step and step % refresh_every == 0:
+            actions.append('refresh')
+        else:
+            actions.append(rng.choice(pages))
+    return actions
+
+
+def run_session(session_id, steps, refresh_every, timeout, seed, results, barrier):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    timings = []
+    errors = []
+    barrier.wait()
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        start = time.perf_counter()
+        at.run()
+        timings.append(('initial', (time.perf_counter() - start) * 1000))
+        errors.extend(e.message for e in at.exception)
+
+        for action in pick_actions(rng, steps, refresh_every):
+            start = time.perf_counter()
+            at.button(key=ACTIONS[action]).click().run()
+            timings.append((action, (time.perf_counter() - start) * 1000))
+            errors.extend(e.message for e in at.exception)
+    except Exception as e:
+        errors.append(f"session {session_id} aborted: {str(e)}")
+    results[session_id] = {'timings': timings, 'errors': errors}
+
+
+def run_load(session_count, steps, refresh_every, timeout, seed, server):
+    server.reset_stats()
+    rss_before = current_rss_mb()
+    results = {}
+    barrier = threading.Barrier(session_count)
+    threads = [
+        threading.Thread(target=run_session, args=(i, steps, refresh_every, timeout, seed, results, barrier))
+        for i in range(session_count)
+    ]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies = np.array([ms for r in results.values() for _, ms in r['timings']]) if results else np.array([])
+    by_action = {}
+    for r in results.values():
+        for action, ms in r['timings']:
+            by_action.setdefault(action, []).append(ms)
+
+    upstream = server.stats()
+    rss_after = current_rss_mb()
+    return {
+        'sessions': session_count,
+        'reruns': int(latencies.size),
+        'errors': sum(len(r['errors']) for r in results.values()),
+        'error_messages': sorted({msg for r in results.values() for msg in r['errors']}),
+        'wall_s': wall,
+        'reruns_per_s': latencies.size / wall if wall else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)) if latencies.size else 0.0,
+        'p90_ms': float(np.percentile(latencies, 90)) if latencies.size else 0.0,
+        'p99_ms': float(np.percentile(latencies, 99)) if latencies.size else 0.0,
+        'max_ms': float(latencies.max()) if latencies.size else 0.0,
+        'median_by_action_ms': {a: statistics.median(v) for a, v in by_action.items()},
+        'upstream_calls': upstream['total'],
+        'upstream_by_route': upstream['by_route'],
+        'upstream_by_status': upstream['by_status'],
+        'rss_mb': rss_after,
+        'rss_delta_mb': rss_after - rss_before,
+    }
+
+
+def print_report(rows):
+    print(f"{'sessions':>8}{'reruns':>8}{'err':>5}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'max ms':>10}{'rerun/s':>9}{'upstream':>10}{'RSS MB':>9}{'ΔRSS MB':>9}")
+    for row in rows:
+        print(f"{row['sessions']:>8}{row['reruns']:>8}{row['errors']:>5}{row['p50_ms']:>10.0f}{row['p90_ms']:>10.0f}"
+              f"{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}{row['reruns_per_s']:>9.2f}"
+              f"{row['upstream_calls']:>10}{row['rss_mb']:>9.1f}{row['rss_delta_mb']:>9.1f}")
+    for row in rows:
+        routes = ', '.join(f"{route}={count}" for route, count in sorted(row['upstream_by_route'].items()))
+        print(f"  {row['sessions']} sessions upstream: {routes}")
+        for message in row['error_messages']:
+            print(f"  ✗ {message}")
+
+    figures = figure_cache_stats()
+    print(f"Figure cache: {figures['hits']} hits, {figures['misses']} builds, {figures['size']} cached")
+    snapshots = []
+    for name, stats in sorted(SNAPSHOTS.stats().items()):
+        size = f", {stats['bytes'] / 1024:.0f} KB" if stats['bytes'] else ""
+        snapshots.append(f"{name} v{stats['sequence']} ({stats['rows']} rows{size})")
+    print(f"Shared snapshots: {', '.join(snapshots) or 'none'}")
+
+    sections = summarize_metrics(get_metrics()).head(10)
+    if not sections.empty:
+        print("Slowest render sections (all runs):")
+        print(sections.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default='1,5,10', help="comma-separated session counts to run")
+    parser.add_argument('--steps', type=int, default=10, help="navigation steps per session")
+    parser.add_argument('--refresh-every', type=int, default=5, help="click refresh every N steps (0 to disable)")
+    parser.add_argument('--timeout', type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument('--latency-ms', type=float, default=0, help="stand-in upstream latency")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--block-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', default=None, help="also write results to this file")
+    args = parser.parse_args()
+
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+
+    server = start_standin_server(latency_ms=args.latency_ms, error_rate=args.error_rate,
+                                  block_rate=args.block_rate, seed=args.seed)
+    os.environ['NSE_BASE_URL'] = server.base_url
+    os.environ['YF_CHART_BASE_URL'] = server.base_url
+    os.environ['NEWS_SOURCE_URLS'] = ','.join(server.news_urls)
+    print(f"Upstream stand-in on {server.base_url}; data in {os.environ['SECTORR_DATA_DIR']}")
+
+    rows = []
+    for count in [int(c) for c in args.sessions.split(',') if c.strip()]:
+        print(f"Running {count} session(s) × {args.steps} steps...")
+        # The app logs every upstream fetch; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            rows.append(run_load(count, args.steps, args.refresh_every, args.timeout, args.seed, server))
+
+    print_report(rows)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(rows, f, indent=2)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
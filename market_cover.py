@@ -4,70 +4,45 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from render_timing import section_timer, timed_fragment
+from utils import load_stylesheet
+from figure_cache import cached_figure, data_version
+from snapshots import SNAPSHOTS
+from intraday import intraday_engine
+from breadth import get_market_breadth
+from rankings import WINDOWS, get_rankings
+from returns import TABLE_HORIZONS, get_return_table, with_returns
 # from tradingview_charts import render_tradingview_widget, render_indices_overview
 
 def render_market_cover():
     """Render the Market Cover page with enhanced UI"""
+    timer = section_timer("Styles")
     
     # Custom CSS for market cover styling
-    st.markdown("""
-    <style>
-    .market-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-        animation: fadeInUp 1s ease-out;
-    }
-    @keyframes fadeInUp {
-        from { opacity: 0; transform: translateY(30px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    .index-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    .index-card:hover {
-        transform: translateY(-8px) scale(1.02);
-        box-shadow: 0 15px 35px rgba(0,0,0,0.3);
-    }
-    .metric-enhanced {
-        background: linear-gradient(45deg, #667eea, #764ba2);
-        padding: 1rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin: 0.5rem 0;
-        animation: pulse 2s infinite;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    load_stylesheet('market_cover')
     
     # Animated header
     st.markdown('<div class="market-header"><h1>📊 Live Market Dashboard</h1><p>Real-time Indian market indices with advanced analytics</p></div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Get data manager
     data_manager = st.session_state.data_manager
     
     # Fetch index data with caching
-    if 'index_data' not in st.session_state:
-        with st.spinner("Loading market indices data..."):
-            st.session_state.index_data = data_manager.get_index_data()
+    timer = section_timer("Index data")
+    with st.spinner("Loading market indices data..."):
+        index_snapshot = SNAPSHOTS.get_or_fetch('index_data', data_manager.get_index_data)
     
-    index_df = st.session_state.index_data
+    index_df = index_snapshot.view()
+    index_version = index_snapshot.version
+    timer.lap("fetch")
     
     if index_df.empty:
         st.error("Unable to load index data. Please try refreshing.")
         return
     
     # Enhanced Market Overview Cards
+    timer = section_timer("Index cards")
     st.markdown('<div class="index-card">', unsafe_allow_html=True)
     st.subheader("🔥 Live Index Performance Dashboard")
     
@@ -102,8 +77,162 @@ def render_market_cover():
                         st.write(f"**Low:** ₹{index_data['Low']:,.2f}")
                         st.write(f"**Volume:** {index_data['Volume']:,.0f}")
                         st.write(f"**Trend:** {trend_icon}")
+    timer.lap("emit")
     
     # Individual Index Selection with Detailed Analysis
+    _render_index_detail(index_df)
+    
+    # Enhanced Comparative Performance Chart
+    _render_index_comparison(index_df, index_version)
+    
+    # Enhanced Market Breadth Analysis
+    timer = section_timer("Breadth")
+    st.markdown('<div class="index-card">', unsafe_allow_html=True)
+    st.subheader("🏀 Market Sentiment & Breadth Analysis")
+    timer.lap("emit")
+    
+    # Breadth over the whole NSE universe, from one bulk quote snapshot
+    breadth, breadth_history = get_market_breadth(data_manager)
+    timer.lap("fetch")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.subheader("Advancing vs Declining")
+        if breadth:
+            advancing = breadth['Advances']
+            declining = breadth['Declines']
+            unchanged = breadth['Unchanged']
+            st.caption(f"Across {breadth['Universe']:,} NSE stocks")
+        else:
+            changes = index_df['Percent_Change'].to_numpy()
+            advancing = int((changes > 0).sum())
+            declining = int((changes < 0).sum())
+            unchanged = int((changes == 0).sum())
+            st.caption("Universe quotes unavailable - showing the tracked indices")
+        
+        breadth_data = pd.DataFrame({
+            'Status': ['Advancing', 'Declining', 'Unchanged'],
+            'Count': [advancing, declining, unchanged]
+        })
+        timer.lap("transform")
+        
+        def build_breadth_pie():
+            fig_breadth = px.pie(
+                breadth_data,
+                values='Count',
+                names='Status',
+                title="<b>🎯 Market Breadth Overview</b>",
+                color_discrete_map={
+                    'Advancing': '#2ED573',
+                    'Declining': '#FF4757',
+                    'Unchanged': '#747D8C'
+                }
+            )
+            fig_breadth.update_traces(
+                textposition='inside',
+                textinfo='percent+label',
+                hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
+                pull=[0.1, 0, 0]
+            )
+            fig_breadth.update_layout(
+                height=400,
+                showlegend=True,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16
+            )
+            fig_breadth.update_layout(height=300)
+            return fig_breadth
+
+        fig_breadth = cached_figure('index_breadth', (advancing, declining, unchanged), None, build_breadth_pie)
+        timer.lap("figure")
+        st.plotly_chart(fig_breadth, use_container_width=True)
+    
+    with col2:
+        st.subheader("Index Strength")
+        avg_change = index_df['Percent_Change'].mean()
+        total_volume = index_df['Volume'].sum()
+        
+        st.metric("Average % Change", f"{avg_change:.2f}%")
+        st.metric("Total Volume", f"{total_volume:,.0f}")
+        st.metric("Market Sentiment", 
+                 "Bullish" if avg_change > 0 else "Bearish" if avg_change < 0 else "Neutral")
+    
+    with col3:
+        st.subheader("Top Movers")
+        
+        # Best performer
+        best_performer = index_df.loc[index_df['Percent_Change'].idxmax()]
+        st.success(f"🏆 Best: {best_performer['Index']}")
+        st.write(f"Change: +{best_performer['Percent_Change']:.2f}%")
+        
+        # Worst performer
+        worst_performer = index_df.loc[index_df['Percent_Change'].idxmin()]
+        st.error(f"📉 Worst: {worst_performer['Index']}")
+        st.write(f"Change: {worst_performer['Percent_Change']:.2f}%")
+    timer.lap("emit")
+    
+    if breadth:
+        _render_universe_breadth(breadth, breadth_history)
+    
+    # Stock movers across the universe, from the shared ranking book
+    _render_top_movers(data_manager)
+    
+    # Historical correlation analysis
+    timer = section_timer("Correlation")
+    st.subheader("🔗 Index Correlation Analysis")
+    
+    # Generate sample correlation matrix for demonstration
+    correlation_indices = ['NIFTY 50', 'NIFTY BANK', 'NIFTY IT', 'NIFTY PHARMA']
+    available_indices = [idx for idx in correlation_indices if idx in index_df['Index'].values]
+    
+    if len(available_indices) >= 2:
+        # Create sample correlation matrix
+        np.random.seed(42)
+        n = len(available_indices)
+        correlation_matrix = np.random.uniform(0.3, 0.9, (n, n))
+        np.fill_diagonal(correlation_matrix, 1.0)
+        
+        # Make matrix symmetric
+        correlation_matrix = (correlation_matrix + correlation_matrix.T) / 2
+        
+        correlation_df = pd.DataFrame(
+            correlation_matrix
+        )
+        correlation_df.index = available_indices
+        correlation_df.columns = available_indices
+        timer.lap("transform")
+        
+        def build_correlation_matrix():
+            fig_corr = px.imshow(
+                correlation_df,
+                color_continuous_scale='RdBu',
+                aspect='auto',
+                title="<b>🔗 Index Correlation Heat Matrix</b>"
+            )
+            fig_corr.update_layout(
+                height=500,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=16
+            )
+            fig_corr.update_layout(height=400)
+            return fig_corr
+
+        fig_corr = cached_figure('index_correlation', index_version, available_indices, build_correlation_matrix)
+        timer.lap("figure")
+        st.plotly_chart(fig_corr, use_container_width=True)
+        
+        st.info("📊 Correlation values closer to 1.0 indicate indices move together, while values closer to 0 indicate independent movement.")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_index_detail(index_df):
+    """Metrics and summary for the index picked in the selector"""
+    timer = section_timer("Index detail")
     st.markdown("#### 🎯 Detailed Index Analysis")
     selected_index = st.selectbox(
         "Select index for detailed live analysis:",
@@ -124,6 +253,37 @@ def render_market_cover():
             st.metric("% Change", f"{selected_row['Percent_Change']:+.2f}%")
         with col4:
             st.metric("Volume", f"{selected_row['Volume']:,.0f}")
+        timer.lap("emit")
+        
+        # Intraday candles from the live feed
+        timeframe = st.radio("Intraday bars", ["1m", "5m"], horizontal=True, key="intraday_index_tf")
+        engine = intraday_engine('index_data')
+        bars = engine.bars(selected_index, timeframe)
+        timer.lap("transform")
+        if len(bars) >= 2:
+            def build_candles():
+                fig = go.Figure(go.Candlestick(
+                    x=bars['Time'],
+                    open=bars['Open'],
+                    high=bars['High'],
+                    low=bars['Low'],
+                    close=bars['Close'],
+                    name=selected_index
+                ))
+                fig.update_layout(
+                    title=f"<b>{selected_index} · {timeframe} bars today</b>",
+                    height=400,
+                    xaxis_rangeslider_visible=False,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                return fig
+            
+            fig = cached_figure('index_intraday', engine.revision, (selected_index, timeframe), build_candles)
+            timer.lap("figure")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.caption("📡 Intraday candles appear once the live feed has run during market hours")
         
         # Additional analysis section
         with st.expander("📊 Technical Analysis Summary"):
@@ -142,8 +302,13 @@ def render_market_cover():
             st.markdown(f"**Volatility Risk:** {risk_color} {risk_level}")
     
     st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Enhanced Comparative Performance Chart
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_index_comparison(index_df, index_version):
+    """Comparison chart and summary table for the selected indices"""
+    timer = section_timer("Comparison")
     st.markdown('<div class="index-card">', unsafe_allow_html=True)
     st.subheader("🏆 Comparative Index Performance Arena")
     
@@ -158,41 +323,50 @@ def render_market_cover():
     if comparison_indices:
         # Create normalized comparison chart
         comparison_df = index_df[index_df['Index'].isin(comparison_indices)]
+        timer.lap("transform")
         
-        fig_comparison = px.bar(
-            comparison_df,
-            x='Index',
-            y='Percent_Change',
-            color='Percent_Change',
-            color_continuous_scale=['#FF4757', '#FFA502', '#2ED573', '#1E90FF'],
-            title="<b>🏁 Live Index Performance Battle</b>",
-            text='Percent_Change'
-        )
+        def build_comparison_chart():
+            fig_comparison = px.bar(
+                comparison_df,
+                x='Index',
+                y='Percent_Change',
+                color='Percent_Change',
+                color_continuous_scale=['#FF4757', '#FFA502', '#2ED573', '#1E90FF'],
+                title="<b>🏁 Live Index Performance Battle</b>",
+                text='Percent_Change'
+            )
         
-        fig_comparison.update_traces(
-            texttemplate='%{text:.2f}%',
-            textposition='outside',
-            hovertemplate='<b>%{x}</b><br>Performance: %{y:.2f}%<extra></extra>'
-        )
-        fig_comparison.update_layout(
-            height=500,
-            showlegend=False,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=18,
-            xaxis=dict(tickangle=45)
-        )
+            fig_comparison.update_traces(
+                texttemplate='%{text:.2f}%',
+                textposition='outside',
+                hovertemplate='<b>%{x}</b><br>Performance: %{y:.2f}%<extra></extra>'
+            )
+            fig_comparison.update_layout(
+                height=500,
+                showlegend=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=18,
+                xaxis=dict(tickangle=45)
+            )
         
-        fig_comparison.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
-        fig_comparison.update_layout(height=400, showlegend=False)
+            fig_comparison.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
+            fig_comparison.update_layout(height=400, showlegend=False)
+            return fig_comparison
+
+        fig_comparison = cached_figure('index_comparison', index_version, comparison_indices, build_comparison_chart)
+        timer.lap("figure")
         st.plotly_chart(fig_comparison, use_container_width=True)
         
         # Performance summary table
         st.subheader("📋 Performance Summary")
+        timer.lap("emit")
         summary_df = comparison_df[['Index', 'Last_Price', 'Change', 'Percent_Change', 'Volume']].copy()
         summary_df['Last_Price'] = summary_df['Last_Price'].round(2)
         summary_df['Change'] = summary_df['Change'].round(2)
         summary_df['Percent_Change'] = summary_df['Percent_Change'].round(2)
+        summary_df = with_returns(summary_df, 'Index', get_return_table())
+        timer.lap("transform")
         
         st.dataframe(
             summary_df,
@@ -201,118 +375,116 @@ def render_market_cover():
                 "Price": st.column_config.NumberColumn("Current Price", format="₹%.2f"),
                 "Change": st.column_config.NumberColumn("Change", format="₹%.2f"),
                 "Percent_Change": st.column_config.NumberColumn("% Change", format="%.2f%%"),
-                "Volume": st.column_config.NumberColumn("Volume", format="%d")
+                "Volume": st.column_config.NumberColumn("Volume", format="%d"),
+                **{horizon: st.column_config.NumberColumn(f"{horizon} %", format="%.2f%%") for horizon in TABLE_HORIZONS}
             },
             use_container_width=True,
             hide_index=True
         )
     
     st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+def _format_share(value):
+    return f"{value:.1f}%" if value is not None and not pd.isna(value) else "n/a"
+
+
+def _render_universe_breadth(breadth, breadth_history):
+    """Universe breadth metrics and their daily history"""
+    timer = section_timer("Universe breadth")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("A/D Ratio", f"{breadth['AD_Ratio']:.2f}")
+    col2.metric("Above 20-DMA", _format_share(breadth['Above_20DMA']))
+    col3.metric("Above 50-DMA", _format_share(breadth['Above_50DMA']))
+    col4.metric("Above 200-DMA", _format_share(breadth['Above_200DMA']))
+    col5.metric("52W Highs / Lows", f"{breadth['New_Highs']} / {breadth['New_Lows']}")
+    if breadth['Above_200DMA'] is None:
+        st.caption("DMA shares fill in as daily closes accumulate (or run `python price_history.py --backfill`)")
+    timer.lap("emit")
     
-    # Enhanced Market Breadth Analysis
-    st.markdown('<div class="index-card">', unsafe_allow_html=True)
-    st.subheader("🏀 Market Sentiment & Breadth Analysis")
-    
-    col1, col2, col3 = st.columns(3)
+    if len(breadth_history) < 2:
+        st.caption("📅 Breadth history charts appear after two trading days of snapshots")
+        timer.lap("emit")
+        return
     
-    with col1:
-        st.subheader("Advancing vs Declining")
-        advancing = len(index_df[index_df['Percent_Change'] > 0])
-        declining = len(index_df[index_df['Percent_Change'] < 0])
-        unchanged = len(index_df[index_df['Percent_Change'] == 0])
-        
-        breadth_data = pd.DataFrame({
-            'Status': ['Advancing', 'Declining', 'Unchanged'],
-            'Count': [advancing, declining, unchanged]
-        })
-        
-        fig_breadth = px.pie(
-            breadth_data,
-            values='Count',
-            names='Status',
-            title="<b>🎯 Market Breadth Overview</b>",
-            color_discrete_map={
-                'Advancing': '#2ED573',
-                'Declining': '#FF4757',
-                'Unchanged': '#747D8C'
-            }
-        )
-        fig_breadth.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hovertemplate='<b>%{label}</b><br>Count: %{value}<br>Percentage: %{percent}<extra></extra>',
-            pull=[0.1, 0, 0]
-        )
-        fig_breadth.update_layout(
+    def build_breadth_history():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=breadth_history.index, y=breadth_history['AD_Line'], name='A/D Line',
+                                 line=dict(color='#1E90FF')))
+        fig.add_trace(go.Bar(x=breadth_history.index, y=breadth_history['McClellan'], name='McClellan',
+                             marker_color=np.where(breadth_history['McClellan'] >= 0, '#2ED573', '#FF4757'),
+                             yaxis='y2', opacity=0.5))
+        fig.update_layout(
+            title="<b>📈 Advance/Decline Line & McClellan Oscillator</b>",
             height=400,
-            showlegend=True,
+            yaxis=dict(title='A/D Line'),
+            yaxis2=dict(title='McClellan', overlaying='y', side='right', showgrid=False),
+            legend=dict(orientation='h', y=-0.15),
             plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16
+            paper_bgcolor='rgba(0,0,0,0)'
         )
-        fig_breadth.update_layout(height=300)
-        st.plotly_chart(fig_breadth, use_container_width=True)
+        return fig
+    
+    def build_dma_history():
+        shares = breadth_history[['Above_20DMA', 'Above_50DMA', 'Above_200DMA']].astype('float64')
+        fig = px.line(shares, title="<b>% of Stocks Above Moving Averages</b>",
+                      labels={'value': '% of universe', 'Date': '', 'variable': ''})
+        fig.update_layout(height=400, yaxis_range=[0, 100], legend=dict(orientation='h', y=-0.15),
+                          plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+        return fig
     
+    history_version = data_version(breadth_history)
+    timer.lap("transform")
+    fig_ad = cached_figure('breadth_ad_line', history_version, None, build_breadth_history)
+    fig_dma = cached_figure('breadth_dma_share', history_version, None, build_dma_history)
+    timer.lap("figure")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(fig_ad, use_container_width=True)
     with col2:
-        st.subheader("Index Strength")
-        avg_change = index_df['Percent_Change'].mean()
-        total_volume = index_df['Volume'].sum()
-        
-        st.metric("Average % Change", f"{avg_change:.2f}%")
-        st.metric("Total Volume", f"{total_volume:,.0f}")
-        st.metric("Market Sentiment", 
-                 "Bullish" if avg_change > 0 else "Bearish" if avg_change < 0 else "Neutral")
+        st.plotly_chart(fig_dma, use_container_width=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_top_movers(data_manager):
+    """Top gainers and losers for a chosen universe and window"""
+    timer = section_timer("Top movers")
+    st.markdown("#### 🏆 Top Stock Movers")
+    book = get_rankings(data_manager)
+    timer.lap("fetch")
+    if book is None:
+        st.info("🔄 Universe quotes are unavailable right now")
+        timer.lap("emit")
+        return
     
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        universe = st.selectbox("Universe", book.universes(), key="movers_universe")
+    with col2:
+        window = st.radio("Window", list(WINDOWS), horizontal=True, key="movers_window")
     with col3:
-        st.subheader("Top Movers")
-        
-        # Best performer
-        best_performer = index_df.loc[index_df['Percent_Change'].idxmax()]
-        st.success(f"🏆 Best: {best_performer['Index']}")
-        st.write(f"Change: +{best_performer['Percent_Change']:.2f}%")
-        
-        # Worst performer
-        worst_performer = index_df.loc[index_df['Percent_Change'].idxmin()]
-        st.error(f"📉 Worst: {worst_performer['Index']}")
-        st.write(f"Change: {worst_performer['Percent_Change']:.2f}%")
-    
-    # Historical correlation analysis
-    st.subheader("🔗 Index Correlation Analysis")
+        k = st.selectbox("Show", [5, 10, 20], index=1, key="movers_count")
+    gainers, losers = book.rank(universe, window, k)
+    timer.lap("transform")
     
-    # Generate sample correlation matrix for demonstration
-    correlation_indices = ['NIFTY 50', 'NIFTY BANK', 'NIFTY IT', 'NIFTY PHARMA']
-    available_indices = [idx for idx in correlation_indices if idx in index_df['Index'].values]
+    if gainers.empty:
+        st.info(f"📅 {window} returns need more daily close history (see `python price_history.py --backfill`)")
+        timer.lap("emit")
+        return
     
-    if len(available_indices) >= 2:
-        # Create sample correlation matrix
-        np.random.seed(42)
-        n = len(available_indices)
-        correlation_matrix = np.random.uniform(0.3, 0.9, (n, n))
-        np.fill_diagonal(correlation_matrix, 1.0)
-        
-        # Make matrix symmetric
-        correlation_matrix = (correlation_matrix + correlation_matrix.T) / 2
-        
-        correlation_df = pd.DataFrame(
-            correlation_matrix
-        )
-        correlation_df.index = available_indices
-        correlation_df.columns = available_indices
-        
-        fig_corr = px.imshow(
-            correlation_df,
-            color_continuous_scale='RdBu',
-            aspect='auto',
-            title="<b>🔗 Index Correlation Heat Matrix</b>"
-        )
-        fig_corr.update_layout(
-            height=500,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=16
-        )
-        fig_corr.update_layout(height=400)
-        st.plotly_chart(fig_corr, use_container_width=True)
-        
-        st.info("📊 Correlation values closer to 1.0 indicate indices move together, while values closer to 0 indicate independent movement.")
-    st.markdown('</div>', unsafe_allow_html=True)
+    column_config = {
+        "Last_Price": st.column_config.NumberColumn("💵 Price", format="₹%.2f"),
+        "Return": st.column_config.NumberColumn(f"📈 {window} %", format="%.2f%%"),
+        "Volume": st.column_config.NumberColumn("📊 Volume", format="%d")
+    }
+    columns = ['Symbol', 'Industry', 'Last_Price', 'Return', 'Volume']
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🚀 Gainers**")
+        st.dataframe(gainers[columns], column_config=column_config, use_container_width=True, hide_index=True)
+    with col2:
+        st.markdown("**🔻 Losers**")
+        st.dataframe(losers[columns], column_config=column_config, use_container_width=True, hide_index=True)
+    timer.lap("emit")
@@ -0,0 +1,206 @@
+"""Per-sector participation: is a sector's move broad or one heavyweight?
+
+For every index in the constituent master and every basic industry in the
+universe snapshot (the same groups as sector_aggregates.py), in one grouped
+pass over the universe quotes:
+
+    Advances / Declines / AD_Ratio         within the sector, today
+    Above_20DMA / _50DMA / _200DMA         % of members above each moving average
+    New_Highs / Pct_New_Highs              members at a 52-week high
+
+Moving averages come from the stored daily close matrix (price_history.py)
+without re-reading it on every refresh. MovingAverages keeps, per symbol, the
+running sum of the last (window - 1) closes before today, so today's DMA is
+
+    (running sum + live price) / window
+
+which costs O(symbols) per snapshot. When a trading day completes, each sum
+adds the new close and drops the one that left the window, a few rows read
+from the history; the full matrix is only summed again after a backfill or
+when the universe changes.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from breadth import DMA_WINDOWS
+from constituents import get_constituents
+from price_history import get_price_history
+from sector_aggregates import group_layout
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+YEAR_SESSIONS = 252
+PARTICIPATION_COLUMNS = [
+    'Level', 'Sector', 'Members', 'Advances', 'Declines', 'AD_Ratio',
+    'Above_20DMA', 'Above_50DMA', 'Above_200DMA', 'New_Highs', 'Pct_New_Highs'
+]
+
+
+class MovingAverages:
+    """Running per-symbol close sums for each DMA window, rolled forward a day at a time"""
+
+    def __init__(self, history, windows=DMA_WINDOWS):
+        self.history = history
+        self.windows = tuple(windows)
+        self.symbols = None
+        self.day = None
+        self.last_date = None  # latest close included in the sums
+        self.rebuilds = 0
+        self.rolls = 0
+        self._backfills = None
+        self._sums = {}
+        self._counts = {}
+        self._high = None  # highest close of the prior year, for quotes without Year_High
+        self._lock = threading.Lock()
+
+    def sync(self, symbols, today):
+        """Bring the sums up to the closes before today for symbols"""
+        symbols = np.asarray(symbols, dtype=object).astype(str)
+        with self._lock:
+            same = self.symbols is not None and np.array_equal(self.symbols, symbols) \
+                and self._backfills == self.history.backfills
+            if same and self.day == today:
+                return
+            dates, _ = self.history.sessions_back(symbols[:0], [1, 2], before=today)
+            if same and dates[0] == self.last_date:
+                pass  # no session completed since (weekend, holiday)
+            elif same and self.last_date is not None and dates[1] == self.last_date:
+                self._roll(symbols, today)
+            else:
+                self._rebuild(symbols, today)
+            self.symbols = symbols
+            self.day = today
+            self.last_date = dates[0]
+
+    def _rebuild(self, symbols, today):
+        _, closes = self.history.matrix(symbols, before=today)
+        for window in self.windows:
+            recent = closes[len(closes) - min(window - 1, len(closes)):]
+            self._sums[window] = np.nansum(recent, axis=0)
+            self._counts[window] = (~np.isnan(recent)).sum(axis=0)
+        year = closes[-(YEAR_SESSIONS - 1):]
+        with np.errstate(all='ignore'):
+            self._high = np.nanmax(year, axis=0) if len(year) else np.full(len(symbols), np.nan)
+        self._backfills = self.history.backfills
+        self.rebuilds += 1
+
+    def _roll(self, symbols, today):
+        # The newest close enters every window; the close `window` sessions back leaves it
+        offsets = [1] + [window for window in self.windows] + [YEAR_SESSIONS]
+        _, rows = self.history.sessions_back(symbols, offsets, before=today)
+        added = rows[0]
+        for window, dropped in zip(self.windows, rows[1:-1]):
+            # New arrays, not in-place updates: above() may be reading the old ones
+            self._sums[window] = self._sums[window] + np.nan_to_num(added) - np.nan_to_num(dropped)
+            self._counts[window] = self._counts[window] + (~np.isnan(added)).astype('int64') \
+                - (~np.isnan(dropped)).astype('int64')
+        expired = rows[-1] >= self._high
+        self._high = np.fmax(self._high, added)
+        if expired.any():
+            # Only symbols whose high just left the year need their history again
+            _, closes = self.history.matrix(symbols[expired], before=today)
+            with np.errstate(all='ignore'):
+                self._high[expired] = np.nanmax(closes[-(YEAR_SESSIONS - 1):], axis=0)
+        self.rolls += 1
+
+    def above(self, prices):
+        """{window: (eligible, above)} boolean arrays for live prices aligned to the synced symbols.
+
+        A stock is eligible once it has a full window of closes, matching
+        breadth.compute_breadth.
+        """
+        with self._lock:
+            sums, counts = dict(self._sums), dict(self._counts)
+        result = {}
+        for window in self.windows:
+            eligible = (counts[window] == window - 1) & ~np.isnan(prices)
+            with np.errstate(invalid='ignore'):
+                dma = (sums[window] + prices) / window
+            result[window] = (eligible, eligible & (prices > dma))
+        return result
+
+    def year_high(self):
+        with self._lock:
+            return self._high
+
+
+def sector_participation(quotes, master, averages):
+    """Participation for every index in master and every Industry in quotes.
+
+    averages must already be synced to quotes' Symbol column.
+    """
+    prices = quotes['Last_Price'].to_numpy(dtype='float64')
+    changes = quotes['Percent_Change'].to_numpy(dtype='float64')
+    groups, rows, labels, levels = group_layout(quotes, master)
+    size = len(labels)
+
+    def total(values):
+        return np.bincount(groups, weights=values[rows].astype('float64'), minlength=size)
+
+    members = np.bincount(groups, minlength=size)
+    advances = total(changes > 0)
+    declines = total(changes < 0)
+    participation = {
+        'Level': levels,
+        'Sector': labels,
+        'Members': members.astype('int32'),
+        'Advances': advances.astype('int32'),
+        'Declines': declines.astype('int32'),
+        'AD_Ratio': np.where(declines > 0, advances / np.maximum(declines, 1), advances).astype('float32'),
+    }
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for window, (eligible, above) in averages.above(prices).items():
+            counted = total(eligible)
+            participation[f'Above_{window}DMA'] = np.where(
+                counted > 0, total(above) / counted * 100, np.nan
+            ).astype('float32')
+
+        history_high = averages.year_high()
+        year_high = quotes['Year_High'].to_numpy(dtype='float64') if 'Year_High' in quotes else history_high
+        year_high = np.where(np.isnan(year_high), history_high, year_high)
+        new_highs = total(prices >= year_high)
+        participation['New_Highs'] = new_highs.astype('int32')
+        participation['Pct_New_Highs'] = (new_highs / members * 100).astype('float32')
+
+    participation = pd.DataFrame(participation)[members > 0]
+    return participation.sort_values(
+        ['Level', 'Above_50DMA', 'AD_Ratio'], ascending=[True, False, False], na_position='last'
+    ).reset_index(drop=True)
+
+
+_averages = None
+_participation_lock = threading.Lock()
+_computed = {}  # 'key' -> (universe version, master day, memberships, close day) last published
+
+
+def get_moving_averages():
+    """Process-wide MovingAverages over the daily close history"""
+    global _averages
+    with _participation_lock:
+        if _averages is None:
+            _averages = MovingAverages(get_price_history())
+        return _averages
+
+
+def get_sector_participation(data_manager):
+    """Shared 'sector_participation' snapshot for the current universe quotes, or None"""
+    universe = SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if universe.frame is None or universe.frame.empty:
+        return None
+    master = get_constituents(data_manager)
+    averages = get_moving_averages()
+    today = datetime.now(IST).date()
+    averages.sync(universe.frame['Symbol'].to_numpy(), today)
+    key = (universe.version, master.loaded_on, len(master), averages.last_date, averages.rebuilds, averages.rolls)
+
+    with _participation_lock:
+        current = SNAPSHOTS.get('sector_participation')
+        if current is not None and _computed.get('key') == key:
+            return current
+        snapshot = SNAPSHOTS.publish('sector_participation', sector_participation(universe.frame, master, averages))
+        _computed['key'] = key
+        return snapshot
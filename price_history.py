@@ -0,0 +1,233 @@
+"""Daily closing prices for the equity universe, kept on disk as parquet.
+
+Closes are stored wide (one row per trading day, one float32 column per
+symbol) so moving averages and highs/lows over the whole universe are single
+array operations. Opens, highs, lows and volumes are kept the same way in
+sibling files (BAR_FIELDS) for indicators.py. Each universe snapshot upserts
+today's row, so the row ends up holding the day's bar; older history can be
+seeded once with:
+
+    python price_history.py --backfill --period 1y
+
+Files live in SECTORR_DATA_DIR (default ./data, git-ignored).
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.environ.get('SECTORR_DATA_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+MAX_DAYS = 260  # a year of sessions covers the 200-DMA and 52-week highs/lows
+# Bar field -> (history name, universe quote column)
+BAR_FIELDS = {
+    'Open': ('daily_opens', 'Open'),
+    'High': ('daily_highs', 'High'),
+    'Low': ('daily_lows', 'Low'),
+    'Close': ('daily_closes', 'Last_Price'),
+    'Volume': ('daily_volumes', 'Volume'),
+}
+
+
+def data_path(filename):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+def read_parquet(path):
+    """DataFrame from path, or None when missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"Could not read {path}: {str(e)}")
+        return None
+
+
+def write_parquet(df, path):
+    """Write via a temp file so readers never see a half-written file"""
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class PriceHistory:
+    """Date x symbol matrix of daily closes.
+
+    revision changes when a new day is added or history is backfilled, not
+    when today's row is updated, so it can key per-trading-day caches;
+    backfills counts backfills alone, which rewrite earlier rows.
+    """
+
+    def __init__(self, path=None, max_days=MAX_DAYS):
+        self.path = path or data_path('daily_closes.parquet')
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self.revision = 0
+        self.backfills = 0
+        self._closes = read_parquet(self.path)
+        if self._closes is None:
+            self._closes = pd.DataFrame(dtype='float32')
+        self._closes.index = pd.DatetimeIndex(self._closes.index)
+
+    def record_closes(self, date, symbols, prices):
+        """Upsert one day's closes (symbols and prices are parallel arrays)"""
+        row = pd.DataFrame([np.asarray(prices, dtype='float32')], index=pd.DatetimeIndex([pd.Timestamp(date)]),
+                           columns=pd.Index(np.asarray(symbols, dtype=object).astype(str)))
+        row = row.loc[:, ~row.columns.duplicated()]
+        with self._lock:
+            closes = self._closes.drop(index=row.index, errors='ignore')
+            if len(closes) == len(self._closes):
+                self.revision += 1
+            if closes.empty:
+                closes = row
+            else:
+                closes = pd.concat([closes, row]).sort_index()
+            self._closes = closes.iloc[-self.max_days:].astype('float32')
+            write_parquet(self._closes, self.path)
+
+    def matrix(self, symbols, before=None):
+        """(dates, closes[days, len(symbols)]) aligned to symbols; NaN where unknown.
+
+        before excludes that date and later, e.g. today's partial row.
+        """
+        with self._lock:
+            closes = self._closes
+            if before is not None:
+                closes = closes[closes.index < pd.Timestamp(before)]
+            aligned = closes.reindex(columns=pd.Index(np.asarray(symbols, dtype=object).astype(str)))
+        return aligned.index, aligned.to_numpy(dtype='float64')
+
+    def sessions_back(self, symbols, sessions, before=None):
+        """(dates, closes[len(sessions), len(symbols)]) of single rows counted back from before.
+
+        1 is the latest close before that date; rows past the start of the
+        history come back NaN with a NaT date. Costs O(len(sessions) x symbols)
+        however long the history is.
+        """
+        sessions = np.asarray(sessions, dtype='int64')
+        columns = pd.Index(np.asarray(symbols, dtype=object).astype(str))
+        with self._lock:
+            closes = self._closes
+            end = closes.index.searchsorted(pd.Timestamp(before)) if before is not None else len(closes)
+            positions = end - sessions
+            known = positions >= 0
+            taken = closes.iloc[positions[known]].reindex(columns=columns)
+        dates = np.full(len(sessions), np.datetime64('NaT'), dtype='datetime64[ns]')
+        values = np.full((len(sessions), len(columns)), np.nan)
+        dates[known] = taken.index.to_numpy(dtype='datetime64[ns]')
+        values[known] = taken.to_numpy(dtype='float64')
+        return pd.DatetimeIndex(dates), values
+
+    def days(self):
+        with self._lock:
+            return len(self._closes)
+
+    def symbols(self):
+        """Every symbol with stored history"""
+        with self._lock:
+            return self._closes.columns.astype(str).tolist()
+
+    def merge(self, seeded):
+        """Merge a date x symbol frame of older values; recorded days win over seeded ones"""
+        seeded = seeded.astype('float32')
+        seeded.index = pd.DatetimeIndex(seeded.index).tz_localize(None).normalize()
+        with self._lock:
+            closes = self._closes.combine_first(seeded) if not self._closes.empty else seeded
+            self._closes = closes.sort_index().iloc[-self.max_days:].astype('float32')
+            self.revision += 1
+            self.backfills += 1
+            write_parquet(self._closes, self.path)
+
+    def backfill(self, data_manager, symbols, period='1y', tickers=None):
+        """Seed history from daily charts, one request per symbol.
+
+        tickers maps a symbol to its yfinance ticker (default SYMBOL.NS).
+        """
+        frames = _fetch_bars(data_manager, symbols, period, tickers)
+        if not frames:
+            return 0
+        self.merge(pd.DataFrame({symbol: hist['Close'] for symbol, hist in frames.items()}))
+        print(f"✓ Backfilled {len(frames)} symbols, {self.days()} days")
+        return len(frames)
+
+
+def _fetch_bars(data_manager, symbols, period, tickers=None):
+    """{symbol: daily OHLCV DataFrame} from charts, skipping symbols without history"""
+    frames = {}
+    for symbol in symbols:
+        try:
+            ticker = tickers.get(symbol) if tickers else f"{symbol}.NS"
+            if not ticker:
+                continue
+            hist = data_manager._get_history(ticker, period=period)
+            if not hist.empty:
+                frames[str(symbol)] = hist
+        except Exception as e:
+            print(f"✗ No history for {symbol}: {str(e)}")
+    return frames
+
+
+_histories = {}
+_history_lock = threading.Lock()
+
+
+def get_price_history(name='daily_closes', max_days=MAX_DAYS):
+    """Process-wide PriceHistory stored as <name>.parquet, loaded on first use.
+
+    'daily_closes' holds stocks; returns.py keeps index and sector closes in
+    'index_closes'. max_days applies when the history is first loaded.
+    """
+    with _history_lock:
+        if name not in _histories:
+            _histories[name] = PriceHistory(data_path(f'{name}.parquet'), max_days=max_days)
+        return _histories[name]
+
+
+def get_bar_histories():
+    """{field: PriceHistory} for every BAR_FIELDS field ('Close' is 'daily_closes')"""
+    return {field: get_price_history(name) for field, (name, _) in BAR_FIELDS.items()}
+
+
+def record_bars(date, quotes):
+    """Upsert one day's OHLCV row for every stock in a universe quote frame"""
+    symbols = quotes['Symbol'].astype(str).to_numpy()
+    for field, history in get_bar_histories().items():
+        column = BAR_FIELDS[field][1]
+        if column in quotes:
+            history.record_closes(date, symbols, quotes[column].to_numpy(dtype='float64'))
+
+
+def backfill_bars(data_manager, symbols, period='1y'):
+    """Seed every bar history from one daily chart request per symbol"""
+    frames = _fetch_bars(data_manager, symbols, period)
+    if not frames:
+        return 0
+    for field, history in get_bar_histories().items():
+        history.merge(pd.DataFrame({symbol: hist[field] for symbol, hist in frames.items() if field in hist}))
+    print(f"✓ Backfilled {len(frames)} symbols, {get_price_history().days()} days")
+    return len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backfill', action='store_true', help="seed history for the current universe")
+    parser.add_argument('--period', default='1y')
+    args = parser.parse_args()
+
+    history = get_price_history()
+    if args.backfill:
+        from data_sources import DataManager
+        manager = DataManager()
+        universe = manager.get_universe_quotes()
+        if universe.empty:
+            print("❌ Universe quotes unavailable, nothing to backfill")
+            return
+        backfill_bars(manager, universe['Symbol'].astype(str).tolist(), period=args.period)
+    print(f"{history.days()} days of closes in {history.path}")
+
+
+if __name__ == '__main__':
+    main()
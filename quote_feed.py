@@ -0,0 +1,222 @@
+"""Live sector and index quotes during market hours.
+
+A process-wide QuoteFeed thread polls sector quotes every LIVE_FEED_INTERVAL
+seconds (one NSE call) and index quotes every LIVE_INDEX_INTERVAL seconds
+(one call per index), but only during market hours and while some session is
+showing the live strip. The newest quotes feed render_live_strip(), a timed
+fragment that reruns on its own every few seconds and re-sends just its
+metrics. A poll is published to the shared snapshot store only when it moves
+materially (a name appears or disappears, a change flips sign, or any change
+moves by LIVE_MATERIAL_CHANGE percentage points), so the page charts, which
+are cached by snapshot version, rebuild only then; the strip notices the new
+snapshot and triggers the one full rerun that redraws them.
+
+Every successful poll is also folded into the intraday bar engines
+(intraday.py). By default the feed only polls while someone is watching, so
+bars cover the watched part of the day; INTRADAY_BARS=on keeps it polling
+through market hours with no viewer, so the day's bars have no gaps.
+
+Polls use the live sources only (DataManager.get_live_sector_quotes and
+get_live_index_quotes); when one fails the poll is skipped rather than
+falling back to scraped or generated data.
+
+Set LIVE_FEED_HOURS=always to run the feed outside market hours.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from render_timing import section_timer, timed_fragment, is_fragment_rerun
+from intraday import intraday_engine
+from snapshots import SNAPSHOTS
+from utils import get_market_timing
+
+FEED_INTERVAL = float(os.environ.get('LIVE_FEED_INTERVAL', 5))
+INDEX_INTERVAL = float(os.environ.get('LIVE_INDEX_INTERVAL', 60))
+MATERIAL_CHANGE_PCT = float(os.environ.get('LIVE_MATERIAL_CHANGE', 0.25))
+IDLE_AFTER = 60  # seconds without a viewer before the feed stops polling
+RECORD_BARS = os.environ.get('INTRADAY_BARS', 'off').lower() in ('on', 'true', 'yes')  # poll with no viewer
+
+# Snapshot name -> (row key column, price column, the day's opening price column)
+LIVE_DATASETS = {'sector_data': ('Industry', 'Avg_Close', 'Avg_Open'), 'index_data': ('Index', 'Last_Price', 'Open')}
+HEADLINE_INDICES = ['NIFTY 50', 'NIFTY BANK', 'NIFTY IT', 'NIFTY MIDCAP 100', 'NIFTY SMALLCAP 100']
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+def live_hours():
+    """Whether the feed should be polling now"""
+    return os.environ.get('LIVE_FEED_HOURS', '').lower() == 'always' or get_market_timing() == "OPEN"
+
+
+def is_material(old, new, key, threshold=MATERIAL_CHANGE_PCT):
+    """Whether new quotes differ enough from old to redraw charts"""
+    if old is None or len(old) != len(new):
+        return True
+    old = pd.Series(old['Percent_Change'].to_numpy(dtype='float64'), index=old[key].astype(str).to_numpy())
+    new = pd.Series(new['Percent_Change'].to_numpy(dtype='float64'), index=new[key].astype(str).to_numpy())
+    if not old.index.equals(new.index):
+        if set(old.index) != set(new.index):
+            return True
+        new = new.reindex(old.index)
+    old_values = old.to_numpy()
+    new_values = new.to_numpy()
+    # NaN -> NaN is unchanged (NaN != NaN would make every poll material);
+    # a quote appearing or disappearing is a change
+    old_known, new_known = np.isfinite(old_values), np.isfinite(new_values)
+    if (old_known != new_known).any():
+        return True
+    both = old_known & new_known
+    if (np.sign(old_values[both]) != np.sign(new_values[both])).any():
+        return True
+    return bool(np.max(np.abs(new_values[both] - old_values[both]), initial=0) >= threshold)
+
+
+class QuoteFeed:
+    """Polls quotes on a background thread and keeps the newest per dataset"""
+
+    def __init__(self, data_manager=None, interval=FEED_INTERVAL, index_interval=INDEX_INTERVAL):
+        self._data_manager = data_manager
+        self.interval = interval
+        self.index_interval = index_interval
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._last_seen = 0.0
+        self._last_index_poll = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def data_manager(self):
+        if self._data_manager is None:
+            from data_sources import DataManager
+            self._data_manager = DataManager()
+        return self._data_manager
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='quote-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def touch(self):
+        """Mark that a session is watching, keeping the feed awake"""
+        self._last_seen = time.time()
+
+    def latest(self, name):
+        """(quotes DataFrame, polled_at) from the last poll, or (None, None)"""
+        with self._lock:
+            return self._latest.get(name, (None, None))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not live_hours():
+                continue
+            if not RECORD_BARS and time.time() - self._last_seen > IDLE_AFTER:
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Quote feed poll failed: {str(e)}")
+
+    def poll(self):
+        """Fetch sector quotes (and index quotes when due) once, live sources only"""
+        self._update('sector_data', self.data_manager.get_live_sector_quotes)
+        if time.time() - self._last_index_poll >= self.index_interval:
+            self._last_index_poll = time.time()
+            self._update('index_data', self.data_manager.get_live_index_quotes)
+
+    def _update(self, name, fetch):
+        quotes = fetch()
+        # A failed poll is skipped: fallback or made-up quotes are never
+        # treated as live, recorded as bars or published
+        if quotes is None or quotes.empty:
+            return
+        key, price, day_open = LIVE_DATASETS[name]
+        with self._lock:
+            self._latest[name] = (quotes, datetime.now())
+        intraday_engine(name).ingest(quotes, key, price, day_open=day_open)
+        current = SNAPSHOTS.get(name)
+        if current is None or current.frame is None or is_material(current.frame, quotes, key):
+            SNAPSHOTS.publish(name, quotes)
+
+
+def start_quote_feed():
+    """The process-wide feed, started on first use"""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = QuoteFeed()
+            _feed.start()
+            print(f"✅ Live quote feed started - every {FEED_INTERVAL:.0f}s during market hours")
+        return _feed
+
+
+def _current_quotes(feed, name):
+    quotes, polled_at = feed.latest(name)
+    if quotes is None:
+        snapshot = SNAPSHOTS.get(name)
+        if snapshot is None or snapshot.frame is None:
+            return None, None
+        return snapshot.view(), snapshot.created_at
+    return quotes, polled_at
+
+
+@timed_fragment(run_every=FEED_INTERVAL)
+def render_live_strip(datasets):
+    """Live metrics for the page's datasets, refreshed in place every few seconds.
+
+    A full rerun is requested only when the feed has published a materially
+    different snapshot of one of datasets since the page was drawn.
+    """
+    timer = section_timer("Live strip")
+    feed = start_quote_feed()
+    feed.touch()
+
+    sequences = {name: getattr(SNAPSHOTS.get(name), 'sequence', None) for name in datasets}
+    if not is_fragment_rerun():
+        st.session_state._live_sequences = sequences
+    elif sequences != st.session_state.get('_live_sequences'):
+        st.rerun()
+
+    polled = []
+    if 'sector_data' in datasets:
+        sectors, polled_at = _current_quotes(feed, 'sector_data')
+        if sectors is not None:
+            changes = sectors['Percent_Change'].to_numpy()
+            leader = sectors.iloc[int(np.nanargmax(changes))]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("📈 Sectors Up", int((changes > 0).sum()))
+            col2.metric("📉 Sectors Down", int((changes < 0).sum()))
+            col3.metric("📊 Avg Change", f"{np.nanmean(changes):+.2f}%")
+            col4.metric("🏆 Leader", str(leader['Industry']), delta=f"{leader['Percent_Change']:+.2f}%")
+            polled.append(polled_at)
+
+    if 'index_data' in datasets:
+        indices, polled_at = _current_quotes(feed, 'index_data')
+        if indices is not None:
+            headline = indices[indices['Index'].isin(HEADLINE_INDICES)]
+            if headline.empty:
+                headline = indices.head(len(HEADLINE_INDICES))
+            for col, (_, row) in zip(st.columns(len(headline)), headline.iterrows()):
+                col.metric(
+                    str(row['Index']),
+                    f"₹{row['Last_Price']:,.2f}",
+                    delta=f"{row['Change']:+.2f} ({row['Percent_Change']:+.2f}%)"
+                )
+            polled.append(polled_at)
+    timer.lap("transform")
+
+    polled = [p for p in polled if p is not None]
+    if polled:
+        st.caption(f"📡 Live · quotes as of {min(polled).strftime('%H:%M:%S')} · updates every {FEED_INTERVAL:.0f}s")
+    else:
+        st.caption("📡 Waiting for the first live quotes...")
+    timer.lap("emit")
@@ -0,0 +1,142 @@
+"""Top/bottom movers over any stock universe, ranked once per snapshot.
+
+A RankingBook wraps one universe quote snapshot (NIFTY TOTAL MARKET) and
+answers rank(universe, window, k) for:
+
+    universes  'All', 'F&O', 'NIFTY 500', or any index / industry known to
+               the constituent master (constituents.py)
+    windows    '1D' from the quotes; '1W' and '1M' against the close 5 / 21
+               sessions back in the daily close history (price_history.py)
+
+Selection is partial: np.argpartition finds the k best and worst in linear
+time and only those k are sorted. Window returns, universe masks and every
+(universe, window, k) answer are cached on the book, and the book is rebuilt
+only when the universe snapshot, the close history or the constituent master
+changes, so every top-movers panel reads the same precomputed rankings.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from constituents import get_constituents
+from price_history import get_price_history
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+WINDOWS = {'1D': 0, '1W': 5, '1M': 21}  # sessions back
+BASE_UNIVERSES = ['All', 'F&O', 'NIFTY 500']
+RANK_COLUMNS = ['Symbol', 'Industry', 'Last_Price', 'Change', 'Percent_Change', 'Return', 'Volume']
+
+
+def top_k(values, k, largest=True):
+    """Positions of the k largest (or smallest) values, best first; NaNs never rank"""
+    candidates = np.flatnonzero(~np.isnan(values))
+    k = min(k, len(candidates))
+    if k == 0:
+        return candidates[:0]
+    keys = -values[candidates] if largest else values[candidates]
+    if k < len(candidates):
+        picked = np.argpartition(keys, k - 1)[:k]
+    else:
+        picked = np.arange(len(candidates))
+    return candidates[picked[np.argsort(keys[picked], kind='stable')]]
+
+
+class RankingBook:
+    """Rankings for one universe snapshot, filled in lazily and cached"""
+
+    def __init__(self, snapshot, data_manager=None):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.data_manager = data_manager
+        self.symbols = snapshot.frame['Symbol'].astype(str).to_numpy()
+        self._returns = {}
+        self._masks = {}
+        self._ranked = {}
+        self._lock = threading.Lock()
+
+    def universes(self):
+        """Universe names rank() accepts"""
+        master = get_constituents(self.data_manager)
+        extra = [name for name in master.sector_names() if name not in BASE_UNIVERSES]
+        return BASE_UNIVERSES + sorted(extra) + sorted(master.industry_names())
+
+    def returns(self, window):
+        """Percent return of every stock over window (NaN without enough history)"""
+        with self._lock:
+            cached = self._returns.get(window)
+        if cached is not None:
+            return cached
+        frame = self.snapshot.frame
+        if WINDOWS[window] == 0:
+            values = frame['Percent_Change'].to_numpy(dtype='float64')
+        else:
+            today = datetime.now(IST).date()
+            _, closes = get_price_history().matrix(self.symbols, before=today)
+            values = np.full(len(self.symbols), np.nan)
+            if len(closes) >= WINDOWS[window]:
+                base = closes[-WINDOWS[window]]
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    values = (frame['Last_Price'].to_numpy(dtype='float64') / base - 1) * 100
+        with self._lock:
+            self._returns[window] = values
+        return values
+
+    def mask(self, universe):
+        """Boolean row mask of universe over the snapshot"""
+        with self._lock:
+            cached = self._masks.get(universe)
+        if cached is not None:
+            return cached
+        if universe == 'All':
+            mask = np.ones(len(self.symbols), dtype=bool)
+        elif universe == 'F&O':
+            fno = SNAPSHOTS.get_or_fetch('fno_quotes', self.data_manager.get_fno_quotes) \
+                if self.data_manager is not None else SNAPSHOTS.get('fno_quotes')
+            members = fno.frame['Symbol'].astype(str).to_numpy() if fno is not None and fno.frame is not None else []
+            mask = np.isin(self.symbols, members)
+        else:
+            mask = np.isin(self.symbols, get_constituents(self.data_manager).symbols(universe))
+        with self._lock:
+            self._masks[universe] = mask
+        return mask
+
+    def rank(self, universe='All', window='1D', k=10):
+        """(gainers, losers) DataFrames of the k best and worst movers"""
+        key = (universe, window, k)
+        with self._lock:
+            cached = self._ranked.get(key)
+        if cached is not None:
+            return cached
+        values = np.where(self.mask(universe), self.returns(window), np.nan)
+        ranked = (self._frame(top_k(values, k), values), self._frame(top_k(values, k, largest=False), values))
+        with self._lock:
+            self._ranked[key] = ranked
+        return ranked
+
+    def _frame(self, rows, values):
+        movers = self.snapshot.take(rows)
+        movers['Return'] = values[rows].astype('float32')
+        return movers.reindex(columns=[c for c in RANK_COLUMNS if c in movers.columns])
+
+
+_book = None
+_book_key = None
+_book_lock = threading.Lock()
+
+
+def get_rankings(data_manager, snapshot=None):
+    """RankingBook for the current (or the given) universe snapshot, or None when quotes are unavailable"""
+    global _book, _book_key
+    snapshot = snapshot or SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if snapshot.frame is None or snapshot.frame.empty:
+        return None
+    master = get_constituents(data_manager)
+    key = (snapshot.version, get_price_history().days(), master.loaded_on, len(master))
+    with _book_lock:
+        if _book is None or _book_key != key:
+            _book = RankingBook(snapshot, data_manager)
+            _book_key = key
+        return _book
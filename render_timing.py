@@ -0,0 +1,150 @@
+import functools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Process-wide ring of per-rerun timing records, shared by all sessions
+METRICS_BUFFER = deque(maxlen=2000)
+_buffer_lock = threading.Lock()
+
+PHASES = ['fetch', 'transform', 'figure', 'emit']
+
+
+class SectionTimer:
+    """Lap timer for one logical section of a page renderer.
+
+    Each lap(phase) records the time since the previous lap (or since the
+    section started) under that phase, so a section reads top to bottom:
+
+        timer = section_timer("Top performers")
+        top = df.nlargest(10, 'Percent_Change')
+        timer.lap("transform")
+        fig = px.bar(top, ...)
+        timer.lap("figure")
+        st.plotly_chart(fig)
+        timer.lap("emit")
+    """
+
+    def __init__(self, section, spans):
+        self.section = section
+        self.spans = spans
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.spans.append((self.section, phase, (now - self._last) * 1000))
+        self._last = now
+
+    def skip(self):
+        """Restart the clock without recording (e.g. after a nested section)"""
+        self._last = time.perf_counter()
+
+
+def is_fragment_rerun():
+    """True while only a fragment is rerunning (not the whole page)"""
+    return st.session_state.get('_render_fragment') is not None
+
+
+def begin_rerun(page, fragment=None):
+    """Start collecting spans for this rerun"""
+    st.session_state._render_spans = []
+    st.session_state._render_page = page
+    st.session_state._render_fragment = fragment
+    st.session_state._render_started = time.perf_counter()
+    st.session_state._render_open = True
+
+
+def section_timer(section):
+    if '_render_spans' not in st.session_state:
+        st.session_state._render_spans = []
+    return SectionTimer(section, st.session_state._render_spans)
+
+
+def end_rerun():
+    """Close the rerun and export its spans to the metrics buffer"""
+    spans = st.session_state.get('_render_spans', [])
+    started = st.session_state.get('_render_started')
+    record = {
+        'timestamp': datetime.now().isoformat(),
+        'page': st.session_state.get('_render_page'),
+        'fragment': st.session_state.get('_render_fragment'),
+        'total_ms': (time.perf_counter() - started) * 1000 if started else sum(ms for _, _, ms in spans),
+        'spans': list(spans)
+    }
+    with _buffer_lock:
+        METRICS_BUFFER.append(record)
+    st.session_state._render_open = False
+    st.session_state._last_render_timing = record
+    return record
+
+
+def timed_fragment(func=None, run_every=None):
+    """st.fragment that records its own timing record when it reruns alone.
+
+    During a full rerun the panel's spans join the page record as usual; on a
+    fragment rerun (only this panel re-executes) it opens and closes a record
+    of its own, tagged with the panel name. Use @timed_fragment(run_every=5)
+    for a panel that also reruns itself on a timer.
+    """
+    if func is None:
+        return functools.partial(timed_fragment, run_every=run_every)
+
+    @functools.wraps(func)
+    def run_panel(*args, **kwargs):
+        if st.session_state.get('_render_open'):
+            return func(*args, **kwargs)
+        begin_rerun(st.session_state.get('_render_page'), fragment=func.__name__.strip('_'))
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end_rerun()
+
+    return st.fragment(run_panel, run_every=run_every)
+
+
+def get_metrics(page=None):
+    """Copy of the buffered rerun records, optionally for one page"""
+    with _buffer_lock:
+        records = list(METRICS_BUFFER)
+    if page is not None:
+        records = [r for r in records if r['page'] == page]
+    return records
+
+
+def summarize_metrics(records):
+    """Median and p90 milliseconds per (section, phase) over many reruns"""
+    rows = [
+        {'Section': section, 'Phase': phase, 'ms': ms}
+        for record in records for section, phase, ms in record['spans']
+    ]
+    if not rows:
+        return pd.DataFrame(columns=['Section', 'Phase', 'Median_ms', 'P90_ms', 'Samples'])
+    df = pd.DataFrame(rows)
+    summary = df.groupby(['Section', 'Phase'])['ms'].agg(
+        Median_ms='median', P90_ms=lambda s: s.quantile(0.9), Samples='count'
+    ).reset_index()
+    return summary.sort_values('Median_ms', ascending=False)
+
+
+def render_timing_overlay():
+    """Sidebar breakdown of the current rerun; only shown when opted in"""
+    if not st.sidebar.checkbox("⏱️ Show render timings", key="show_render_timings"):
+        return
+    record = st.session_state.get('_last_render_timing')
+    if not record or not record['spans']:
+        st.sidebar.caption("No timings recorded for this rerun")
+        return
+
+    df = pd.DataFrame(record['spans'], columns=['Section', 'Phase', 'ms'])
+    by_section = df.pivot_table(index='Section', columns='Phase', values='ms', aggfunc='sum', sort=False).fillna(0)
+    by_section = by_section.reindex(columns=[p for p in PHASES if p in by_section.columns])
+    by_section['Total'] = by_section.sum(axis=1)
+
+    with st.sidebar.expander(f"⏱️ {record['total_ms']:.0f} ms this rerun", expanded=True):
+        st.dataframe(by_section.round(1), use_container_width=True)
+        untracked = record['total_ms'] - df['ms'].sum()
+        st.caption(f"Outside instrumented sections: {untracked:.0f} ms · {len(METRICS_BUFFER)} reruns buffered")
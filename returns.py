@@ -0,0 +1,189 @@
+"""Multi-horizon returns for every sector and index in one vectorized pass.
+
+Sector and index closes share one date x name matrix (index_closes.parquet
+via price_history.py; NSE's sectoral indices and the tracked indices use the
+same names). Each live snapshot upserts the closes of the session its payload
+is dated with (fallback, sample and undated frames are shown but never
+stored). For all names at once, returns over
+
+    1D, 1W, 1M, 3M, 6M, YTD, 1Y   (1, 5, 21, 63, 126, sessions since the
+                                    last close of last year, 252 sessions)
+
+are the latest price divided by a row of base closes picked from the
+forward-filled matrix with one fancy-indexing step. The base rows depend only
+on the trading day, so they are cached per day; each new snapshot costs one
+division per name. Seed a year of index history with:
+
+    python returns.py --backfill              (--period 10y for backtest.py)
+"""
+import argparse
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from price_history import MAX_DAYS, get_price_history
+from schema import is_live, trade_date
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+HORIZONS = ['1D', '1W', '1M', '3M', '6M', 'YTD', '1Y']
+TABLE_HORIZONS = ('1W', '1M', '3M', '6M', 'YTD', '1Y')  # tables already show 1D as Percent_Change
+SESSIONS = {'1D': 1, '1W': 5, '1M': 21, '3M': 63, '6M': 126, '1Y': 252}
+HISTORY_NAME = 'index_closes'
+HISTORY_DAYS = 10 * MAX_DAYS  # a few dozen names, so backtest.py can have a decade
+
+
+def base_offsets(dates, today):
+    """Sessions back from today's close for each horizon (0 where history is too short)"""
+    days = len(dates)
+    offsets = np.array([SESSIONS.get(h, 0) for h in HORIZONS])
+    # YTD is measured from the last close dated before 1 January
+    before_year = np.flatnonzero(pd.DatetimeIndex(dates) < pd.Timestamp(today.year, 1, 1))
+    offsets[HORIZONS.index('YTD')] = days - before_year[-1] if len(before_year) else 0
+    offsets[offsets > days] = 0
+    return offsets
+
+
+def base_closes(dates, closes, today):
+    """[horizons, names] base closes (NaN where the history is too short)"""
+    filled = pd.DataFrame(closes).ffill().to_numpy(dtype='float64')
+    offsets = base_offsets(dates, today)
+    bases = np.full((len(HORIZONS), closes.shape[1]), np.nan)
+    known = offsets > 0
+    bases[known] = filled[len(filled) - offsets[known]]
+    return bases
+
+
+def return_matrix(latest, bases):
+    """Percent returns [names, horizons] of latest prices against base closes"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((latest[None, :] / bases - 1) * 100).T
+
+
+class ReturnEngine:
+    """Return table for the current sector and index snapshots"""
+
+    def __init__(self, history):
+        self.history = history
+        self._lock = threading.Lock()
+        self._bases = None
+        self._bases_key = None
+        self._table = None
+        self._table_key = None
+
+    def _latest(self, snapshots):
+        """(names, prices, 1D % changes, trade dates) across the given snapshots, first name wins.
+
+        The trade date is None for rows that must not be stored: fallback or
+        sample data, or a payload that did not say which session it is.
+        """
+        frames = []
+        for snapshot, key, price in snapshots:
+            if snapshot is None or snapshot.frame is None or snapshot.frame.empty:
+                continue
+            frame = snapshot.frame
+            if not {key, price, 'Percent_Change'}.issubset(frame.columns):
+                continue
+            frames.append(pd.DataFrame({
+                'Name': frame[key].astype(str).to_numpy(),
+                'Price': frame[price].to_numpy(dtype='float64'),
+                'Change': frame['Percent_Change'].to_numpy(dtype='float64'),
+                'Session': trade_date(frame) if is_live(frame) else None
+            }))
+        if not frames:
+            return np.array([], dtype=object), np.array([]), np.array([]), np.array([], dtype=object)
+        latest = pd.concat(frames).drop_duplicates('Name')
+        return (latest['Name'].to_numpy(), latest['Price'].to_numpy(), latest['Change'].to_numpy(),
+                latest['Session'].to_numpy(dtype=object))
+
+    def table(self, sector_snapshot, index_snapshot):
+        """DataFrame indexed by name with one % column per horizon"""
+        snapshots = [(sector_snapshot, 'Industry', 'Avg_Close'), (index_snapshot, 'Index', 'Last_Price')]
+        key = tuple(getattr(s, 'version', None) for s, _, _ in snapshots)
+        today = datetime.now(IST).date()
+        with self._lock:
+            if self._table is not None and self._table_key == (key, today, self.history.revision):
+                return self._table
+
+        names, prices, changes, sessions = self._latest(snapshots)
+        # Only dated live quotes become closes, under their own session: fallback
+        # rows would poison the history and a holiday would repeat the last session
+        for day in {day for day in sessions if day is not None and day.weekday() < 5}:
+            stored = np.array([session == day for session in sessions], dtype=bool)
+            try:
+                self.history.record_closes(day, names[stored], prices[stored])
+            except Exception as e:
+                print(f"Could not save index closes: {str(e)}")
+
+        # Returns run from the latest session quoted, not from the calendar day
+        session = max((day for day in sessions if day is not None), default=today)
+        bases_key = (session, self.history.revision, tuple(names))
+        with self._lock:
+            bases = self._bases if self._bases_key == bases_key else None
+        if bases is None:
+            dates, closes = self.history.matrix(names, before=session)
+            bases = base_closes(dates, closes, session) if len(dates) else np.full((len(HORIZONS), len(names)), np.nan)
+            with self._lock:
+                self._bases, self._bases_key = bases, bases_key
+
+        table = pd.DataFrame(return_matrix(prices, bases), index=pd.Index(names, name='Name'), columns=HORIZONS)
+        # Until yesterday's close is stored, 1D is the quote's own change
+        table['1D'] = table['1D'].fillna(pd.Series(changes, index=table.index))
+        table = table.astype('float32')
+        with self._lock:
+            self._table, self._table_key = table, (key, today, self.history.revision)
+        return table
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_index_history():
+    """The shared date x name close matrix of sectors and indices"""
+    return get_price_history(HISTORY_NAME, max_days=HISTORY_DAYS)
+
+
+def get_return_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ReturnEngine(get_index_history())
+        return _engine
+
+
+def get_return_table():
+    """Returns for every sector and index in the loaded snapshots (shared; do not modify).
+
+    Nothing is fetched: a page asks after loading its own snapshot, and
+    names from a snapshot no page has loaded yet are simply absent.
+    """
+    return get_return_engine().table(SNAPSHOTS.get('sector_data'), SNAPSHOTS.get('index_data'))
+
+
+def with_returns(df, key, table, horizons=TABLE_HORIZONS):
+    """df plus one column per horizon, looked up by its key column"""
+    aligned = table.reindex(df[key].astype(str).to_numpy())
+    for horizon in horizons:
+        df[horizon] = aligned[horizon].to_numpy()
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backfill', action='store_true', help="seed index closes from daily charts")
+    parser.add_argument('--period', default='1y')
+    args = parser.parse_args()
+
+    history = get_index_history()
+    if args.backfill:
+        from data_sources import DataManager, INDEX_SYMBOLS
+        history.backfill(DataManager(), list(INDEX_SYMBOLS), period=args.period, tickers=INDEX_SYMBOLS)
+    print(f"{history.days()} days of index closes in {history.path}")
+
+
+if __name__ == '__main__':
+    main()
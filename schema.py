@@ -0,0 +1,135 @@
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Column roles shared by the sector, index, stock and heatmap DataFrames
+CATEGORY_COLUMNS = ['Industry', 'Index', 'Symbol']
+PRICE_COLUMNS = [
+    'Avg_Open', 'Avg_Close', 'Avg_High', 'Avg_Low',
+    'Last_Price', 'Current_Price', 'Price', 'Open', 'High', 'Low',
+    'Previous_Close', 'Year_High', 'Year_Low', 'Change', 'Percent_Change'
+]
+VOLUME_COLUMNS = ['Volume']
+
+# DataFrame.attrs['source'] of frames DataManager did not get from the live
+# source; anything without it is live
+SOURCE_LIVE = 'live'
+SOURCE_FALLBACK = 'fallback'  # real quotes from a secondary source (yfinance scrape)
+SOURCE_SAMPLE = 'sample'  # generated data
+
+# Trend_Code is -1/0/1; Trend is the matching arrow as a categorical
+TREND_LABELS = ['↓', '→', '↑']
+INT32_MAX = np.iinfo(np.int32).max
+
+# One CategoricalDtype per column, grown as new names appear, so successive
+# snapshots share a single categories index instead of each holding the names
+_category_dtypes = {}
+_dtype_lock = threading.Lock()
+
+
+def trend_codes(changes):
+    """-1, 0 or 1 per row as int8"""
+    return np.sign(np.nan_to_num(numeric_array(changes, 'float64'))).astype('int8')
+
+
+def trend_labels(codes):
+    """Arrow categorical for trend codes, without a per-row Python call"""
+    return pd.Categorical.from_codes(np.asarray(codes, dtype='int8') + 1, categories=TREND_LABELS)
+
+
+def category_dtype(names, column):
+    """Process-wide CategoricalDtype for column, grown to cover names"""
+    names = pd.Index(pd.unique(np.asarray(names, dtype=object))).dropna()
+    with _dtype_lock:
+        dtype = _category_dtypes.get(column)
+        if dtype is None:
+            dtype = pd.CategoricalDtype(names)
+            _category_dtypes[column] = dtype
+        else:
+            unseen = names.difference(dtype.categories, sort=False)
+            if len(unseen):
+                dtype = pd.CategoricalDtype(dtype.categories.append(unseen))
+                _category_dtypes[column] = dtype
+    return dtype
+
+
+def with_source(df, source):
+    """Tag df with where its rows came from (survives snapshots and views)"""
+    df.attrs['source'] = source
+    return df
+
+
+def is_live(df):
+    """Whether df came from the live source rather than a fallback or sample"""
+    return df is not None and df.attrs.get('source', SOURCE_LIVE) == SOURCE_LIVE
+
+
+def with_trade_date(df, day):
+    """Tag df with the trading day its quotes belong to, from the payload itself"""
+    if day is not None:
+        df.attrs['trade_date'] = day.isoformat()
+    return df
+
+
+def trade_date(df):
+    """Trading day df's quotes belong to, or None when the payload did not say"""
+    day = None if df is None else df.attrs.get('trade_date')
+    return None if day is None else date.fromisoformat(day)
+
+
+def numeric_array(values, dtype):
+    """values as a numpy array of dtype; unparseable entries become NaN"""
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=dtype)
+
+
+def volume_array(values):
+    """int32 when every value fits, int64 otherwise; missing volumes are 0"""
+    volumes = np.nan_to_num(numeric_array(values, 'float64'))
+    if len(volumes) and np.abs(volumes).max() > INT32_MAX:
+        return volumes.astype('int64')
+    return volumes.astype('int32')
+
+
+def compact_column(column, values):
+    if column in CATEGORY_COLUMNS:
+        return pd.Categorical(values, dtype=category_dtype(values, column))
+    if column in PRICE_COLUMNS:
+        # float64: a few hundred rows, and float32 turns 17773.95 into 17773.9492
+        return numeric_array(values, 'float64')
+    if column in VOLUME_COLUMNS:
+        return volume_array(values)
+    return values
+
+
+def _build(columns, trend_from):
+    data = {column: compact_column(column, values) for column, values in columns.items()}
+    if trend_from is not None:
+        codes = trend_codes(data[trend_from])
+        data['Trend'] = trend_labels(codes)
+        data['Trend_Code'] = codes
+    return pd.DataFrame(data)
+
+
+def compact_records(records, trend_from=None):
+    """Build a DataFrame from row dicts with the shared dtype schema.
+
+    Names become shared categoricals, prices float64 and volumes int32/int64. If
+    trend_from names a change column, Trend (arrow) and Trend_Code are derived
+    from it.
+    """
+    if not records:
+        return pd.DataFrame()
+    columns = {column: [record.get(column) for record in records] for column in records[0]}
+    return _build(columns, trend_from)
+
+
+def compact_frame(df, trend_from=None):
+    """Return a copy of an existing DataFrame with the shared dtype schema"""
+    if df.empty:
+        return df
+    return _build({column: df[column].to_numpy() for column in df.columns}, trend_from)
@@ -0,0 +1,132 @@
+import time
+
+import streamlit as st
+from render_timing import section_timer, timed_fragment
+from utils import load_stylesheet
+from constituents import get_constituents
+from features import get_screener
+
+MA_CONDITIONS = {
+    "Any": None,
+    "Above SMA 20": ('above', 'Last_Price', 'SMA_20'),
+    "Below SMA 20": ('below', 'Last_Price', 'SMA_20'),
+    "Above SMA 50": ('above', 'Last_Price', 'SMA_50'),
+    "Below SMA 50": ('below', 'Last_Price', 'SMA_50'),
+    "Above EMA 20": ('above', 'Last_Price', 'EMA_20'),
+    "Below EMA 20": ('below', 'Last_Price', 'EMA_20'),
+    "SMA 20 above SMA 50": ('above', 'SMA_20', 'SMA_50'),
+}
+WINDOW_LABELS = {"Today": '1D', "1 Week": '1W', "1 Month": '1M'}
+SORT_COLUMNS = {
+    "Change %": 'Percent_Change',
+    "1W Return": 'Return_1W',
+    "1M Return": 'Return_1M',
+    "RSI": 'RSI_14',
+    "Relative Volume": 'Relative_Volume',
+    "Volume": 'Volume',
+}
+RESULT_COLUMNS = [
+    'Symbol', 'Industry', 'Last_Price', 'Percent_Change', 'Return_1W', 'Return_1M', 'RSI_14',
+    'SMA_20', 'SMA_50', 'Relative_Volume', 'Volume'
+]
+
+
+def render_screener():
+    """Render the Stock Screener page"""
+    timer = section_timer("Styles")
+    load_stylesheet('screener')
+    st.markdown('<div class="screener-header"><h1>🔎 Stock Screener</h1><p>Combine technical and sector conditions across the whole NSE universe</p></div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+    data_manager = st.session_state.data_manager
+
+    timer = section_timer("Features")
+    with st.spinner("Loading stock features..."):
+        screener = get_screener(data_manager)
+    timer.lap("fetch")
+
+    if screener is None:
+        st.error("Unable to load stock quotes. Please try refreshing.")
+        return
+
+    _render_screen(screener, data_manager)
+
+
+@timed_fragment
+def _render_screen(screener, data_manager):
+    """Condition builder and the matching stocks"""
+    timer = section_timer("Conditions")
+    st.markdown('<div class="screener-card">', unsafe_allow_html=True)
+    st.subheader("🧮 Conditions")
+
+    master = get_constituents(data_manager)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        ma_choice = st.selectbox("Price vs moving average:", list(MA_CONDITIONS), key="screen_ma")
+        rsi_range = st.slider("RSI (14) range:", 0, 100, (0, 100), key="screen_rsi")
+    with col2:
+        min_relative_volume = st.number_input(
+            "Volume vs 20-day average (at least ×):", min_value=0.0, max_value=20.0, value=0.0, step=0.5,
+            key="screen_relative_volume"
+        )
+        sector = st.selectbox(
+            "Sector / index:", ["Any"] + sorted(master.sector_names()) + sorted(master.industry_names()),
+            key="screen_sector"
+        )
+    with col3:
+        rank_window = st.radio("Return window:", list(WINDOW_LABELS), horizontal=True, key="screen_rank_window")
+        rank_top = st.slider("Return rank: top % of universe", 1, 100, 100, key="screen_rank_top")
+
+    col4, col5 = st.columns([3, 1])
+    with col4:
+        sort_label = st.selectbox("Sort by:", list(SORT_COLUMNS), key="screen_sort")
+    with col5:
+        limit = st.selectbox("Show:", [25, 50, 100, 250], key="screen_limit")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    conditions = []
+    if MA_CONDITIONS[ma_choice] is not None:
+        conditions.append(MA_CONDITIONS[ma_choice])
+    if rsi_range != (0, 100):
+        conditions.append(('between', 'RSI_14', rsi_range[0], rsi_range[1]))
+    if min_relative_volume > 0:
+        conditions.append(('at_least', 'Relative_Volume', float(min_relative_volume)))
+    if sector != "Any":
+        conditions.append(('member', sector))
+    if rank_top < 100:
+        conditions.append(('at_least', f'Rank_{WINDOW_LABELS[rank_window]}', 100 - rank_top))
+    timer.lap("emit")
+
+    start = time.perf_counter()
+    rows = screener.screen(conditions, sort_by=SORT_COLUMNS[sort_label])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    results = screener.snapshot.take(rows[:limit])
+    timer.lap("transform")
+
+    timer = section_timer("Results")
+    st.subheader(f"📋 {len(rows):,} of {len(screener.symbols):,} stocks match")
+    if results.empty:
+        st.info("No stocks match these conditions")
+    else:
+        st.dataframe(
+            results.reindex(columns=RESULT_COLUMNS),
+            column_config={
+                "Last_Price": st.column_config.NumberColumn("Price", format="₹%.2f"),
+                "Percent_Change": st.column_config.NumberColumn("Change %", format="%.2f%%"),
+                "Return_1W": st.column_config.NumberColumn("1W %", format="%.2f%%"),
+                "Return_1M": st.column_config.NumberColumn("1M %", format="%.2f%%"),
+                "RSI_14": st.column_config.NumberColumn("RSI", format="%.1f"),
+                "SMA_20": st.column_config.NumberColumn("SMA 20", format="%.2f"),
+                "SMA_50": st.column_config.NumberColumn("SMA 50", format="%.2f"),
+                "Relative_Volume": st.column_config.NumberColumn("Rel. Volume", format="%.2f×"),
+                "Volume": st.column_config.NumberColumn("Volume", format="%d")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    st.caption(f"{len(conditions)} condition(s) screened in {elapsed_ms:.2f} ms")
+    if screener.snapshot.frame['SMA_20'].isna().all():
+        st.caption("Moving averages and RSI appear once enough daily bars are stored "
+                   "(`python price_history.py --backfill`)")
+    timer.lap("emit")
+
@@ -0,0 +1,116 @@
+"""Sector and sub-industry aggregates from one constituent quote snapshot.
+
+Every index in the constituent master (constituents.py) and every NSE basic
+industry in the universe snapshot is aggregated from the same quotes in one
+grouped pass: memberships are laid out as one long (group, quote row) array
+and np.bincount sums each statistic for all groups at once, so a few hundred
+sectors cost about as much as one.
+
+Per group: Members, Advances, Declines, cap-weighted and equal-weighted
+return, Volume, Turnover and Dispersion (cross-sectional standard deviation
+of member returns). Weights are free-float market caps (FFMC) from the
+quotes; a group whose members carry no cap falls back to equal weights.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from constituents import get_constituents
+from snapshots import SNAPSHOTS
+
+AGGREGATE_COLUMNS = [
+    'Level', 'Sector', 'Members', 'Advances', 'Declines', 'Weighted_Return',
+    'Equal_Return', 'Dispersion', 'Volume', 'Turnover'
+]
+LEVELS = ['Index', 'Industry']
+
+_aggregates_lock = threading.Lock()
+_computed = {}  # 'key' -> (universe version, master day, memberships) last published
+
+
+def group_layout(quotes, master):
+    """Long (group, quote row) layout of every index in master and every Industry in quotes.
+
+    Returns (groups, rows, labels, levels): group code and quote row per
+    membership, plus each group's name and level ('Index' or 'Industry').
+    """
+    symbols = pd.Index(quotes['Symbol'].astype(str).to_numpy())
+
+    # Index memberships -> quote rows
+    positions = symbols.get_indexer(master.members['Symbol'].astype(str))
+    quoted = positions >= 0
+    index_codes, index_labels = pd.factorize(master.members['Index'].astype(str).to_numpy()[quoted])
+
+    # Each quote's basic industry is its sub-industry group
+    industry_codes, industry_labels = pd.factorize(quotes['Industry'].to_numpy(dtype=object)) \
+        if 'Industry' in quotes else (np.full(len(quotes), -1), np.array([], dtype=object))
+    listed = industry_codes >= 0
+
+    groups = np.concatenate([index_codes, industry_codes[listed] + len(index_labels)])
+    rows = np.concatenate([positions[quoted], np.flatnonzero(listed)])
+    labels = np.concatenate([index_labels, industry_labels]).astype(str)
+    levels = pd.Categorical(np.repeat(LEVELS, [len(index_labels), len(industry_labels)]), categories=LEVELS)
+    return groups, rows, labels, levels
+
+
+def aggregate_sectors(quotes, master):
+    """Aggregates for every index in master and every Industry in quotes"""
+    returns = quotes['Percent_Change'].to_numpy(dtype='float64')
+    volumes = quotes['Volume'].to_numpy(dtype='float64')
+    prices = quotes['Last_Price'].to_numpy(dtype='float64')
+    caps = quotes['FFMC'].to_numpy(dtype='float64') if 'FFMC' in quotes else np.full(len(quotes), np.nan)
+    groups, rows, labels, levels = group_layout(quotes, master)
+    size = len(labels)
+
+    def total(values):
+        return np.bincount(groups, weights=values, minlength=size)
+
+    r = returns[rows]
+    valid = ~np.isnan(r)
+    r = np.where(valid, r, 0.0)
+    weights = np.where(valid & (caps[rows] > 0), caps[rows], 0.0)
+
+    counts = total(valid.astype('float64'))
+    cap_totals = total(weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        equal = total(r) / counts
+        weighted = np.where(cap_totals > 0, total(weights * r) / cap_totals, equal)
+        dispersion = np.sqrt(np.maximum(total(r * r) / counts - equal * equal, 0))
+    traded = np.nan_to_num(volumes[rows])
+
+    aggregates = pd.DataFrame({
+        'Level': levels,
+        'Sector': labels,
+        'Members': total(np.ones(len(rows))).astype('int32'),
+        'Advances': total((r > 0).astype('float64')).astype('int32'),
+        'Declines': total((r < 0).astype('float64')).astype('int32'),
+        'Weighted_Return': weighted.astype('float32'),
+        'Equal_Return': equal.astype('float32'),
+        'Dispersion': dispersion.astype('float32'),
+        'Volume': total(traded).astype('int64'),
+        'Turnover': total(traded * np.nan_to_num(prices[rows]))
+    })
+    aggregates = aggregates[counts > 0]
+    return aggregates.sort_values(['Level', 'Weighted_Return'], ascending=[True, False]).reset_index(drop=True)
+
+
+def get_sector_aggregates(data_manager):
+    """Shared 'sector_aggregates' snapshot for the current universe quotes, or None.
+
+    Aggregates are recomputed only when the universe snapshot or the
+    constituent master changes.
+    """
+    universe = SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if universe.frame is None or universe.frame.empty:
+        return None
+    master = get_constituents(data_manager)
+    key = (universe.version, master.loaded_on, len(master))
+
+    with _aggregates_lock:
+        current = SNAPSHOTS.get('sector_aggregates')
+        if current is not None and _computed.get('key') == key:
+            return current
+        snapshot = SNAPSHOTS.publish('sector_aggregates', aggregate_sectors(universe.frame, master))
+        _computed['key'] = key
+        return snapshot
@@ -6,257 +6,42 @@ import numpy as np
 from datetime import datetime
 from streamlit_option_menu import option_menu
 import time
+from render_timing import section_timer, timed_fragment
+from utils import load_stylesheet
+from figure_cache import cached_figure, data_version
+from snapshots import SNAPSHOTS
+from intraday import intraday_engine
+from sector_aggregates import get_sector_aggregates
+from participation import get_sector_participation
+from fii_dii_history import ROLLING_WINDOWS, get_flow_history
+from returns import TABLE_HORIZONS, get_return_table, with_returns
+from indicators import get_indicators, symbol_series
+from unusual_activity import THRESHOLD
+from backtest import get_backtester
+from snapshot_log import get_snapshot_log
 # from tradingview_charts import render_tradingview_widget, render_stock_modal_button, render_sector_chart
 
 def render_sector_rotation():
     """Render the Sector Rotation page with enhanced UI"""
-    # Make the page wider and add better spacing
-    st.markdown("""
-    <style>
-    .main > div {
-        max-width: 100% !important;
-        padding: 1rem 2rem !important;
-    }
-    .stSelectbox > div > div {
-        font-size: 16px !important;
-    }
-    .stDataFrame {
-        font-size: 16px !important;
-    }
-    .sector-card {
-        padding: 20px !important;
-        margin: 15px 0 !important;
-        font-size: 18px !important;
-    }
-    .stock-info {
-        font-size: 16px !important;
-        padding: 12px !important;
-        margin: 8px 0 !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Advanced CSS for animations and styling
-    st.markdown("""
-    <style>
-    /* Global animations */
-    @keyframes fadeInUp {
-        from { opacity: 0; transform: translateY(30px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    @keyframes fadeInDown {
-        from { opacity: 0; transform: translateY(-30px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    @keyframes slideInLeft {
-        from { opacity: 0; transform: translateX(-50px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    @keyframes slideInRight {
-        from { opacity: 0; transform: translateX(50px); }
-        to { opacity: 1; transform: translateX(0); }
-    }
-    
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    
-    @keyframes shimmer {
-        0% { background-position: -200px 0; }
-        100% { background-position: calc(200px + 100%) 0; }
-    }
-    
-    .metric-container {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1.5rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        margin: 0.8rem 0;
-        box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        animation: fadeInUp 0.8s ease-out;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .metric-container::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -200px;
-        width: 200px;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        animation: shimmer 3s infinite;
-    }
-    
-    .metric-container:hover {
-        transform: translateY(-10px) scale(1.03);
-        box-shadow: 0 20px 40px rgba(31, 38, 135, 0.5);
-        animation: pulse 2s infinite;
-    }
-    
-    .sector-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%, #f093fb 100%);
-        padding: 3rem;
-        border-radius: 25px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-        animation: fadeInDown 1s ease-out;
-        box-shadow: 0 15px 35px rgba(102, 126, 234, 0.4);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .sector-header::before {
-        content: '';
-        position: absolute;
-        top: -50%;
-        left: -50%;
-        width: 200%;
-        height: 200%;
-        background: linear-gradient(45deg, transparent, rgba(255,255,255,0.1), transparent);
-        animation: shimmer 4s infinite;
-    }
-    
-    .sector-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(15px);
-        border-radius: 20px;
-        padding: 2rem;
-        margin: 1.5rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        animation: slideInLeft 0.8s ease-out;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-    }
-    
-    .sector-card:hover {
-        transform: translateY(-10px) scale(1.02);
-        box-shadow: 0 20px 40px rgba(0,0,0,0.2);
-        background: rgba(255, 255, 255, 0.15);
-        border: 1px solid rgba(255, 255, 255, 0.3);
-    }
-    
-    .sector-card:nth-child(even) {
-        animation: slideInRight 0.8s ease-out;
-    }
-    
-    /* Enhanced table styling */
-    .stDataFrame {
-        animation: fadeInUp 1s ease-out;
-        border-radius: 15px;
-        overflow: hidden;
-    }
-    
-    /* Loading animations */
-    .stSpinner {
-        animation: pulse 1.5s infinite;
-    }
-    
-    /* Chart animations */
-    .js-plotly-plot {
-        animation: fadeInUp 1.2s ease-out;
-    }
-    
-    /* Button animations */
-    .stSelectbox {
-        animation: slideInLeft 0.8s ease-out;
-    }
-    
-    /* Enhanced scrollbar */
-    ::-webkit-scrollbar {
-        width: 12px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: linear-gradient(135deg, #667eea, #764ba2);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(135deg, #764ba2, #667eea);
-        border-radius: 10px;
-        border: 2px solid transparent;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(135deg, #5a67d8, #553c9a);
-    }
-    </style>
-    
-    <script>
-    // Add JavaScript for enhanced interactivity
-    window.onload = function() {
-        // Add click ripple effect to cards
-        const cards = document.querySelectorAll('.sector-card');
-        cards.forEach(card => {
-            card.addEventListener('click', function(e) {
-                let ripple = document.createElement('span');
-                let rect = this.getBoundingClientRect();
-                let size = Math.max(rect.width, rect.height);
-                let x = e.clientX - rect.left - size / 2;
-                let y = e.clientY - rect.top - size / 2;
-                
-                ripple.style.width = ripple.style.height = size + 'px';
-                ripple.style.left = x + 'px';
-                ripple.style.top = y + 'px';
-                ripple.classList.add('ripple');
-                
-                this.appendChild(ripple);
-                
-                setTimeout(() => {
-                    ripple.remove();
-                }, 600);
-            });
-        });
-        
-        // Add smooth scroll behavior
-        document.documentElement.style.scrollBehavior = 'smooth';
-        
-        // Intersection Observer for animations
-        const observerOptions = {
-            threshold: 0.1,
-            rootMargin: '0px 0px -50px 0px'
-        };
-        
-        const observer = new IntersectionObserver((entries) => {
-            entries.forEach(entry => {
-                if (entry.isIntersecting) {
-                    entry.target.style.animation = 'fadeInUp 0.8s ease-out forwards';
-                }
-            });
-        }, observerOptions);
-        
-        // Observe all animated elements
-        document.querySelectorAll('.sector-card, .metric-container').forEach(el => {
-            observer.observe(el);
-        });
-    };
-    </script>
-    """, unsafe_allow_html=True)
+    timer = section_timer("Styles")
+    # Page layout, animations and card styling
+    load_stylesheet('sector_rotation')
     
     # Animated header
     st.markdown('<div class="sector-header"><h1>🔄 Advanced Sector Rotation Analysis</h1><p>Comprehensive real-time sector performance with 150+ detailed categories</p><p><small>✨ Enhanced with AI-powered analytics and interactive visualizations</small></p></div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Get data manager
     data_manager = st.session_state.data_manager
     
-    # Fetch sector data with caching
-    if 'sector_data' not in st.session_state:
-        with st.spinner("Loading sector data..."):
-            st.session_state.sector_data = data_manager.get_sector_data()
+    # Shared snapshot of sector data; one fetch per refresh for all sessions
+    timer = section_timer("Sector data")
+    with st.spinner("Loading sector data..."):
+        sector_snapshot = SNAPSHOTS.get_or_fetch('sector_data', data_manager.get_sector_data)
     
-    sector_df = st.session_state.sector_data
+    sector_df = sector_snapshot.view()
+    sector_version = sector_snapshot.version
+    timer.lap("fetch")
     
     if sector_df.empty:
         st.error("Unable to load sector data. Please try refreshing.")
@@ -275,13 +60,16 @@ def render_sector_rotation():
     st.markdown("---")
     
     # Enhanced metrics with animations
+    timer = section_timer("Summary metrics")
     col1, col2, col3, col4, col5 = st.columns(5)
     
     total_sectors = len(sector_df)
-    gainers = len(sector_df[sector_df['Percent_Change'] > 0])
-    losers = len(sector_df[sector_df['Percent_Change'] < 0])
+    changes = sector_df['Percent_Change'].to_numpy()
+    gainers = int((changes > 0).sum())
+    losers = int((changes < 0).sum())
     neutral = total_sectors - gainers - losers
     avg_performance = sector_df['Percent_Change'].mean()
+    timer.lap("transform")
     
     with col1:
         st.markdown('<div class="metric-container">', unsafe_allow_html=True)
@@ -304,125 +92,10 @@ def render_sector_rotation():
         delta_color = "normal" if avg_performance > 0 else "inverse"
         st.metric("📊 Avg Performance", f"{avg_performance:.2f}%", delta=f"Market Average", delta_color=delta_color)
         st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Filter options
-    st.subheader("Filter Options")
-    filter_option = st.selectbox(
-        "Show sectors:",
-        ["All", "Gainers", "Losers", "Neutral"],
-        key="sector_filter"
-    )
-    
-    # Apply filter
-    if filter_option == "Gainers":
-        filtered_df = sector_df[sector_df['Percent_Change'] > 0]
-    elif filter_option == "Losers":
-        filtered_df = sector_df[sector_df['Percent_Change'] < 0]
-    elif filter_option == "Neutral":
-        filtered_df = sector_df[sector_df['Percent_Change'] == 0]
-    else:
-        filtered_df = sector_df
-    
-    # Top Performance Changes Section (like in your image)
-    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
-    st.subheader("📈 Top Performance Changes")
-    
-    # Get top performing sectors
-    top_performers = filtered_df.nlargest(10, 'Percent_Change')
-    
-    if not top_performers.empty:
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            st.markdown("### 🚀 Top Gainers")
-            for _, sector in top_performers.head(5).iterrows():
-                st.markdown(f"**{sector['Industry']}** - {sector['Percent_Change']:.2f}%", 
-                          help=f"Open: ₹{sector['Avg_Open']:.2f} | Close: ₹{sector['Avg_Close']:.2f}")
-        
-        with col2:
-            # Create top performance bar chart
-            fig_top = px.bar(
-                top_performers.head(8),
-                x='Percent_Change',
-                y='Industry',
-                orientation='h',
-                color='Percent_Change',
-                color_continuous_scale=['#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57'],
-                title="<b>🏆 Top 8 Sector Performance</b>",
-                text='Percent_Change'
-            )
-            fig_top.update_traces(
-                texttemplate='%{text:.2f}%',
-                textposition='outside',
-                hovertemplate='<b>%{y}</b><br>Performance: %{x:.2f}%<extra></extra>'
-            )
-            fig_top.update_layout(
-                height=400,
-                showlegend=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(size=10),
-                title_font_size=16,
-                margin=dict(l=20, r=20, t=40, b=20)
-            )
-            st.plotly_chart(fig_top, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Professional Industry Performance Overview (SwingAlgo Style)
-    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
-    st.subheader("📊 Industry Performance Overview")
-    
-    if not filtered_df.empty:
-        # Sort by performance and take top performers like SwingAlgo
-        top_performers = filtered_df.sort_values('Percent_Change', ascending=False).head(20)
-        
-        # Create professional horizontal bar chart matching SwingAlgo
-        fig_bar = px.bar(
-            top_performers,
-            x='Percent_Change',
-            y='Industry',
-            orientation='h',
-            color='Percent_Change',
-            color_continuous_scale=['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#27ae60'],
-            title="<b>Industry Performance Overview</b>",
-            labels={'Percent_Change': 'Performance (%)', 'Industry': ''},
-            text='Percent_Change'
-        )
-        
-        # Update layout to match SwingAlgo style
-        fig_bar.update_traces(
-            texttemplate='%{text:.2f}%', 
-            textposition='outside',
-            hovertemplate='<b>%{y}</b><br>Performance: %{x:.2f}%<extra></extra>',
-            textfont=dict(size=11, color='white')
-        )
-        
-        fig_bar.update_layout(
-            height=600, 
-            showlegend=False,
-            plot_bgcolor='#2c3e50',  # Dark background like SwingAlgo
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=11, color='white'),
-            title_font_size=18,
-            title_x=0.5,
-            xaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                showgrid=True,
-                tickformat='.1f',
-                ticksuffix='%',
-                range=[0, max(top_performers['Percent_Change'].max() * 1.2, 4)]
-            ),
-            yaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                showgrid=False,
-                tickfont=dict(size=10)
-            ),
-            margin=dict(l=250, r=100, t=50, b=50)  # More space for sector names
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Comprehensive 150+ Sectors Pie Chart
+    timer = section_timer("Category pie")
     st.markdown('<div class="sector-card">', unsafe_allow_html=True)
     st.subheader("🥧 Complete 150+ Sectors Market Distribution")
     st.caption("Interactive pie chart showing all sectors with detailed performance data")
@@ -453,7 +126,7 @@ def render_sector_rotation():
                 sector_categories[main_category]['sectors'].append(sector_name)
                 sector_categories[main_category]['total_change'] += row['Percent_Change']
                 sector_categories[main_category]['avg_price'] += row['Avg_Close']
-                sector_categories[main_category]['volume'] += row['Volume']
+                sector_categories[main_category]['volume'] += int(row['Volume'])
             
             # Prepare data for pie chart
             pie_data = []
@@ -473,45 +146,51 @@ def render_sector_rotation():
                 })
             
             pie_df = pd.DataFrame(pie_data)
+            timer.lap("transform")
             
             # Create animated pie chart
-            fig_pie = px.pie(
-                pie_df,
-                values='Sector_Count',
-                names='Category',
-                title="<b>📊 Market Distribution: 150+ Sectors by Category</b>",
-                hover_data=['Avg_Change', 'Total_Volume'],
-                color_discrete_sequence=['#FF6B6B', '#FFE66D', '#4ECDC4', '#45B7D1', '#96CEB4', '#A8E6CF', '#FF8B94', '#FFD93D', '#6BCF7F', '#4D4D4D', '#B4A7D6', '#F7DC6F', '#85C1E9', '#F8C471', '#82E0AA']
-            )
+            def build_category_pie():
+                fig_pie = px.pie(
+                    pie_df,
+                    values='Sector_Count',
+                    names='Category',
+                    title="<b>📊 Market Distribution: 150+ Sectors by Category</b>",
+                    hover_data=['Avg_Change', 'Total_Volume'],
+                    color_discrete_sequence=['#FF6B6B', '#FFE66D', '#4ECDC4', '#45B7D1', '#96CEB4', '#A8E6CF', '#FF8B94', '#FFD93D', '#6BCF7F', '#4D4D4D', '#B4A7D6', '#F7DC6F', '#85C1E9', '#F8C471', '#82E0AA']
+                )
             
-            fig_pie.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>' +
-                             'Sectors: %{value}<br>' +
-                             'Avg Change: %{customdata[0]:.2f}%<br>' +
-                             'Total Volume: %{customdata[1]:,.0f}<br>' +
-                             '<extra></extra>',
-                textfont_size=10,
-                marker=dict(line=dict(color='#FFFFFF', width=2))
-            )
+                fig_pie.update_traces(
+                    textposition='inside', 
+                    textinfo='percent+label',
+                    hovertemplate='<b>%{label}</b><br>' +
+                                 'Sectors: %{value}<br>' +
+                                 'Avg Change: %{customdata[0]:.2f}%<br>' +
+                                 'Total Volume: %{customdata[1]:,.0f}<br>' +
+                                 '<extra></extra>',
+                    textfont_size=10,
+                    marker=dict(line=dict(color='#FFFFFF', width=2))
+                )
             
-            fig_pie.update_layout(
-                height=600,
-                font=dict(size=12),
-                title_font_size=18,
-                showlegend=True,
-                legend=dict(
-                    orientation="v",
-                    yanchor="middle",
-                    y=0.5,
-                    xanchor="left",
-                    x=1.01
-                ),
-                margin=dict(l=20, r=120, t=60, b=20),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
+                fig_pie.update_layout(
+                    height=600,
+                    font=dict(size=12),
+                    title_font_size=18,
+                    showlegend=True,
+                    legend=dict(
+                        orientation="v",
+                        yanchor="middle",
+                        y=0.5,
+                        xanchor="left",
+                        x=1.01
+                    ),
+                    margin=dict(l=20, r=120, t=60, b=20),
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                return fig_pie
+
+            fig_pie = cached_figure('sector_category_pie', sector_version, None, build_category_pie)
+            timer.lap("figure")
             
             st.plotly_chart(fig_pie, use_container_width=True)
         
@@ -520,6 +199,7 @@ def render_sector_rotation():
             st.markdown("*Click on pie chart segments to see details*")
             
             # Display category summary
+            change_by_sector = dict(zip(sector_df['Industry'], sector_df['Percent_Change']))
             for i, (category, data) in enumerate(sector_categories.items()):
                 count = len(data['sectors'])
                 avg_change = data['total_change'] / count
@@ -537,136 +217,18 @@ def render_sector_rotation():
                     st.write(f"**Sector Count:** {count}")
                     st.write("**Sub-sectors:**")
                     for sector in data['sectors'][:5]:  # Show first 5
-                        sector_row = sector_df[sector_df['Industry'] == sector].iloc[0]
-                        st.write(f"• {sector}: {sector_row['Percent_Change']:.2f}%")
+                        st.write(f"• {sector}: {change_by_sector[sector]:.2f}%")
                     if count > 5:
                         st.write(f"... and {count-5} more sectors")
     
     st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
-    # Professional Sector Explorer (SwingAlgo Style)
-    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
-    st.subheader("🔍 Complete Sector Coverage - 150+ Industries")
-    
-    # Search functionality like SwingAlgo
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        search_query = st.text_input("🔍 Search industries...", placeholder="Type sector name to filter", key="sector_search")
-    with col2:
-        show_count = st.selectbox("Show", ["All", "Top 15", "Top 50"], key="show_count")
-    
-    if not filtered_df.empty:
-        # Apply search filter
-        if search_query:
-            search_filtered = filtered_df[filtered_df['Industry'].str.contains(search_query, case=False, na=False)]
-        else:
-            search_filtered = filtered_df
-            
-        # Apply count filter
-        if show_count == "Top 15":
-            display_df = search_filtered.head(15)
-        elif show_count == "Top 50":
-            display_df = search_filtered.head(50)
-        else:
-            display_df = search_filtered
-            
-        # Format the dataframe for professional display
-        display_df = display_df.copy().reset_index(drop=True)
-        display_df['Avg_Open'] = display_df['Avg_Open'].round(2)
-        display_df['Avg_Close'] = display_df['Avg_Close'].round(2)
-        display_df['Avg_High'] = display_df['Avg_High'].round(2)
-        display_df['Avg_Low'] = display_df['Avg_Low'].round(2)
-        display_df['Percent_Change'] = display_df['Percent_Change'].round(2)
-        
-        # Add trend arrows like SwingAlgo
-        display_df['Trend_Arrow'] = display_df['Percent_Change'].apply(
-            lambda x: "🟢 Up" if x > 0 else "🔴 Down" if x < 0 else "➡️ Flat"
-        )
-        
-        st.markdown(f"**Showing {len(display_df)} of {len(sector_df)} sectors**")
-        
-        # Professional table display matching SwingAlgo layout
-        st.dataframe(
-            display_df,
-            column_config={
-                "Industry": st.column_config.TextColumn("🏭 Industry", width="large", help="Sector/Industry name"),
-                "Avg_Open": st.column_config.NumberColumn("💰 Avg. Open", format="%.2f", help="Average opening price"),
-                "Avg_Close": st.column_config.NumberColumn("💰 Avg. Close", format="%.2f", help="Average closing price"),
-                "Avg_High": st.column_config.NumberColumn("📈 Avg. High", format="%.2f", help="Average high price"),
-                "Avg_Low": st.column_config.NumberColumn("📉 Avg. Low", format="%.2f", help="Average low price"),
-                "Percent_Change": st.column_config.NumberColumn("📊 Change (%)", format="%.2f%%", help="Percentage change"),
-                "Trend_Arrow": st.column_config.TextColumn("📊 Trend", help="Price trend direction")
-            },
-            use_container_width=True,
-            hide_index=True,
-            height=600
-        )
-        
-        # Sector selection for detailed view
-        st.markdown("---")
-        selected_sector = st.selectbox(
-            "🎯 Select a sector for detailed stock analysis:",
-            options=display_df['Industry'].tolist(),
-            key="sector_selector"
-        )
-        
-        # Display stocks in selected sector
-        if selected_sector:
-            st.markdown(f'### 🔍 Stocks in {selected_sector}')
-            
-            # Fetch sector stocks
-            sector_stocks = data_manager.get_sector_stocks(selected_sector)
-            
-            if not sector_stocks.empty:
-                # Format stock data
-                sector_stocks['Current_Price'] = sector_stocks['Current_Price'].round(2)
-                sector_stocks['Change'] = sector_stocks['Change'].round(2)
-                sector_stocks['Percent_Change'] = sector_stocks['Percent_Change'].round(2)
-                
-                st.markdown("#### 📋 Detailed Stock Data")
-                st.dataframe(
-                    sector_stocks,
-                    column_config={
-                        "Symbol": "🏷️ Stock Symbol",
-                        "Current_Price": st.column_config.NumberColumn("💵 Current Price", format="₹%.2f"),
-                        "Change": st.column_config.NumberColumn("📊 Change", format="₹%.2f"),
-                        "Percent_Change": st.column_config.NumberColumn("📈 % Change", format="%.2f%%"),
-                        "Volume": st.column_config.NumberColumn("📊 Volume", format="%d"),
-                        "High": st.column_config.NumberColumn("⬆️ Day High", format="₹%.2f"),
-                        "Low": st.column_config.NumberColumn("⬇️ Day Low", format="₹%.2f")
-                    },
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # Stock performance chart for selected sector
-                stock_fig = px.bar(
-                    sector_stocks.head(10),
-                    x='Symbol',
-                    y='Percent_Change',
-                    color='Percent_Change',
-                    color_continuous_scale=['#FF6B6B', '#FFE66D', '#4ECDC4'],
-                    title=f"📊 Top 10 Stocks Performance in {selected_sector}",
-                    text='Percent_Change'
-                )
-                stock_fig.update_traces(
-                    texttemplate='%{text:.1f}%',
-                    textposition='outside'
-                )
-                stock_fig.update_layout(
-                    height=400,
-                    showlegend=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(stock_fig, use_container_width=True)
-            else:
-                st.info(f"No stock data available for {selected_sector}")
-    else:
-        st.info(f"No sectors found for filter: {filter_option}")
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Filter-driven panels rerun on their own when the filter or table widgets change
+    _render_filtered_panels(sector_snapshot, data_manager)
     
     # Top Performance Changes
+    timer = section_timer("Top 5 gainers/losers")
     col1, col2 = st.columns(2)
     
     with col1:
@@ -686,125 +248,80 @@ def render_sector_rotation():
                 st.error(f"{row['Industry']}: {row['Percent_Change']:.2f}%")
         else:
             st.info("No loser data available")
+    timer.lap("emit")
+    
+    # Every index and sub-industry, aggregated from one constituent snapshot
+    _render_sector_aggregates(data_manager)
+    
+    # Broad move or one heavyweight: constituents above their DMAs, at highs, advancing
+    _render_sector_participation(data_manager)
+    
+    # Volume and price shocks flagged by the background detector
+    _render_unusual_activity()
+    
+    # Today's rotation from the live feed's intraday bars
+    _render_intraday_rotation()
+    
+    # The leaderboard at any earlier moment today, from the snapshot log
+    _render_leaderboard_replay()
     
     # Enhanced Market Heatmap with 4K quality
+    timer = section_timer("Heatmap")
     st.markdown('<div class="sector-card">', unsafe_allow_html=True)
     st.subheader("🗺️ Market Heatmap - Live Performance")
+    timer.lap("emit")
     
     # Fetch heatmap data
-    if 'heatmap_data' not in st.session_state:
-        with st.spinner("🔄 Loading high-resolution heatmap data..."):
-            st.session_state.heatmap_data = data_manager.get_market_heatmap_data()
+    with st.spinner("🔄 Loading high-resolution heatmap data..."):
+        heatmap_snapshot = SNAPSHOTS.get_or_fetch('heatmap_data', data_manager.get_market_heatmap_data)
     
-    heatmap_df = st.session_state.heatmap_data
+    heatmap_df = heatmap_snapshot.view()
+    timer.lap("fetch")
     
     if not heatmap_df.empty:
         # Create enhanced treemap for heatmap visualization
-        fig_heatmap = px.treemap(
-            heatmap_df.head(25),  # Top 25 stocks
-            path=['Symbol'],
-            values='Volume',
-            color='Change',
-            color_continuous_scale=['#FF4757', '#FFA502', '#2ED573', '#1E90FF', '#5F27CD'],
-            title="<b>🎯 Live Market Heatmap</b><br><sub>Size: Trading Volume | Color: Performance %</sub>"
-        )
-        fig_heatmap.update_traces(
-            textinfo='label+value',
-            hovertemplate='<b>%{label}</b><br>Change: %{color:.2f}%<br>Volume: %{value:,.0f}<extra></extra>'
-        )
-        fig_heatmap.update_layout(
-            height=600,
-            font=dict(size=14),
-            title_font_size=18,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_heatmap():
+            fig_heatmap = px.treemap(
+                heatmap_df.head(25),  # Top 25 stocks
+                path=['Symbol'],
+                values='Volume',
+                color='Change',
+                color_continuous_scale=['#FF4757', '#FFA502', '#2ED573', '#1E90FF', '#5F27CD'],
+                title="<b>🎯 Live Market Heatmap</b><br><sub>Size: Trading Volume | Color: Performance %</sub>"
+            )
+            fig_heatmap.update_traces(
+                textinfo='label+value',
+                hovertemplate='<b>%{label}</b><br>Change: %{color:.2f}%<br>Volume: %{value:,.0f}<extra></extra>'
+            )
+            fig_heatmap.update_layout(
+                height=600,
+                font=dict(size=14),
+                title_font_size=18,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig_heatmap
+
+        fig_heatmap = cached_figure('sector_heatmap', heatmap_snapshot.version, None, build_heatmap)
+        timer.lap("figure")
         st.plotly_chart(fig_heatmap, use_container_width=True, config={'displayModeBar': True, 'toImageButtonOptions': {'height': 1080, 'width': 1920}})
     else:
         st.info("🔄 Heatmap data is being updated...")
     st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Price Chart with toggles
-    st.subheader("📈 Price Chart Analysis")
-    
-    chart_options = st.multiselect(
-        "Select chart elements:",
-        ["Price", "Volume", "MA20", "MA50"],
-        default=["Price"],
-        key="chart_toggles"
-    )
-    
-    if chart_options and not sector_df.empty:
-        # Generate sample time series data for demonstration
-        dates = pd.date_range(start='2024-01-01', end=datetime.now(), freq='D')
-        sample_data = pd.DataFrame({
-            'Date': dates,
-            'Price': np.random.randn(len(dates)).cumsum() + 100,
-            'Volume': np.random.randint(1000000, 5000000, len(dates))
-        })
-        
-        # Calculate moving averages
-        sample_data['MA20'] = sample_data['Price'].rolling(20).mean()
-        sample_data['MA50'] = sample_data['Price'].rolling(50).mean()
-        
-        # Create subplot
-        fig_chart = go.Figure()
-        
-        if "Price" in chart_options:
-            fig_chart.add_trace(go.Scatter(
-                x=sample_data['Date'], 
-                y=sample_data['Price'],
-                mode='lines',
-                name='Price',
-                line=dict(color='blue')
-            ))
-        
-        if "MA20" in chart_options:
-            fig_chart.add_trace(go.Scatter(
-                x=sample_data['Date'], 
-                y=sample_data['MA20'],
-                mode='lines',
-                name='MA20',
-                line=dict(color='orange')
-            ))
-        
-        if "MA50" in chart_options:
-            fig_chart.add_trace(go.Scatter(
-                x=sample_data['Date'], 
-                y=sample_data['MA50'],
-                mode='lines',
-                name='MA50',
-                line=dict(color='red')
-            ))
-        
-        fig_chart.update_layout(
-            title="Market Index Price Chart",
-            xaxis_title="Date",
-            yaxis_title="Price",
-            height=400
-        )
-        
-        st.plotly_chart(fig_chart, use_container_width=True)
-        
-        if "Volume" in chart_options:
-            fig_volume = px.bar(
-                sample_data.tail(30), 
-                x='Date', 
-                y='Volume',
-                title="Volume Chart (Last 30 Days)"
-            )
-            fig_volume.update_layout(height=300)
-            st.plotly_chart(fig_volume, use_container_width=True)
+    _render_price_chart(data_manager)
     
     # FII/DII Net Flow
+    timer = section_timer("FII/DII")
     st.subheader("💰 FII/DII Net Flow")
+    timer.lap("emit")
     
     # Fetch FII/DII data
-    if 'fii_dii_data' not in st.session_state:
-        with st.spinner("Loading FII/DII data..."):
-            st.session_state.fii_dii_data = data_manager.get_fii_dii_data()
-    
-    fii_dii = st.session_state.fii_dii_data
+    with st.spinner("Loading FII/DII data..."):
+        fii_dii = SNAPSHOTS.get_or_fetch('fii_dii_data', data_manager.get_fii_dii_data).data
+    timer.lap("fetch")
     
     col1, col2, col3 = st.columns(3)
     
@@ -840,3 +357,893 @@ def render_sector_rotation():
             delta=f"{'Bullish' if total_net > 0 else 'Bearish'}"
         )
         st.markdown(f"**Overall Impact:** {'🟢 Positive' if total_net > 0 else '🔴 Negative'}")
+    timer.lap("emit")
+    
+    _render_fii_dii_history()
+    
+    # Momentum rotation tested on the stored sector history
+    _render_rotation_backtest()
+
+
+@timed_fragment
+def _render_filtered_panels(sector_snapshot, data_manager):
+    """Filter selector with the top performers, overview and sector explorer it drives.
+
+    Filters select row positions in the shared snapshot; only the rows that
+    are actually charted or listed get materialized.
+    """
+    # Filter options
+    timer = section_timer("Filter")
+    st.subheader("Filter Options")
+    filter_option = st.selectbox(
+        "Show sectors:",
+        ["All", "Gainers", "Losers", "Neutral"],
+        key="sector_filter"
+    )
+    
+    # Apply filter
+    changes = sector_snapshot.frame['Percent_Change'].to_numpy()
+    if filter_option == "Gainers":
+        rows = sector_snapshot.rows(changes > 0)
+    elif filter_option == "Losers":
+        rows = sector_snapshot.rows(changes < 0)
+    elif filter_option == "Neutral":
+        rows = sector_snapshot.rows(changes == 0)
+    else:
+        rows = sector_snapshot.rows()
+    ranked = sector_snapshot.top('Percent_Change', rows=rows)
+    sector_version = sector_snapshot.version
+    timer.lap("transform")
+    
+    # Top Performance Changes Section (like in your image)
+    timer = section_timer("Top performers")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("📈 Top Performance Changes")
+    
+    # Get top performing sectors
+    top_performers = sector_snapshot.take(ranked[:10])
+    timer.lap("transform")
+    
+    if not top_performers.empty:
+        col1, col2 = st.columns([1, 1])
+        
+        with col1:
+            st.markdown("### 🚀 Top Gainers")
+            for _, sector in top_performers.head(5).iterrows():
+                st.markdown(f"**{sector['Industry']}** - {sector['Percent_Change']:.2f}%", 
+                          help=f"Open: ₹{sector['Avg_Open']:.2f} | Close: ₹{sector['Avg_Close']:.2f}")
+        timer.lap("emit")
+        
+        with col2:
+            # Create top performance bar chart
+            def build_top_chart():
+                fig_top = px.bar(
+                    top_performers.head(8),
+                    x='Percent_Change',
+                    y='Industry',
+                    orientation='h',
+                    color='Percent_Change',
+                    color_continuous_scale=['#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57'],
+                    title="<b>🏆 Top 8 Sector Performance</b>",
+                    text='Percent_Change'
+                )
+                fig_top.update_traces(
+                    texttemplate='%{text:.2f}%',
+                    textposition='outside',
+                    hovertemplate='<b>%{y}</b><br>Performance: %{x:.2f}%<extra></extra>'
+                )
+                fig_top.update_layout(
+                    height=400,
+                    showlegend=False,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(size=10),
+                    title_font_size=16,
+                    margin=dict(l=20, r=20, t=40, b=20)
+                )
+                return fig_top
+
+            fig_top = cached_figure('sector_top_performers', sector_version, filter_option, build_top_chart)
+            timer.lap("figure")
+            st.plotly_chart(fig_top, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+    
+    # Professional Industry Performance Overview (SwingAlgo Style)
+    timer = section_timer("Industry overview")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("📊 Industry Performance Overview")
+    
+    if len(rows):
+        # Sort by performance and take top performers like SwingAlgo
+        top_performers = sector_snapshot.take(ranked[:20])
+        timer.lap("transform")
+        
+        # Create professional horizontal bar chart matching SwingAlgo
+        def build_overview_chart():
+            fig_bar = px.bar(
+                top_performers,
+                x='Percent_Change',
+                y='Industry',
+                orientation='h',
+                color='Percent_Change',
+                color_continuous_scale=['#e74c3c', '#f39c12', '#f1c40f', '#2ecc71', '#27ae60'],
+                title="<b>Industry Performance Overview</b>",
+                labels={'Percent_Change': 'Performance (%)', 'Industry': ''},
+                text='Percent_Change'
+            )
+        
+            # Update layout to match SwingAlgo style
+            fig_bar.update_traces(
+                texttemplate='%{text:.2f}%', 
+                textposition='outside',
+                hovertemplate='<b>%{y}</b><br>Performance: %{x:.2f}%<extra></extra>',
+                textfont=dict(size=11, color='white')
+            )
+        
+            fig_bar.update_layout(
+                height=600, 
+                showlegend=False,
+                plot_bgcolor='#2c3e50',  # Dark background like SwingAlgo
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(size=11, color='white'),
+                title_font_size=18,
+                title_x=0.5,
+                xaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)',
+                    showgrid=True,
+                    tickformat='.1f',
+                    ticksuffix='%',
+                    range=[0, max(top_performers['Percent_Change'].max() * 1.2, 4)]
+                ),
+                yaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)',
+                    showgrid=False,
+                    tickfont=dict(size=10)
+                ),
+                margin=dict(l=250, r=100, t=50, b=50)  # More space for sector names
+            )
+            return fig_bar
+
+        fig_bar = cached_figure('sector_industry_overview', sector_version, filter_option, build_overview_chart)
+        timer.lap("figure")
+        st.plotly_chart(fig_bar, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+    
+    # Professional Sector Explorer (SwingAlgo Style)
+    _render_sector_explorer(sector_snapshot, rows, filter_option, data_manager)
+
+
+@timed_fragment
+def _render_sector_explorer(sector_snapshot, rows, filter_option, data_manager):
+    """Searchable sector table and the stock drill-down for one filter"""
+    timer = section_timer("Sector table")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("🔍 Complete Sector Coverage - 150+ Industries")
+    
+    # Search functionality like SwingAlgo
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        search_query = st.text_input("🔍 Search industries...", placeholder="Type sector name to filter", key="sector_search")
+    with col2:
+        show_count = st.selectbox("Show", ["All", "Top 15", "Top 50"], key="show_count")
+    
+    if len(rows):
+        # Apply search filter
+        if search_query:
+            matches = sector_snapshot.frame['Industry'].str.contains(search_query, case=False, na=False)
+            rows = rows[matches.to_numpy()[rows]]
+            
+        # Apply count filter
+        if show_count == "Top 15":
+            rows = rows[:15]
+        elif show_count == "Top 50":
+            rows = rows[:50]
+            
+        # Only the listed rows are copied out of the shared snapshot
+        display_df = sector_snapshot.take(rows)
+        display_df['Avg_Open'] = display_df['Avg_Open'].round(2)
+        display_df['Avg_Close'] = display_df['Avg_Close'].round(2)
+        display_df['Avg_High'] = display_df['Avg_High'].round(2)
+        display_df['Avg_Low'] = display_df['Avg_Low'].round(2)
+        display_df['Percent_Change'] = display_df['Percent_Change'].round(2)
+        
+        # Add trend arrows like SwingAlgo
+        display_df['Trend_Arrow'] = display_df['Trend_Code'].map({1: "🟢 Up", -1: "🔴 Down", 0: "➡️ Flat"})
+        # Longer-horizon returns from the stored close history
+        display_df = with_returns(display_df, 'Industry', get_return_table())
+        timer.lap("transform")
+        
+        st.markdown(f"**Showing {len(display_df)} of {len(sector_snapshot)} sectors**")
+        
+        # Professional table display matching SwingAlgo layout
+        st.dataframe(
+            display_df,
+            column_config={
+                "Industry": st.column_config.TextColumn("🏭 Industry", width="large", help="Sector/Industry name"),
+                "Avg_Open": st.column_config.NumberColumn("💰 Avg. Open", format="%.2f", help="Average opening price"),
+                "Avg_Close": st.column_config.NumberColumn("💰 Avg. Close", format="%.2f", help="Average closing price"),
+                "Avg_High": st.column_config.NumberColumn("📈 Avg. High", format="%.2f", help="Average high price"),
+                "Avg_Low": st.column_config.NumberColumn("📉 Avg. Low", format="%.2f", help="Average low price"),
+                "Percent_Change": st.column_config.NumberColumn("📊 Change (%)", format="%.2f%%", help="Percentage change"),
+                "Trend_Arrow": st.column_config.TextColumn("📊 Trend", help="Price trend direction"),
+                "Trend_Code": None,
+                **{horizon: st.column_config.NumberColumn(f"{horizon} %", format="%.2f%%") for horizon in TABLE_HORIZONS}
+            },
+            use_container_width=True,
+            hide_index=True,
+            height=600
+        )
+        timer.lap("emit")
+        
+        # Sector selection for detailed view
+        _render_sector_drilldown(display_df['Industry'].tolist(), data_manager)
+        timer.skip()
+    else:
+        st.info(f"No sectors found for filter: {filter_option}")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_sector_drilldown(sectors, data_manager):
+    """Stock table and chart for the sector picked in the explorer"""
+    timer = section_timer("Drill-down")
+    st.markdown("---")
+    selected_sector = st.selectbox(
+        "🎯 Select a sector for detailed stock analysis:",
+        options=sectors,
+        key="sector_selector"
+    )
+    
+    # Display stocks in selected sector
+    if selected_sector:
+        st.markdown(f'### 🔍 Stocks in {selected_sector}')
+        timer.lap("emit")
+        
+        # Fetch sector stocks
+        sector_stocks = data_manager.get_sector_stocks(selected_sector)
+        timer.lap("fetch")
+        
+        if not sector_stocks.empty:
+            # Format stock data
+            sector_stocks['Current_Price'] = sector_stocks['Current_Price'].round(2)
+            sector_stocks['Change'] = sector_stocks['Change'].round(2)
+            sector_stocks['Percent_Change'] = sector_stocks['Percent_Change'].round(2)
+            timer.lap("transform")
+            
+            st.markdown("#### 📋 Detailed Stock Data")
+            st.dataframe(
+                sector_stocks,
+                column_config={
+                    "Symbol": "🏷️ Stock Symbol",
+                    "Current_Price": st.column_config.NumberColumn("💵 Current Price", format="₹%.2f"),
+                    "Change": st.column_config.NumberColumn("📊 Change", format="₹%.2f"),
+                    "Percent_Change": st.column_config.NumberColumn("📈 % Change", format="%.2f%%"),
+                    "Volume": st.column_config.NumberColumn("📊 Volume", format="%d"),
+                    "High": st.column_config.NumberColumn("⬆️ Day High", format="₹%.2f"),
+                    "Low": st.column_config.NumberColumn("⬇️ Day Low", format="₹%.2f")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+            timer.lap("emit")
+            
+            # Stock performance chart for selected sector
+            def build_stock_chart():
+                stock_fig = px.bar(
+                    sector_stocks.head(10),
+                    x='Symbol',
+                    y='Percent_Change',
+                    color='Percent_Change',
+                    color_continuous_scale=['#FF6B6B', '#FFE66D', '#4ECDC4'],
+                    title=f"📊 Top 10 Stocks Performance in {selected_sector}",
+                    text='Percent_Change'
+                )
+                stock_fig.update_traces(
+                    texttemplate='%{text:.1f}%',
+                    textposition='outside'
+                )
+                stock_fig.update_layout(
+                    height=400,
+                    showlegend=False,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                return stock_fig
+
+            stock_fig = cached_figure('sector_stocks', data_version(sector_stocks), selected_sector, build_stock_chart)
+            timer.lap("figure")
+            st.plotly_chart(stock_fig, use_container_width=True)
+        else:
+            st.info(f"No stock data available for {selected_sector}")
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_price_chart(data_manager):
+    """Daily price chart of one stock with stored-bar indicators and its element toggles"""
+    timer = section_timer("Price chart")
+    st.subheader("📈 Price Chart Analysis")
+    
+    universe = SNAPSHOTS.get_or_fetch('universe_quotes', data_manager.get_universe_quotes)
+    if universe.frame is None or universe.frame.empty:
+        st.info("🔄 Stock quotes are unavailable right now")
+        timer.lap("emit")
+        return
+    symbols = sorted(universe.frame['Symbol'].astype(str).unique())
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        symbol = st.selectbox("Stock:", symbols, key="chart_symbol")
+    with col2:
+        chart_options = st.multiselect(
+            "Select chart elements:",
+            ["Price", "Volume", "MA20", "MA50", "Bollinger", "VWAP"],
+            default=["Price"],
+            key="chart_toggles"
+        )
+    timer.lap("emit")
+    
+    # Latest indicator readings for the whole universe, as of this snapshot
+    indicators = get_indicators(data_manager)
+    if indicators is not None:
+        latest = indicators.take(indicators.rows(indicators.frame['Symbol'].to_numpy() == symbol))
+        if not latest.empty:
+            latest = latest.iloc[0]
+            cols = st.columns(4)
+            cols[0].metric("RSI (14)", f"{latest['RSI_14']:.1f}" if pd.notna(latest['RSI_14']) else "N/A")
+            cols[1].metric("ATR (14)", f"{latest['ATR_14']:.2f}" if pd.notna(latest['ATR_14']) else "N/A")
+            cols[2].metric("MACD Hist", f"{latest['MACD_Hist']:.2f}" if pd.notna(latest['MACD_Hist']) else "N/A")
+            cols[3].metric("VWAP (20)", f"₹{latest['VWAP_20']:,.2f}" if pd.notna(latest['VWAP_20']) else "N/A")
+    timer.lap("fetch")
+    
+    if not chart_options:
+        return
+    series = symbol_series(data_manager, symbol)
+    timer.lap("transform")
+    if series.empty:
+        st.info(f"🔄 No daily history for {symbol} yet")
+        timer.lap("emit")
+        return
+    
+    def build_price_chart():
+        fig_chart = go.Figure()
+        lines = [("Price", 'Close', 'Price', '#1E90FF'), ("MA20", 'SMA_20', 'SMA 20', '#FFA502'),
+                 ("MA50", 'SMA_50', 'SMA 50', '#FF4757'), ("VWAP", 'VWAP_20', 'VWAP 20', '#8E44AD')]
+        for option, column, name, color in lines:
+            if option in chart_options:
+                fig_chart.add_trace(go.Scatter(
+                    x=series.index, y=series[column], mode='lines', name=name, line=dict(color=color)
+                ))
+        if "Bollinger" in chart_options:
+            fig_chart.add_trace(go.Scatter(
+                x=series.index, y=series['BB_Upper'], mode='lines', name='Bollinger upper',
+                line=dict(color='rgba(46,213,115,0.6)', dash='dot')
+            ))
+            fig_chart.add_trace(go.Scatter(
+                x=series.index, y=series['BB_Lower'], mode='lines', name='Bollinger lower',
+                line=dict(color='rgba(46,213,115,0.6)', dash='dot'), fill='tonexty',
+                fillcolor='rgba(46,213,115,0.08)'
+            ))
+        fig_chart.update_layout(
+            title=f"{symbol} Daily Price Chart",
+            xaxis_title="Date",
+            yaxis_title="Price",
+            height=400
+        )
+        
+        fig_volume = None
+        if "Volume" in chart_options:
+            fig_volume = px.bar(
+                series.tail(30).reset_index(names='Date'),
+                x='Date',
+                y='Volume',
+                title="Volume Chart (Last 30 Sessions)"
+            )
+            fig_volume.update_layout(height=300)
+        return fig_chart, fig_volume
+    
+    fig_chart, fig_volume = cached_figure(
+        'sector_price_chart', data_version(series), (symbol, sorted(chart_options)), build_price_chart
+    )
+    timer.lap("figure")
+    
+    st.plotly_chart(fig_chart, use_container_width=True)
+    
+    if fig_volume is not None:
+        st.plotly_chart(fig_volume, use_container_width=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_intraday_rotation():
+    """Cumulative change of every sector through today's intraday bars"""
+    timer = section_timer("Intraday rotation")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("⏱️ Intraday Sector Rotation")
+    timeframe = st.radio("Bar size", ["5m", "1m"], horizontal=True, key="intraday_sector_tf")
+    
+    engine = intraday_engine('sector_data')
+    change = engine.cumulative_change(timeframe)
+    timer.lap("transform")
+    
+    if change.empty or change.shape[1] < 2:
+        st.info("📡 Intraday bars build up while the live feed runs during market hours")
+    else:
+        # Leaders on top, by where each sector stands in the latest bar
+        since = change.attrs.get('since')
+        change = change.loc[change.iloc[:, -1].sort_values(ascending=False).index]
+        basis = f"since first update at {since}" if since else "since open"
+        
+        def build_rotation():
+            fig = px.imshow(
+                change,
+                color_continuous_scale=['#e74c3c', '#f5f5f5', '#27ae60'],
+                color_continuous_midpoint=0,
+                aspect='auto',
+                labels=dict(x="Time (IST)", y="", color=f"% {basis}"),
+                title=f"<b>Sector change {basis} ({timeframe} bars)</b>"
+            )
+            fig.update_layout(
+                height=max(400, 22 * len(change)),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
+            return fig
+        
+        fig = cached_figure('sector_intraday_rotation', engine.revision, timeframe, build_rotation)
+        timer.lap("figure")
+        st.plotly_chart(fig, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+REPLAY_LEADERS = 10
+
+
+def _with_ranks(leaderboard):
+    """Leaderboard plus its Rank by % change (1 = best)"""
+    leaderboard = leaderboard.copy()
+    leaderboard['Rank'] = leaderboard['Percent_Change'].rank(ascending=False, method='min')
+    return leaderboard.set_index('Industry')
+
+
+@timed_fragment
+def _render_leaderboard_replay():
+    """Sector leaderboard replayed from today's snapshot log"""
+    timer = section_timer("Leaderboard replay")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("⏪ Sector Leaderboard Replay")
+    log = get_snapshot_log('sector_data')
+    times = log.times()
+    timer.lap("fetch")
+
+    if len(times) < 2:
+        st.info("📼 The replay fills in as sector snapshots arrive through the day")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+
+    labels = [t.strftime('%H:%M:%S') for t in times]
+    label = st.select_slider("Replay at (IST)", options=labels, value=labels[-1], key="replay_time")
+    when = times[labels.index(label)]
+    timer.lap("emit")
+
+    current = _with_ranks(log.as_of(when))
+    opening = _with_ranks(log.as_of(times[0]))['Rank']
+    earlier = _with_ranks(log.as_of(when - pd.Timedelta(minutes=30)))['Rank']
+    current['Rank_vs_Open'] = opening.reindex(current.index) - current['Rank']
+    current['Rank_vs_30m'] = earlier.reindex(current.index) - current['Rank']
+    leaderboard = current.sort_values('Rank').reset_index()
+    ranks = log.ranks()
+    timer.lap("transform")
+
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        st.dataframe(
+            leaderboard[['Rank', 'Industry', 'Percent_Change', 'Rank_vs_Open', 'Rank_vs_30m']],
+            column_config={
+                "Rank": st.column_config.NumberColumn("#", format="%d"),
+                "Percent_Change": st.column_config.NumberColumn("Change %", format="%.2f%%"),
+                "Rank_vs_Open": st.column_config.NumberColumn(f"Δ Rank since {labels[0][:5]}", format="%+d"),
+                "Rank_vs_30m": st.column_config.NumberColumn("Δ Rank 30m", format="%+d")
+            },
+            use_container_width=True,
+            hide_index=True,
+            height=420
+        )
+    with col2:
+        leaders = leaderboard['Industry'].head(REPLAY_LEADERS).tolist()
+
+        def build_replay():
+            fig = go.Figure()
+            for name in leaders:
+                if name in ranks:
+                    fig.add_trace(go.Scatter(x=ranks.index, y=ranks[name], name=name, mode='lines'))
+            fig.add_vline(x=when, line_dash='dot', line_color='#7f8c8d')
+            fig.update_layout(
+                title=f"<b>Rank through the day · leaders at {label}</b>",
+                height=420,
+                yaxis=dict(autorange='reversed', title='Rank'),
+                legend=dict(orientation='h', y=-0.2),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
+            return fig
+
+        fig = cached_figure('sector_rank_replay', log.revision, label, build_replay)
+        timer.lap("figure")
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(times)} snapshots logged today, {labels[0]} to {labels[-1]} IST")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_sector_aggregates(data_manager):
+    """Cap- and equal-weighted returns for every index and sub-industry"""
+    timer = section_timer("Sector aggregates")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("🧩 Constituent-Weighted Sector Aggregates")
+    level = st.radio("Group by", ["Indices", "Sub-industries"], horizontal=True, key="aggregate_level")
+    timer.lap("emit")
+    
+    with st.spinner("🔄 Aggregating constituent quotes..."):
+        snapshot = get_sector_aggregates(data_manager)
+    timer.lap("fetch")
+    
+    if snapshot is None or snapshot.frame.empty:
+        st.info("🔄 Constituent quotes are unavailable right now")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+    
+    frame = snapshot.frame
+    rows = snapshot.rows(frame['Level'].to_numpy() == ('Index' if level == "Indices" else 'Industry'))
+    # Strongest and weakest 15 (rows are already ordered by weighted return)
+    shown = rows if len(rows) <= 30 else np.concatenate([rows[:15], rows[-15:]])
+    aggregates = snapshot.take(rows)
+    timer.lap("transform")
+    
+    def build_aggregates():
+        chart_df = snapshot.take(shown[::-1])
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=chart_df['Weighted_Return'], y=chart_df['Sector'], orientation='h', name='Cap-weighted',
+            marker_color=np.where(chart_df['Weighted_Return'] >= 0, '#2ED573', '#FF4757'),
+            customdata=np.stack([chart_df['Members'], chart_df['Dispersion']], axis=1),
+            hovertemplate='<b>%{y}</b><br>Cap-weighted: %{x:.2f}%<br>Members: %{customdata[0]}'
+                          '<br>Dispersion: %{customdata[1]:.2f}<extra></extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=chart_df['Equal_Return'], y=chart_df['Sector'], mode='markers', name='Equal-weighted',
+            marker=dict(color='#1E90FF', size=9, symbol='diamond')
+        ))
+        fig.update_layout(
+            title=f"<b>{level}: cap-weighted vs equal-weighted return</b>",
+            height=max(400, 24 * len(chart_df)),
+            xaxis_title="% change",
+            legend=dict(orientation='h', y=-0.1),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+    
+    fig = cached_figure('sector_aggregates', snapshot.version, level, build_aggregates)
+    timer.lap("figure")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander(f"📋 All {len(aggregates)} {level.lower()}"):
+        st.dataframe(
+            aggregates.drop(columns=['Level']),
+            column_config={
+                "Weighted_Return": st.column_config.NumberColumn("Cap-weighted %", format="%.2f%%"),
+                "Equal_Return": st.column_config.NumberColumn("Equal-weighted %", format="%.2f%%"),
+                "Dispersion": st.column_config.NumberColumn("Dispersion", format="%.2f"),
+                "Volume": st.column_config.NumberColumn("Volume", format="%d"),
+                "Turnover": st.column_config.NumberColumn("Turnover (₹)", format="%.0f")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    universe = SNAPSHOTS.get('universe_quotes')
+    st.caption(f"{len(aggregates)} {level.lower()} from one snapshot of {len(universe) if universe else 0:,} stocks")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_sector_participation(data_manager):
+    """Share of each sector's constituents above their DMAs, at 52-week highs and advancing"""
+    timer = section_timer("Sector participation")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("📶 Sector Participation")
+    level = st.radio("Group by", ["Indices", "Sub-industries"], horizontal=True, key="participation_level")
+    timer.lap("emit")
+    
+    with st.spinner("🔄 Measuring sector participation..."):
+        snapshot = get_sector_participation(data_manager)
+    timer.lap("fetch")
+    
+    if snapshot is None or snapshot.frame.empty:
+        st.info("🔄 Constituent quotes are unavailable right now")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+    
+    frame = snapshot.frame
+    rows = snapshot.rows(frame['Level'].to_numpy() == ('Index' if level == "Indices" else 'Industry'))
+    # Broadest and narrowest 15 (rows are already ordered by % above the 50-DMA)
+    shown = rows if len(rows) <= 30 else np.concatenate([rows[:15], rows[-15:]])
+    participation = snapshot.take(rows)
+    timer.lap("transform")
+    
+    def build_participation():
+        chart_df = snapshot.take(shown[::-1])
+        fig = go.Figure()
+        for column, label, color in [('Above_20DMA', '> 20-DMA', '#FFA502'),
+                                     ('Above_50DMA', '> 50-DMA', '#1E90FF'),
+                                     ('Above_200DMA', '> 200-DMA', '#2ED573')]:
+            fig.add_trace(go.Bar(
+                x=chart_df[column], y=chart_df['Sector'], orientation='h', name=label, marker_color=color,
+                customdata=np.stack([chart_df['Advances'], chart_df['Declines'], chart_df['Pct_New_Highs']], axis=1),
+                hovertemplate='<b>%{y}</b><br>' + label + ': %{x:.0f}%<br>Adv/Dec: %{customdata[0]}/%{customdata[1]}'
+                              '<br>At 52W high: %{customdata[2]:.0f}%<extra></extra>'
+            ))
+        fig.update_layout(
+            title=f"<b>{level}: % of constituents above their moving averages</b>",
+            barmode='group',
+            height=max(400, 36 * len(chart_df)),
+            xaxis=dict(title="% of constituents", range=[0, 100]),
+            legend=dict(orientation='h', y=-0.1),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+    
+    fig = cached_figure('sector_participation', snapshot.version, level, build_participation)
+    timer.lap("figure")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander(f"📋 Participation across {len(participation)} {level.lower()}"):
+        st.dataframe(
+            participation.drop(columns=['Level']),
+            column_config={
+                "AD_Ratio": st.column_config.NumberColumn("A/D Ratio", format="%.2f"),
+                "Above_20DMA": st.column_config.ProgressColumn("> 20-DMA", format="%.0f%%", min_value=0, max_value=100),
+                "Above_50DMA": st.column_config.ProgressColumn("> 50-DMA", format="%.0f%%", min_value=0, max_value=100),
+                "Above_200DMA": st.column_config.ProgressColumn("> 200-DMA", format="%.0f%%", min_value=0, max_value=100),
+                "New_Highs": st.column_config.NumberColumn("52W Highs", format="%d"),
+                "Pct_New_Highs": st.column_config.NumberColumn("% at 52W High", format="%.1f%%")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    if frame['Above_20DMA'].isna().all():
+        st.caption("Moving-average participation appears once 20 sessions of closes are stored "
+                   "(`python price_history.py --backfill`)")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_unusual_activity():
+    """Stocks trading far outside their own volume and return baselines"""
+    timer = section_timer("Unusual activity")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("🚨 Unusual Activity")
+    
+    # Published by the background detector after each universe snapshot; never fetched here
+    snapshot = SNAPSHOTS.get('unusual_activity')
+    timer.lap("fetch")
+    if snapshot is None:
+        st.info("🔄 The activity scan runs after the next market snapshot")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+    if snapshot.frame is None or snapshot.frame.empty:
+        st.success(f"✅ No stock is more than {THRESHOLD:.0f}σ from its usual volume or move")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+    
+    activity = snapshot.frame
+    by_industry = activity.groupby('Industry', observed=True).agg(
+        Stocks=('Symbol', 'size'), Avg_Change=('Percent_Change', 'mean')
+    ).sort_values('Stocks', ascending=False).head(12).reset_index()
+    timer.lap("transform")
+    
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        def build_activity_chart():
+            chart_df = by_industry.iloc[::-1]
+            fig = go.Figure(go.Bar(
+                x=chart_df['Stocks'], y=chart_df['Industry'], orientation='h',
+                marker_color=np.where(chart_df['Avg_Change'] >= 0, '#2ED573', '#FF4757'),
+                customdata=chart_df['Avg_Change'],
+                hovertemplate='<b>%{y}</b><br>Flagged stocks: %{x}<br>Avg change: %{customdata:.2f}%<extra></extra>'
+            ))
+            fig.update_layout(
+                title="<b>Flagged stocks by industry</b>",
+                height=max(320, 30 * len(chart_df)),
+                xaxis_title="Stocks",
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig
+        
+        fig = cached_figure('unusual_activity_industries', snapshot.version, None, build_activity_chart)
+        timer.lap("figure")
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        st.dataframe(
+            activity.reindex(columns=['Symbol', 'Industry', 'Signal', 'Percent_Change', 'Gap_Pct',
+                                      'Relative_Volume', 'Score']),
+            column_config={
+                "Percent_Change": st.column_config.NumberColumn("Change %", format="%.2f%%"),
+                "Gap_Pct": st.column_config.NumberColumn("Gap %", format="%.2f%%"),
+                "Relative_Volume": st.column_config.NumberColumn("Vol vs usual", format="%.1f×"),
+                "Score": st.column_config.NumberColumn("Score (σ)", format="%.1f")
+            },
+            use_container_width=True,
+            hide_index=True,
+            height=400
+        )
+    st.caption(f"{len(activity)} stocks at least {THRESHOLD:.0f}σ from their 20-session baseline · "
+               f"scanned {snapshot.created_at.strftime('%H:%M:%S')}")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
+
+
+def _streak_label(streak):
+    if streak == 0:
+        return "flat"
+    return f"{abs(streak)} day{'s' if abs(streak) > 1 else ''} {'buying' if streak > 0 else 'selling'}"
+
+
+@timed_fragment
+def _render_fii_dii_history():
+    """Rolling FII/DII flows from the stored daily history"""
+    timer = section_timer("FII/DII history")
+    history = get_flow_history()
+    flows = history.frame()
+    if len(flows) < 2:
+        st.caption("📅 FII/DII flow history builds up one session at a time (or backfill with `python fii_dii_history.py --backfill flows.csv`)")
+        timer.lap("emit")
+        return
+    
+    latest = flows.iloc[-1]
+    for side, col in zip(('FII', 'DII'), st.columns(2)):
+        with col:
+            st.markdown(f"**{side} rolling net flow** · {_streak_label(int(latest[f'{side}_Streak']))}")
+            for window, metric_col in zip(ROLLING_WINDOWS, st.columns(len(ROLLING_WINDOWS))):
+                metric_col.metric(f"{window} sessions", f"₹{latest[f'{side}_Net_{window}']:,.0f} Cr")
+    
+    span = st.radio("History", ["3M", "6M", "1Y", "All"], index=1, horizontal=True, key="fii_dii_span")
+    sessions = {"3M": 63, "6M": 126, "1Y": 252, "All": None}[span]
+    shown = history.frame(sessions)
+    timer.lap("transform")
+    
+    def build_flow_history():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=shown.index, y=shown['FII_Net'], name='FII net', marker_color='#1E90FF', opacity=0.6))
+        fig.add_trace(go.Bar(x=shown.index, y=shown['DII_Net'], name='DII net', marker_color='#FFA502', opacity=0.6))
+        fig.add_trace(go.Scatter(x=shown.index, y=shown['FII_Net_20'], name='FII 20-session', line=dict(color='#1E90FF', width=2)))
+        fig.add_trace(go.Scatter(x=shown.index, y=shown['DII_Net_20'], name='DII 20-session', line=dict(color='#FFA502', width=2)))
+        fig.update_layout(
+            title="<b>💹 FII/DII Daily Net Flow & 20-Session Rolling Sum (₹ Cr)</b>",
+            barmode='group',
+            height=450,
+            legend=dict(orientation='h', y=-0.15),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+    
+    def build_cumulative():
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=shown.index, y=shown['FII_Cumulative'], name='FII', line=dict(color='#1E90FF')))
+        fig.add_trace(go.Scatter(x=shown.index, y=shown['DII_Cumulative'], name='DII', line=dict(color='#FFA502')))
+        fig.update_layout(
+            title="<b>📈 Cumulative Net Flow (₹ Cr)</b>",
+            height=450,
+            legend=dict(orientation='h', y=-0.15),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+    
+    fig_flows = cached_figure('fii_dii_history', history.revision, span, build_flow_history)
+    fig_cumulative = cached_figure('fii_dii_cumulative', history.revision, span, build_cumulative)
+    timer.lap("figure")
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.plotly_chart(fig_flows, use_container_width=True)
+    with col2:
+        st.plotly_chart(fig_cumulative, use_container_width=True)
+    st.caption(f"{len(flows)} sessions stored, {flows.index[0]:%d %b %Y} to {flows.index[-1]:%d %b %Y}")
+    timer.lap("emit")
+
+
+BACKTEST_LOOKBACKS = {"1 Month": 21, "3 Months": 63, "6 Months": 126, "12 Months": 252}
+BACKTEST_REBALANCES = {"Weekly": 5, "Monthly": 21, "Quarterly": 63}
+
+
+@timed_fragment
+def _render_rotation_backtest():
+    """Top-N momentum rotation backtested over the stored sector closes"""
+    timer = section_timer("Rotation backtest")
+    st.markdown('<div class="sector-card">', unsafe_allow_html=True)
+    st.subheader("🧪 Rotation Strategy Backtest")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        lookback = st.selectbox("Momentum window", list(BACKTEST_LOOKBACKS), index=1, key="backtest_lookback")
+    with col2:
+        top_n = st.slider("Sectors held", 1, 5, 3, key="backtest_top_n")
+    with col3:
+        rebalance = st.selectbox("Rebalance", list(BACKTEST_REBALANCES), index=1, key="backtest_rebalance")
+    with col4:
+        cost_bps = st.number_input("Cost (bps per turnover)", 0.0, 100.0, 10.0, step=5.0, key="backtest_cost")
+    absolute = st.checkbox("Hold cash instead of sectors with negative momentum", key="backtest_absolute")
+    params = {
+        'lookback': BACKTEST_LOOKBACKS[lookback],
+        'top_n': top_n,
+        'rebalance': BACKTEST_REBALANCES[rebalance],
+        'absolute': absolute,
+        'cost_bps': float(cost_bps)
+    }
+    timer.lap("emit")
+
+    backtester = get_backtester()
+    metrics, curve = backtester.run(**params)
+    timer.lap("transform")
+
+    if metrics is None:
+        st.caption("📅 Backtests need more sector history than the momentum window "
+                   "(seed it with `python returns.py --backfill --period 10y`)")
+        st.markdown('</div>', unsafe_allow_html=True)
+        timer.lap("emit")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("CAGR", f"{metrics['CAGR']:.1f}%",
+                delta=f"{metrics['Excess_CAGR']:+.1f} pts vs NIFTY 50" if np.isfinite(metrics['Excess_CAGR']) else None)
+    col2.metric("Sharpe", f"{metrics['Sharpe']:.2f}")
+    col3.metric("Max Drawdown", f"{metrics['Max_Drawdown']:.1f}%")
+    col4.metric("Turnover / rebalance", f"{metrics['Turnover']:.0f}%")
+
+    def build_backtest():
+        fig = go.Figure()
+        for column, color in (('Strategy', '#27ae60'), ('Benchmark', '#7f8c8d')):
+            if column in curve:
+                fig.add_trace(go.Scatter(x=curve.index, y=curve[column], name=column, line=dict(color=color)))
+        fig.update_layout(
+            title="<b>Growth of ₹1</b>",
+            height=400,
+            legend=dict(orientation='h', y=-0.15),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+
+    fig = cached_figure('rotation_backtest', backtester.version, params, build_backtest)
+    timer.lap("figure")
+    st.plotly_chart(fig, use_container_width=True)
+    holdings = backtester.holdings(**params)
+    if holdings:
+        st.caption("Holding now: " + ", ".join(f"{name} ({change:+.1f}%)" for name, change in holdings))
+    st.caption(f"{len(curve)} sessions, {curve.index[0]:%d %b %Y} to {curve.index[-1]:%d %b %Y}")
+
+    if st.button("Sweep all parameter combinations", key="backtest_sweep"):
+        with st.spinner("Backtesting every combination..."):
+            start = time.perf_counter()
+            sweep = backtester.sweep()
+            elapsed = time.perf_counter() - start
+        st.dataframe(sweep.head(15).round(2), use_container_width=True, hide_index=True)
+        st.caption(f"{len(sweep):,} configurations in {elapsed:.1f}s, best Sharpe first")
+    st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
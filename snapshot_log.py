@@ -0,0 +1,264 @@
+"""Append-only, point-in-time log of sector and index snapshots.
+
+Every new 'sector_data' / 'index_data' snapshot is appended to the day's log
+as one Arrow record batch of long rows (Time, Name, value columns). Only
+names whose values changed since the previous snapshot are written, so a
+quiet sector costs nothing between moves and the log stays small. A name
+that drops out of a snapshot gets one all-NaN removal row, so it leaves the
+replayed leaderboard from that moment on. On disk
+each dataset and trading day is a directory of Arrow IPC stream segments in
+SECTORR_DATA_DIR/snapshot_log (one segment per process), flushed after every
+batch, so a crash loses at most the batch being written. Finished days are
+compacted into a single zstd-compressed batch.
+
+Because rows are only ever appended in time order, the state at any moment
+is each name's last row at or before it:
+
+    log.as_of(when)          the leaderboard as it stood at `when`
+    log.times(day)           every moment the log can be replayed at
+    log.ranks(day, freq)     rank of each name per time bucket (1 = best)
+
+Past points are read from the log, never refetched. Fallback and sample
+snapshots are not logged. SNAPSHOT_LOG=off disables logging; days older than
+KEEP_DAYS are pruned.
+"""
+import glob
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pytz
+
+from price_history import data_path
+from schema import is_live
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+LOG_SNAPSHOTS = os.environ.get('SNAPSHOT_LOG', 'on').lower() not in ('off', 'false', 'no')
+KEEP_DAYS = 10
+# Dataset -> (name column, logged value columns)
+LOGGED = {
+    'sector_data': ('Industry', ['Avg_Close', 'Percent_Change', 'Volume']),
+    'index_data': ('Index', ['Last_Price', 'Percent_Change']),
+}
+WRITE_OPTIONS = ipc.IpcWriteOptions(compression='zstd')
+COMPACTED = 'day.arrows'
+
+
+class SnapshotLog:
+    """Time-ordered log of one dataset, today's batches held in memory"""
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.key, self.columns = LOGGED[name]
+        self.directory = directory or data_path(os.path.join('snapshot_log', name))
+        self.schema = pa.schema(
+            [('Time', pa.timestamp('ns', tz='Asia/Kolkata')), ('Name', pa.string())] +
+            [(column, pa.float64()) for column in self.columns]
+        )
+        self._lock = threading.Lock()
+        self._day = None
+        self._batches = []
+        self._last = {}  # name -> last logged values
+        self._writer = None
+        self._sink = None
+        self._frames = {}  # day -> time-ordered DataFrame, rebuilt when the log grows
+        self.revision = 0  # bumped on every append
+
+    def _day_directory(self, day):
+        return os.path.join(self.directory, day.isoformat())
+
+    def _read_day(self, day):
+        """Every batch logged on day, across segments (readable up to a crash)"""
+        batches = []
+        for path in sorted(glob.glob(os.path.join(self._day_directory(day), '*.arrows'))):
+            try:
+                with pa.OSFile(path, 'rb') as source:
+                    reader = ipc.open_stream(source)
+                    while True:
+                        try:
+                            batches.append(reader.read_next_batch())
+                        except StopIteration:
+                            break
+            except Exception as e:
+                print(f"Could not read {path}: {str(e)}")
+        return batches
+
+    def _removed(self, logged):
+        """Mask of removal rows (every value column NaN)"""
+        return logged[self.columns].isna().all(axis=1).to_numpy()
+
+    def _logged(self, batches):
+        """Time-ordered DataFrame of batches (segments of concurrent processes interleave)"""
+        logged = pa.Table.from_batches(batches, schema=self.schema).to_pandas()
+        return logged.sort_values('Time', kind='stable').reset_index(drop=True)
+
+    def _roll_day(self, day):
+        """Close the previous day's segment and load today's earlier segments"""
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+        self._writer = self._sink = None
+        self._day = day
+        self._batches = self._read_day(day)
+        self._last = {}
+        if self._batches:
+            latest = self._logged(self._batches).drop_duplicates('Name', keep='last')
+            latest = latest[~self._removed(latest)]
+            self._last = dict(zip(latest['Name'], latest[self.columns].to_numpy(dtype='float64')))
+        self._maintain(day)
+
+    def _maintain(self, today):
+        """Drop days past KEEP_DAYS and compact finished days into one segment"""
+        cutoff = (today - timedelta(days=KEEP_DAYS)).isoformat()
+        for path in glob.glob(os.path.join(self.directory, '*')):
+            day = os.path.basename(path)
+            if day < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+            elif day < today.isoformat() and os.listdir(path) != [COMPACTED]:
+                self._compact(datetime.strptime(day, '%Y-%m-%d').date())
+
+    def _compact(self, day):
+        """Rewrite a finished day as one batch; per-batch metadata outweighs small deltas"""
+        batches = self._read_day(day)
+        directory = self._day_directory(day)
+        segments = glob.glob(os.path.join(directory, '*.arrows'))
+        if not batches:
+            return
+        table = pa.Table.from_pandas(self._logged(batches), schema=self.schema, preserve_index=False)
+        tmp_path = os.path.join(directory, f"{COMPACTED}.tmp")
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with ipc.new_stream(sink, self.schema, options=WRITE_OPTIONS) as writer:
+                writer.write_table(table, max_chunksize=len(table))
+        os.replace(tmp_path, os.path.join(directory, COMPACTED))
+        for path in segments:
+            if os.path.basename(path) != COMPACTED:
+                os.remove(path)
+
+    def append(self, frame, when=None):
+        """Log the rows of frame that changed since the previous snapshot, plus a
+        removal row per name it no longer has; returns rows written"""
+        when = when or datetime.now(IST)
+        names = frame[self.key].astype(str).to_numpy()
+        values = frame.reindex(columns=self.columns).to_numpy(dtype='float64')
+        with self._lock:
+            if self._day != when.date():
+                self._roll_day(when.date())
+            gone = np.array(sorted(set(self._last).difference(names)), dtype=object)
+            if len(gone):
+                names = np.concatenate([names, gone])
+                values = np.vstack([values, np.full((len(gone), len(self.columns)), np.nan)])
+            previous = np.array([self._last.get(name, np.full(len(self.columns), np.nan)) for name in names])
+            same = (values == previous) | (np.isnan(values) & np.isnan(previous))
+            changed = ~same.all(axis=1) if len(names) else np.array([], dtype=bool)
+            if not changed.any():
+                return 0
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(np.full(changed.sum(), pd.Timestamp(when).value), type=pa.int64()).cast(self.schema.field('Time').type),
+                 pa.array(names[changed], type=pa.string())] +
+                [pa.array(values[changed, i], type=pa.float64()) for i in range(len(self.columns))],
+                schema=self.schema
+            )
+            if self._writer is None:
+                os.makedirs(self._day_directory(self._day), exist_ok=True)
+                path = os.path.join(self._day_directory(self._day), f"{when:%H%M%S}-{os.getpid()}.arrows")
+                self._sink = pa.OSFile(path, 'wb')
+                self._writer = ipc.new_stream(self._sink, self.schema, options=WRITE_OPTIONS)
+            self._writer.write_batch(batch)
+            self._sink.flush()
+            self._batches.append(batch)
+            for name, row in zip(names[changed], values[changed]):
+                if np.isnan(row).all():
+                    self._last.pop(name, None)
+                else:
+                    self._last[name] = row
+            self._frames.pop(self._day, None)
+            self.revision += 1
+            return int(changed.sum())
+
+    def frame(self, day=None):
+        """Every row logged on day (default today), time-ordered"""
+        day = day or datetime.now(IST).date()
+        with self._lock:
+            cached = self._frames.get(day)
+            if cached is not None:
+                return cached
+            batches = list(self._batches) if day == self._day else None
+            revision = self.revision
+        if batches is None:
+            batches = self._read_day(day)
+        logged = self._logged(batches)
+        with self._lock:
+            if day != self._day:
+                # Keep at most one past day besides today
+                for cached_day in [d for d in self._frames if d != self._day]:
+                    self._frames.pop(cached_day)
+            if revision == self.revision:
+                self._frames[day] = logged
+        return logged
+
+    def times(self, day=None):
+        """Distinct moments logged on day"""
+        return pd.DatetimeIndex(self.frame(day)['Time'].unique())
+
+    def as_of(self, when):
+        """Each name's latest logged values at or before when (empty before the first snapshot)"""
+        when = pd.Timestamp(when)
+        when = when.tz_localize(IST) if when.tzinfo is None else when
+        logged = self.frame(when.date())
+        end = logged['Time'].searchsorted(when, side='right')
+        latest = logged.iloc[:end].drop_duplicates('Name', keep='last')
+        latest = latest[~self._removed(latest)]
+        return latest.rename(columns={'Name': self.key}).reset_index(drop=True)
+
+    def ranks(self, day=None, column='Percent_Change', freq='5min'):
+        """time bucket x name ranks of column (1 = highest) as they stood at each bucket's end"""
+        logged = self.frame(day)
+        if logged.empty:
+            return pd.DataFrame()
+        # Removal rows carry -inf through the forward fills so a dropped name stays unranked
+        values = logged[column].where(~self._removed(logged), -np.inf)
+        wide = logged.assign(Value=values).pivot_table(index='Time', columns='Name', values='Value', aggfunc='last')
+        wide = wide.ffill().resample(freq, label='right', closed='right').last().ffill()
+        return wide.replace(-np.inf, np.nan).rank(axis=1, ascending=False, method='min')
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+_subscribed = False
+
+
+def get_snapshot_log(name='sector_data'):
+    """Process-wide log of one LOGGED dataset"""
+    with _logs_lock:
+        if name not in _logs:
+            _logs[name] = SnapshotLog(name)
+        return _logs[name]
+
+
+def _on_snapshot(snapshot):
+    if snapshot.name in LOGGED and snapshot.frame is not None and not snapshot.frame.empty and is_live(snapshot.frame):
+        try:
+            get_snapshot_log(snapshot.name).append(snapshot.frame)
+        except Exception as e:
+            print(f"❌ Snapshot log append failed for {snapshot.name}: {str(e)}")
+
+
+def start_snapshot_log():
+    """Log every LOGGED snapshot from now on (once per process)"""
+    global _subscribed
+    with _logs_lock:
+        if _subscribed or not LOG_SNAPSHOTS:
+            return
+        _subscribed = True
+    SNAPSHOTS.subscribe(_on_snapshot)
+    for name in LOGGED:
+        current = SNAPSHOTS.get(name)
+        if current is not None:
+            _on_snapshot(current)
+    print("✅ Snapshot log started - sector and index snapshots are replayable")
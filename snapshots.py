@@ -0,0 +1,182 @@
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from figure_cache import data_version
+
+
+class Snapshot:
+    """One immutable, versioned refresh of a dataset, shared by every session.
+
+    Tabular data is held once as a pyarrow Table; `frame` is a pandas view of
+    that table built once per snapshot, never per session. Pages should use
+    view() (a shallow copy, so adding columns does not leak across sessions)
+    and select rows with index arrays via rows()/top()/take() rather than
+    boolean-mask copies of the whole frame.
+    """
+
+    def __init__(self, name, data, version, sequence):
+        self.name = name
+        self.sequence = sequence
+        self.version = version
+        self.created_at = datetime.now()
+        self.table = None
+        self.frame = None
+        self.data = data
+        if isinstance(data, pd.DataFrame):
+            self.table = pa.Table.from_pandas(data, preserve_index=False)
+            # Zero-copy where Arrow can hand over its buffers, which pandas
+            # then sees as read-only, so in-place edits fail instead of
+            # leaking into other sessions
+            self.frame = self.table.to_pandas(split_blocks=True)
+            self.data = None
+        elif isinstance(data, list):
+            self.data = tuple(data)
+
+    def __len__(self):
+        if self.frame is not None:
+            return len(self.frame)
+        return len(self.data) if self.data is not None else 0
+
+    def view(self):
+        """Session-local handle on the shared frame (no data copied)"""
+        return self.frame.copy(deep=False)
+
+    def rows(self, mask=None):
+        """Positions where mask holds (all rows when mask is None)"""
+        if mask is None:
+            return np.arange(len(self.frame))
+        return np.flatnonzero(np.asarray(mask))
+
+    def top(self, column, n=None, rows=None, ascending=False):
+        """Positions of rows ordered by column (NaN last), optionally the first n"""
+        rows = self.rows() if rows is None else rows
+        values = self.frame[column].to_numpy(dtype='float64')[rows]
+        keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+        order = rows[np.argsort(keys, kind='stable')]
+        return order if n is None else order[:n]
+
+    def take(self, rows):
+        """Materialize just the selected rows, in the given order"""
+        return self.frame.iloc[rows].reset_index(drop=True)
+
+
+class SnapshotStore:
+    """Process-wide registry of the latest snapshot per dataset.
+
+    get_or_fetch() is single-flight: when many sessions miss at once, one
+    fetches and the rest wait for and reuse its snapshot. A publish whose
+    content matches the current snapshot keeps the existing one, so the
+    version (and every figure cached against it) survives no-op refreshes.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._stale = set()
+        self._fetched_at = {}
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._listeners = []
+        self._sequence = 0
+        # Listeners run one publish at a time, in sequence order per dataset
+        self._notify_lock = threading.RLock()
+        self._notified = {}
+
+    def get(self, name):
+        with self._lock:
+            return self._snapshots.get(name)
+
+    def get_or_fetch(self, name, fetch, max_age=None):
+        """Current snapshot of name, calling fetch() once if missing or stale"""
+        snapshot = self._fresh(name, max_age)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(name, threading.Lock())
+        with fetch_lock:
+            snapshot = self._fresh(name, max_age)
+            if snapshot is not None:
+                return snapshot
+            start = time.perf_counter()
+            data = fetch()
+            snapshot = self.publish(name, data)
+            print(f"Snapshot {name} v{snapshot.sequence} ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+            return snapshot
+
+    def _fresh(self, name, max_age):
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot is None or name in self._stale:
+                return None
+            if max_age is not None and time.time() - self._fetched_at.get(name, 0) > max_age:
+                return None
+            return snapshot
+
+    def publish(self, name, data):
+        """Make data the current snapshot of name and notify listeners.
+
+        Sequences are taken in arrival order; a slower publish that finishes
+        after a newer one is dropped, so the store and its listeners only
+        ever move forward.
+        """
+        candidate_version = data_version(data)
+        with self._lock:
+            current = self._snapshots.get(name)
+            self._stale.discard(name)
+            self._fetched_at[name] = time.time()
+            if current is not None and current.version == candidate_version:
+                return current
+            self._sequence += 1
+            sequence = self._sequence
+        snapshot = Snapshot(name, data, candidate_version, sequence)
+        with self._lock:
+            current = self._snapshots.get(name)
+            if current is not None and current.sequence > sequence:
+                return current
+            self._snapshots[name] = snapshot
+            listeners = list(self._listeners)
+        with self._notify_lock:
+            if self._notified.get(name, 0) > sequence:
+                return snapshot
+            self._notified[name] = sequence
+            for listener in listeners:
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    print(f"Snapshot listener failed for {name}: {str(e)}")
+        return snapshot
+
+    def invalidate(self, name=None):
+        """Mark one (or every) dataset stale; the next get_or_fetch refetches.
+
+        Sessions still holding the old snapshot keep a consistent view until
+        their next rerun.
+        """
+        with self._lock:
+            self._stale.update(self._snapshots if name is None else [name])
+
+    def subscribe(self, listener):
+        """Call listener(snapshot) whenever a new version is published"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    'version': s.version,
+                    'sequence': s.sequence,
+                    'rows': len(s),
+                    'bytes': s.table.nbytes if s.table is not None else None,
+                    'stale': name in self._stale,
+                    'created_at': s.created_at.isoformat()
+                }
+                for name, s in self._snapshots.items()
+            }
+
+
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,285 @@
+"""Local stand-in for the NSE and yfinance upstreams.
+
+Serves the endpoints DataManager uses (equity-stockIndices, marketStatus,
+fiidiiTradeReact, index constituent CSVs, /v8/finance/chart/<symbol> and a
+few news pages) with
+injectable latency, error rates, 403 bot-blocks and throttling, so DataManager
+can be load- and latency-tested against an upstream we control.
+
+Usage:
+    python standin_server.py --port 8900 --latency-ms 150 --error-rate 0.05 \\
+        --block-rate 0.02 --rate-limit 50
+
+Then point the app at it:
+    NSE_BASE_URL=http://127.0.0.1:8900 YF_CHART_BASE_URL=http://127.0.0.1:8900 \\
+    NEWS_SOURCE_URLS=http://127.0.0.1:8900/news/markets streamlit run app.py
+
+or in code: DataManager(base_url=server.base_url, chart_base_url=server.base_url,
+news_sources=server.news_urls).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from constituents import CONSTITUENT_FILES
+from fixtures import (
+    sample_constituents_csv, sample_history, sample_news_page, sample_sector_indices, sample_stock_quotes
+)
+
+NEWS_PAGES = ['markets', 'business', 'economy']
+
+PERIOD_DAYS = {'1d': 1, '2d': 2, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, 'ytd': 160}
+
+
+class StandInConfig:
+    """Fault-injection knobs; safe to change while the server is running"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, block_rate=0.0, rate_limit=None, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.block_rate = block_rate
+        self.rate_limit = rate_limit  # max requests per second, None for unlimited
+        self.seed = seed
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "NSEStandIn/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        route = self._route_name(parts.path)
+
+        status = server.inject_fault()
+        if status is None:
+            status, content_type, body = self._dispatch(parts.path, query)
+        else:
+            content_type, body = 'text/html', f"<html><body>{status}</body></html>"
+        server.record(route, status)
+
+        payload = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        if parts.path == '/':
+            self.send_header('Set-Cookie', 'nsit=standin; Path=/')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route_name(self, path):
+        if path.startswith('/v8/finance/chart/'):
+            return 'chart'
+        if path.startswith('/news/'):
+            return 'news'
+        if path.startswith('/content/indices/'):
+            return 'constituents'
+        if path.startswith('/api/'):
+            return path[len('/api/'):]
+        return path
+
+    def _dispatch(self, path, query):
+        server = self.server
+        if path == '/':
+            return 200, 'text/html', '<html><body>NSE stand-in</body></html>'
+        if path == '/__stats':
+            return 200, 'application/json', json.dumps(server.stats())
+        if path == '/api/marketStatus':
+            return 200, 'application/json', json.dumps(server.market_status)
+        if path == '/api/fiidiiTradeReact':
+            return 200, 'application/json', json.dumps(server.fii_dii)
+        if path == '/api/equity-stockIndices':
+            return 200, 'application/json', json.dumps(server.index_payload(query.get('index', '')))
+        if path.startswith('/v8/finance/chart/'):
+            symbol = path[len('/v8/finance/chart/'):]
+            return 200, 'application/json', json.dumps(server.chart_payload(symbol, query.get('range', '5d')))
+        if path.startswith('/news/'):
+            return 200, 'text/html', server.news_page(path[len('/news/'):])
+        if path.startswith('/content/indices/'):
+            csv = server.constituents_csv(path[len('/content/indices/'):])
+            if csv is not None:
+                return 200, 'text/csv', csv
+        return 404, 'application/json', json.dumps({'error': 'not found'})
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, config=None):
+        super().__init__((host, port), StandInHandler)
+        self.config = config or StandInConfig()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._recent = deque()
+        self._counts = Counter()
+        self._payload_cache = {}
+
+        rng = np.random.RandomState(self.config.seed)
+        self.market_status = {'marketState': [{'market': 'Capital Market', 'marketStatus': 'Open'}]}
+        self.fii_dii = {
+            'fiiInflow': round(rng.uniform(2000, 8000), 2),
+            'fiiOutflow': round(rng.uniform(1500, 7500), 2),
+            'diiInflow': round(rng.uniform(3000, 9000), 2),
+            'diiOutflow': round(rng.uniform(2500, 8500), 2)
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def news_urls(self):
+        return [f"{self.base_url}/news/{page}" for page in NEWS_PAGES]
+
+    def inject_fault(self):
+        """Apply latency and pick a failure status, or None to serve normally"""
+        config = self.config
+        with self._lock:
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            throttled = config.rate_limit is not None and len(self._recent) > config.rate_limit
+            roll = self._rng.random()
+            delay = max(0.0, config.latency_ms + self._rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+
+        if delay:
+            time.sleep(delay)
+        if throttled:
+            return 429
+        if roll < config.block_rate:
+            return 403
+        if roll < config.block_rate + config.error_rate:
+            return 500
+        return None
+
+    def record(self, route, status):
+        with self._lock:
+            self._counts[(route, status)] += 1
+
+    def stats(self):
+        """Request counts per route and status"""
+        with self._lock:
+            by_route = Counter()
+            by_status = Counter()
+            for (route, status), count in self._counts.items():
+                by_route[route] += count
+                by_status[str(status)] += count
+            return {
+                'total': sum(self._counts.values()),
+                'by_route': dict(by_route),
+                'by_status': dict(by_status)
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key not in self._payload_cache:
+                self._payload_cache[key] = build(np.random.RandomState(zlib.crc32(key.encode('utf-8')) ^ self.config.seed))
+            return self._payload_cache[key]
+
+    def index_payload(self, index_name):
+        if index_name == 'SECTORAL INDICES':
+            return self._cached('index:' + index_name, sample_sector_indices)
+
+        def build(rng):
+            payload = sample_stock_quotes(rng, count=750 if 'TOTAL' in index_name else 200)
+            payload['name'] = index_name
+            # Like NSE, the first row of a named index is the index itself
+            index_row = dict(payload['data'][0], symbol=index_name, priority=1)
+            index_row.update({'last': index_row['lastPrice'], 'high': index_row['dayHigh'], 'low': index_row['dayLow']})
+            payload['data'].insert(0, index_row)
+            return payload
+
+        if index_name == 'SECURITIES IN F&O':
+            return self._cached('index:' + index_name, lambda rng: sample_stock_quotes(rng, count=200))
+        return self._cached('index:' + index_name, build)
+
+    def chart_payload(self, symbol, period):
+        days = PERIOD_DAYS.get(period, 5)
+
+        def build(rng):
+            hist = sample_history(rng, days)
+            return {'chart': {'result': [{
+                'meta': {'symbol': symbol, 'currency': 'INR', 'exchangeTimezoneName': 'Asia/Kolkata'},
+                'timestamp': [int(ts.timestamp()) for ts in hist.index],
+                'indicators': {'quote': [{
+                    'open': hist['Open'].round(2).tolist(),
+                    'high': hist['High'].round(2).tolist(),
+                    'low': hist['Low'].round(2).tolist(),
+                    'close': hist['Close'].round(2).tolist(),
+                    'volume': hist['Volume'].astype(int).tolist()
+                }]}
+            }], 'error': None}}
+
+        return self._cached(f"chart:{symbol}:{period}", build)
+
+    def constituents_csv(self, filename):
+        """Constituent CSV drawn from the NIFTY TOTAL MARKET quotes, so members always have quotes"""
+        names = {file: name for name, file in CONSTITUENT_FILES.items()}
+        if filename not in names:
+            return None
+        stocks = self.index_payload('NIFTY TOTAL MARKET')['data'][1:]
+        return self._cached(f"constituents:{filename}", lambda rng: sample_constituents_csv(rng, stocks, names[filename]))
+
+    def news_page(self, page):
+        return self._cached(f"news:{page}", lambda rng: sample_news_page(rng, page))
+
+
+def start_standin_server(host='127.0.0.1', port=0, **config):
+    """Start a stand-in server on a background thread and return it"""
+    server = StandInServer(host, port, StandInConfig(**config))
+    thread = threading.Thread(target=server.serve_forever, name='nse-standin', daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--block-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=None, help="requests per second before 429s")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        block_rate=args.block_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    ))
+    print(f"✅ NSE stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
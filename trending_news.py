@@ -3,149 +3,40 @@ import pandas as pd
 from datetime import datetime, timedelta
 import requests
 import plotly.express as px
+from render_timing import section_timer, timed_fragment
+from utils import load_stylesheet
+from figure_cache import cached_figure
+from snapshots import SNAPSHOTS
 
 def render_trending_news():
     """Render the Trending News page with enhanced UI and categorization"""
+    timer = section_timer("Styles")
     
     # Make the page wider and add better spacing
-    st.markdown("""
-    <style>
-    .main > div {
-        max-width: 100% !important;
-        padding: 1rem 2rem !important;
-    }
-    .stExpander {
-        font-size: 18px !important;
-    }
-    .article-content {
-        font-size: 16px !important;
-        line-height: 1.6 !important;
-        padding: 20px !important;
-        max-width: 100% !important;
-    }
-    .stText {
-        font-size: 16px !important;
-    }
-    .news-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-        animation: slideInFromTop 1s ease-out;
-    }
-    @keyframes slideInFromTop {
-        from { opacity: 0; transform: translateY(-50px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    .news-category-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    .news-category-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-    }
-    .news-item {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 1rem 0;
-        border-left: 6px solid #667eea;
-        transition: all 0.3s ease;
-        font-size: 18px;
-        line-height: 1.8;
-        cursor: pointer;
-        animation: slideInUp 0.6s ease-out forwards;
-    }
-    .news-item:hover {
-        background: rgba(255, 255, 255, 0.1);
-        border-left: 6px solid #764ba2;
-        transform: translateY(-3px) scale(1.01);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.25);
-    }
-    .category-badge {
-        display: inline-block;
-        padding: 0.3rem 0.8rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        font-weight: bold;
-        margin-bottom: 0.5rem;
-        animation: pulse 2s infinite;
-    }
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    .stButton > button {
-        width: 100%;
-        height: 50px;
-        font-size: 16px;
-        font-weight: bold;
-        border-radius: 10px;
-        border: none;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        margin: 5px 0;
-        transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-        box-shadow: 0 5px 15px rgba(102, 126, 234, 0.2);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .stButton > button::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
-        transform: translateY(-3px) scale(1.02);
-        box-shadow: 0 8px 20px rgba(102, 126, 234, 0.3);
-    }
-    
-    .stButton > button:hover::before {
-        left: 100%;
-    }
-    
-    .stButton > button:active {
-        background: linear-gradient(135deg, #5a67d8 0%, #667eea 100%);
-        transform: translateY(-1px) scale(1.00);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    load_stylesheet('trending_news')
     
     # Animated header
     st.markdown('<div class="news-header"><h1>📰 Financial News Hub</h1><p>Latest market insights and breaking news</p></div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Get data manager
     data_manager = st.session_state.data_manager
     
     # Fetch news data with caching
-    if 'news_data' not in st.session_state:
-        with st.spinner("Loading financial news..."):
-            st.session_state.news_data = data_manager.get_financial_news(limit=50)
+    timer = section_timer("News data")
+    with st.spinner("Loading financial news..."):
+        news_snapshot = SNAPSHOTS.get_or_fetch('news_data', lambda: data_manager.get_financial_news(limit=50))
     
-    news_data = st.session_state.news_data
+    news_data = news_snapshot.data
+    news_version = news_snapshot.version
+    timer.lap("fetch")
     
     if not news_data:
         st.error("Unable to load news data. Please check your internet connection and try refreshing.")
         return
     
     # Enhanced news categories with 4 main sections
+    timer = section_timer("Categories")
     st.markdown('<div class="news-category-card">', unsafe_allow_html=True)
     st.subheader("🎡 Select News Category")
     
@@ -188,6 +79,7 @@ def render_trending_news():
     total_company = category_counts.get('Company News', 0)
     total_ipo = category_counts.get('IPO News', 0)
     total_global = category_counts.get('Global News', 0)
+    timer.lap("transform")
     
     # Filter news based on category
     if selected_category != "All Categories":
@@ -205,37 +97,132 @@ def render_trending_news():
         st.metric("💰 IPO News", total_ipo)
     with col4:
         st.metric("🌍 Global News", total_global)
+    timer.lap("emit")
     
     # Enhanced animated pie chart
+    timer = section_timer("Distribution pie")
     st.markdown('<div class="news-category-card">', unsafe_allow_html=True)
     st.subheader("🍰 News Distribution Dashboard")
     
     if category_counts:
         # Create animated pie chart with better colors
-        fig_pie = px.pie(
-            values=list(category_counts.values()),
-            names=list(category_counts.keys()),
-            title="<b>📊 Live News Category Distribution</b>",
-            color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA726', '#AB47BC', '#66BB6A']
-        )
-        fig_pie.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hovertemplate='<b>%{label}</b><br>Articles: %{value}<br>Percentage: %{percent}<extra></extra>',
-            pull=[0.1 if cat == selected_category else 0 for cat in category_counts.keys()]
-        )
-        fig_pie.update_layout(
-            height=500,
-            showlegend=True,
-            font=dict(size=14),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            title_font_size=18
-        )
+        def build_distribution_pie():
+            fig_pie = px.pie(
+                values=list(category_counts.values()),
+                names=list(category_counts.keys()),
+                title="<b>📊 Live News Category Distribution</b>",
+                color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA726', '#AB47BC', '#66BB6A']
+            )
+            fig_pie.update_traces(
+                textposition='inside',
+                textinfo='percent+label',
+                hovertemplate='<b>%{label}</b><br>Articles: %{value}<br>Percentage: %{percent}<extra></extra>',
+                pull=[0.1 if cat == selected_category else 0 for cat in category_counts.keys()]
+            )
+            fig_pie.update_layout(
+                height=500,
+                showlegend=True,
+                font=dict(size=14),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                title_font_size=18
+            )
+            return fig_pie
+
+        fig_pie = cached_figure('news_distribution', news_version, selected_category, build_distribution_pie)
+        timer.lap("figure")
         st.plotly_chart(fig_pie, use_container_width=True, config={'displayModeBar': True, 'toImageButtonOptions': {'height': 1080, 'width': 1920}})
     st.markdown('</div>', unsafe_allow_html=True)
+    timer.lap("emit")
     
     # Display news articles with enhanced UI
+    _render_news_list(filtered_news, selected_category)
+    
+    # News insights
+    timer = section_timer("Insights")
+    st.subheader("📈 News Insights")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🏷️ Most Mentioned Topics")
+        # Extract common keywords from headlines
+        all_headlines = " ".join([item['headline'] for item in news_data])
+        
+        # Common financial keywords to look for
+        keywords = ['stock', 'market', 'nifty', 'sensex', 'earnings', 'profit', 'revenue', 'growth', 'ipo', 'bank', 'sector']
+        keyword_counts = {}
+        
+        for keyword in keywords:
+            count = all_headlines.lower().count(keyword)
+            if count > 0:
+                keyword_counts[keyword.title()] = count
+        
+        if keyword_counts:
+            keyword_data = [{'Keyword': k, 'Mentions': v} for k, v in keyword_counts.items()]
+            keyword_df = pd.DataFrame(keyword_data).sort_values('Mentions', ascending=False).head(10)
+            timer.lap("transform")
+            
+            def build_keyword_chart():
+                fig_keywords = px.bar(
+                    keyword_df,
+                    x='Mentions',
+                    y='Keyword',
+                    orientation='h',
+                    title="Most Mentioned Keywords",
+                    color='Mentions',
+                    color_continuous_scale='Viridis'
+                )
+                fig_keywords.update_layout(height=400)
+                return fig_keywords
+
+            fig_keywords = cached_figure('news_keywords', news_version, None, build_keyword_chart)
+            timer.lap("figure")
+            st.plotly_chart(fig_keywords, use_container_width=True)
+        else:
+            st.info("No common keywords found in headlines")
+    
+    with col2:
+        st.subheader("📅 News Timeline")
+        
+        # Group news by date
+        news_by_date = {}
+        for article in news_data:
+            try:
+                date = datetime.fromisoformat(article['timestamp'].replace('Z', '+00:00')).date()
+                date_str = date.strftime('%Y-%m-%d')
+                news_by_date[date_str] = news_by_date.get(date_str, 0) + 1
+            except:
+                continue
+        
+        if news_by_date:
+            timeline_data = [{'Date': k, 'Articles': v} for k, v in news_by_date.items()]
+            timeline_df = pd.DataFrame(timeline_data).sort_values('Date')
+            timer.lap("transform")
+            
+            def build_timeline_chart():
+                fig_timeline = px.line(
+                    timeline_df,
+                    x='Date',
+                    y='Articles',
+                    title="News Volume Over Time",
+                    markers=True
+                )
+                fig_timeline.update_layout(height=400)
+                return fig_timeline
+
+            fig_timeline = cached_figure('news_timeline', news_version, None, build_timeline_chart)
+            timer.lap("figure")
+            st.plotly_chart(fig_timeline, use_container_width=True)
+        else:
+            st.info("Timeline data not available")
+    timer.lap("emit")
+
+
+@timed_fragment
+def _render_news_list(filtered_news, selected_category):
+    """Searchable, sortable, paginated article list for one category"""
+    timer = section_timer("News list")
     st.markdown('<div class="news-category-card">', unsafe_allow_html=True)
     st.subheader(f"📰 {selected_category} - Latest Updates")
     
@@ -258,11 +245,11 @@ def render_trending_news():
         )
         
         if sort_option == "Latest First":
-            filtered_news.sort(key=lambda x: x['timestamp'], reverse=True)
+            filtered_news = sorted(filtered_news, key=lambda x: x['timestamp'], reverse=True)
         elif sort_option == "Oldest First":
-            filtered_news.sort(key=lambda x: x['timestamp'])
+            filtered_news = sorted(filtered_news, key=lambda x: x['timestamp'])
         elif sort_option == "Category":
-            filtered_news.sort(key=lambda x: x['category'])
+            filtered_news = sorted(filtered_news, key=lambda x: x['category'])
         
         # Pagination
         items_per_page = st.selectbox("Articles per page:", [10, 20, 30, 50], index=1)
@@ -275,6 +262,7 @@ def render_trending_news():
             page_news = filtered_news[start_idx:end_idx]
         else:
             page_news = filtered_news[:items_per_page]
+        timer.lap("transform")
         
         # Display enhanced news cards
         for i, article in enumerate(page_news):
@@ -328,73 +316,8 @@ def render_trending_news():
     else:
         st.info(f"🔍 No articles found for category: {selected_category}")
     st.markdown('</div>', unsafe_allow_html=True)
-    
-    # News insights
-    st.subheader("📈 News Insights")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🏷️ Most Mentioned Topics")
-        # Extract common keywords from headlines
-        all_headlines = " ".join([item['headline'] for item in news_data])
-        
-        # Common financial keywords to look for
-        keywords = ['stock', 'market', 'nifty', 'sensex', 'earnings', 'profit', 'revenue', 'growth', 'ipo', 'bank', 'sector']
-        keyword_counts = {}
-        
-        for keyword in keywords:
-            count = all_headlines.lower().count(keyword)
-            if count > 0:
-                keyword_counts[keyword.title()] = count
-        
-        if keyword_counts:
-            keyword_data = [{'Keyword': k, 'Mentions': v} for k, v in keyword_counts.items()]
-            keyword_df = pd.DataFrame(keyword_data).sort_values('Mentions', ascending=False).head(10)
-            
-            fig_keywords = px.bar(
-                keyword_df,
-                x='Mentions',
-                y='Keyword',
-                orientation='h',
-                title="Most Mentioned Keywords",
-                color='Mentions',
-                color_continuous_scale='Viridis'
-            )
-            fig_keywords.update_layout(height=400)
-            st.plotly_chart(fig_keywords, use_container_width=True)
-        else:
-            st.info("No common keywords found in headlines")
-    
-    with col2:
-        st.subheader("📅 News Timeline")
-        
-        # Group news by date
-        news_by_date = {}
-        for article in news_data:
-            try:
-                date = datetime.fromisoformat(article['timestamp'].replace('Z', '+00:00')).date()
-                date_str = date.strftime('%Y-%m-%d')
-                news_by_date[date_str] = news_by_date.get(date_str, 0) + 1
-            except:
-                continue
-        
-        if news_by_date:
-            timeline_data = [{'Date': k, 'Articles': v} for k, v in news_by_date.items()]
-            timeline_df = pd.DataFrame(timeline_data).sort_values('Date')
-            
-            fig_timeline = px.line(
-                timeline_df,
-                x='Date',
-                y='Articles',
-                title="News Volume Over Time",
-                markers=True
-            )
-            fig_timeline.update_layout(height=400)
-            st.plotly_chart(fig_timeline, use_container_width=True)
-        else:
-            st.info("Timeline data not available")
-    
+    timer.lap("emit")
+
 
 def get_category_color(category):
     """Return color for category badge"""
@@ -414,35 +337,7 @@ def show_full_news_modal(article):
     """Display full news content in modal-like format with enhanced readability"""
     
     # Enhanced modal styling for better readability
-    st.markdown("""
-    <style>
-    .news-modal {
-        background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-        border-radius: 20px;
-        padding: 40px;
-        margin: 30px 0;
-        border-left: 8px solid #667eea;
-        box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-        font-size: 18px;
-        line-height: 1.9;
-    }
-    .modal-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 30px;
-        border-radius: 15px;
-        margin-bottom: 30px;
-        text-align: center;
-    }
-    .content-section {
-        font-size: 18px;
-        line-height: 2.0;
-        color: #2c3e50;
-        text-align: justify;
-        margin: 25px 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    load_stylesheet('news_modal')
     
     st.markdown("---")
     
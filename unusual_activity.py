@@ -0,0 +1,207 @@
+"""Unusual volume and price activity across the whole universe, in the background.
+
+The detector subscribes to the snapshot store. Every new 'universe_quotes'
+version wakes one daemon thread, which scores every stock against its own
+baseline of the previous BASELINE_SESSIONS daily bars (price_history.py) in
+a few whole-array operations:
+
+    Volume_Z   log volume vs the mean/std of log daily volume; during market
+               hours the day's volume so far is scaled up by the elapsed
+               share of the session before comparing
+    Return_Z   today's % change vs the mean/std of daily % changes
+    Gap_Z      open vs previous close, against the same return spread
+
+Stocks with any |z| >= THRESHOLD are published, ranked by Score (the largest
+z), as the 'unusual_activity' snapshot. Pages only read that snapshot; the
+scan never fetches anything itself. Baselines depend only on the trading day
+and are computed once per day. Snapshots that arrive while a scan runs are
+coalesced: only the newest is scanned next.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from price_history import get_bar_histories
+from snapshots import SNAPSHOTS
+
+IST = pytz.timezone('Asia/Kolkata')
+BASELINE_SESSIONS = 20
+MIN_SESSIONS = 10  # fewer stored sessions than this and a stock has no baseline
+THRESHOLD = 3.0
+MAX_RESULTS = 100
+SOURCE = 'universe_quotes'
+ACTIVITY_COLUMNS = [
+    'Symbol', 'Industry', 'Last_Price', 'Percent_Change', 'Gap_Pct', 'Volume', 'Relative_Volume',
+    'Volume_Z', 'Return_Z', 'Gap_Z', 'Score', 'Signal'
+]
+
+
+def session_fraction(now):
+    """Elapsed share of the 9:15-15:30 IST session (1 outside market hours)"""
+    opens = now.replace(hour=9, minute=15, second=0, microsecond=0)
+    closes = now.replace(hour=15, minute=30, second=0, microsecond=0)
+    if now.weekday() >= 5 or not opens < now < closes:
+        return 1.0
+    # The first minutes are too thin to extrapolate from
+    return max((now - opens) / (closes - opens), 0.05)
+
+
+def baselines(closes, volumes):
+    """{name: array over symbols} of mean/std of log volume and daily % change.
+
+    closes, volumes: [sessions, symbols] earlier daily bars, oldest first.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_volume = np.log(np.where(volumes > 0, volumes, np.nan))
+        returns = (closes[1:] / closes[:-1] - 1) * 100
+    enough_volume = (~np.isnan(log_volume)).sum(axis=0) >= MIN_SESSIONS
+    enough_returns = (~np.isnan(returns)).sum(axis=0) >= MIN_SESSIONS
+    with np.errstate(all='ignore'):
+        stats = {
+            'volume_mean': np.nanmean(log_volume, axis=0),
+            'volume_std': np.nanstd(log_volume, axis=0),
+            'return_mean': np.nanmean(returns, axis=0),
+            'return_std': np.nanstd(returns, axis=0),
+            'previous_close': closes[-1],
+        }
+    for name in ('volume_mean', 'volume_std'):
+        stats[name] = np.where(enough_volume, stats[name], np.nan)
+    for name in ('return_mean', 'return_std'):
+        stats[name] = np.where(enough_returns, stats[name], np.nan)
+    return stats
+
+
+def score_activity(quotes, stats, fraction=1.0, threshold=THRESHOLD, limit=MAX_RESULTS):
+    """Ranked DataFrame of stocks whose volume, return or gap is unusual"""
+    prices = quotes['Last_Price'].to_numpy(dtype='float64')
+    changes = quotes['Percent_Change'].to_numpy(dtype='float64')
+    volumes = quotes['Volume'].to_numpy(dtype='float64')
+    opens = quotes['Open'].to_numpy(dtype='float64') if 'Open' in quotes else np.full(len(quotes), np.nan)
+    previous = quotes['Previous_Close'].to_numpy(dtype='float64') if 'Previous_Close' in quotes \
+        else stats['previous_close']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        paced = np.log(np.where(volumes > 0, volumes / fraction, np.nan))
+        volume_z = (paced - stats['volume_mean']) / stats['volume_std']
+        return_z = (changes - stats['return_mean']) / stats['return_std']
+        gap = np.where((opens > 0) & (previous > 0), (opens / previous - 1) * 100, np.nan)
+        gap_z = gap / stats['return_std']
+        relative = np.exp(paced - stats['volume_mean'])
+    # Only surges count on volume; both directions count on price
+    scores = np.fmax(np.fmax(volume_z, np.abs(return_z)), np.abs(gap_z))
+    scores = np.where(np.isfinite(scores), scores, np.nan)
+    with np.errstate(invalid='ignore'):
+        flagged = np.flatnonzero(scores >= threshold)
+    order = flagged[np.argsort(-scores[flagged], kind='stable')][:limit]
+
+    activity = pd.DataFrame({
+        'Symbol': quotes['Symbol'].astype(str).to_numpy()[order],
+        'Industry': quotes['Industry'].to_numpy(dtype=object)[order] if 'Industry' in quotes else None,
+        'Last_Price': prices[order],
+        'Percent_Change': changes[order],
+        'Gap_Pct': gap[order],
+        'Volume': volumes[order],
+        'Relative_Volume': relative[order],
+        'Volume_Z': volume_z[order],
+        'Return_Z': return_z[order],
+        'Gap_Z': gap_z[order],
+        'Score': scores[order],
+    })
+    signals = []
+    for volume_score, return_score, gap_score in activity[['Volume_Z', 'Return_Z', 'Gap_Z']].to_numpy():
+        signal = []
+        if volume_score >= threshold:
+            signal.append("Volume surge")
+        if abs(return_score) >= threshold:
+            signal.append("Price shock ↑" if return_score > 0 else "Price shock ↓")
+        if abs(gap_score) >= threshold:
+            signal.append("Gap up" if gap_score > 0 else "Gap down")
+        signals.append(", ".join(signal))
+    activity['Signal'] = signals
+    for column in ['Last_Price', 'Percent_Change', 'Gap_Pct', 'Relative_Volume', 'Volume_Z', 'Return_Z', 'Gap_Z', 'Score']:
+        activity[column] = activity[column].astype('float32')
+    return activity[ACTIVITY_COLUMNS]
+
+
+class ActivityDetector:
+    """Scans each new universe snapshot on a background thread"""
+
+    def __init__(self):
+        self._pending = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._baselines = None
+        self._baselines_key = None
+        self._symbols = None
+        self._thread = None
+        self.scans = 0
+        self.last_scan_ms = None
+
+    def start(self):
+        SNAPSHOTS.subscribe(self._on_snapshot)
+        self._thread = threading.Thread(target=self._run, name='activity-detector', daemon=True)
+        self._thread.start()
+        current = SNAPSHOTS.get(SOURCE)
+        if current is not None:
+            self._on_snapshot(current)
+
+    def _on_snapshot(self, snapshot):
+        # Runs in the publishing thread: hand off and return at once
+        if snapshot.name == SOURCE:
+            with self._lock:
+                self._pending = snapshot
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+            if snapshot is None or snapshot.frame is None or snapshot.frame.empty:
+                continue
+            try:
+                self.scan(snapshot)
+            except Exception as e:
+                print(f"❌ Unusual activity scan failed: {str(e)}")
+
+    def _stats(self, symbols, today):
+        histories = get_bar_histories()
+        key = (today, tuple(history.revision for history in histories.values()))
+        if self._baselines_key == key and np.array_equal(self._symbols, symbols):
+            return self._baselines
+        sessions = np.arange(BASELINE_SESSIONS + 1, 0, -1)  # oldest first, one extra close for returns
+        _, closes = histories['Close'].sessions_back(symbols, sessions, before=today)
+        _, volumes = histories['Volume'].sessions_back(symbols, sessions[1:], before=today)
+        self._baselines, self._baselines_key, self._symbols = baselines(closes, volumes), key, symbols
+        return self._baselines
+
+    def scan(self, snapshot):
+        """Score one universe snapshot and publish the 'unusual_activity' snapshot"""
+        start = datetime.now(IST)
+        quotes = snapshot.frame
+        symbols = quotes['Symbol'].astype(str).to_numpy()
+        stats = self._stats(symbols, start.date())
+        activity = score_activity(quotes, stats, fraction=session_fraction(start))
+        SNAPSHOTS.publish('unusual_activity', activity)
+        self.scans += 1
+        self.last_scan_ms = (datetime.now(IST) - start).total_seconds() * 1000
+        return activity
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def start_activity_detector():
+    """The process-wide detector, started on first use"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = ActivityDetector()
+            _detector.start()
+            print("✅ Unusual activity detector started - scans every universe snapshot")
+        return _detector
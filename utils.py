@@ -1,6 +1,9 @@
 import streamlit as st
+import hashlib
+import os
 from datetime import datetime, time
 import pytz
+from snapshots import SNAPSHOTS
 from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
 
@@ -39,14 +42,12 @@ def setup_scheduler():
 def scheduled_refresh():
     """Function called by scheduler for auto-refresh"""
     try:
-        # Clear all cached data
+        # Runs outside any session, so only the shared snapshots are touched;
+        # every session picks up fresh data on its next rerun
         clear_cached_data()
         
-        # Update last refresh time
-        st.session_state.last_update = datetime.now(pytz.timezone('Asia/Kolkata'))
-        
         # Log the refresh
-        print(f"Auto-refresh completed at {st.session_state.last_update}")
+        print(f"Auto-refresh completed at {datetime.now(pytz.timezone('Asia/Kolkata'))}")
         
     except Exception as e:
         print(f"Error during scheduled refresh: {str(e)}")
@@ -71,19 +72,29 @@ def manual_refresh():
         return False
 
 def clear_cached_data():
-    """Clear all cached data from session state"""
-    cached_keys = [
-        'sector_data',
-        'index_data', 
-        'news_data',
-        'heatmap_data',
-        'fii_dii_data',
-        'gainers_losers_data'
-    ]
-    
-    for key in cached_keys:
-        if key in st.session_state:
-            del st.session_state[key]
+    """Mark the shared data snapshots stale so the next rerun refetches them once"""
+    SNAPSHOTS.invalidate()
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+_asset_versions = {}
+
+def load_stylesheet(name, container=st):
+    """Link static/css/<name>.css instead of inlining it on every rerun.
+
+    The file is served by Streamlit static serving (enableStaticServing), so
+    the browser fetches and caches it once; the ?v= content hash busts that
+    cache when the file changes.
+    """
+    version = _asset_versions.get(name)
+    if version is None:
+        try:
+            with open(os.path.join(STATIC_DIR, 'css', f"{name}.css"), 'rb') as f:
+                version = hashlib.md5(f.read()).hexdigest()[:10]
+        except OSError as e:
+            print(f"Stylesheet {name} not found: {str(e)}")
+            return
+        _asset_versions[name] = version
+    container.markdown(f'<link rel="stylesheet" href="app/static/css/{name}.css?v={version}">', unsafe_allow_html=True)
 
 def format_indian_currency(amount):
     """Format amount in Indian currency format"""